@@ -0,0 +1,303 @@
+"""
+Offline replay benchmark for the full mission pipeline.
+
+Runs SEOAgent.execute_mission and the ADK subagent path (Researcher -> ContentParser ->
+SemanticAnalyzer -> BriefingGenerator -> BriefingEvaluator) against recorded provider
+responses with injected latency, and reports per-stage wall time, mission latency,
+peak memory and throughput at N concurrent missions.
+
+Usage (from agent/):
+    uv run python -m benchmarks.mission_benchmark --concurrency 1,4,8 --missions 8 --latency-scale 0.2
+    uv run python -m benchmarks.mission_benchmark --output bench.json
+    uv run python -m benchmarks.mission_benchmark --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+AGENT_DIR = Path(__file__).resolve().parents[1]
+# SEOAgent imports the tools as `src.tools`, the ADK subagents as `tools`
+for path in (AGENT_DIR, AGENT_DIR / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+PATHS = ("seo_agent", "subagents")
+# Replayed clients still validate their configuration
+DUMMY_CREDENTIALS = {
+    "GOOGLE_API_KEY": "replay",
+    "SERPAPI_API_KEY": "replay",
+    "GOOGLE_SEARCH_API_KEY": "replay",
+    "GOOGLE_SEARCH_ENGINE_ID": "replay",
+    "GOOGLE_ADS_DEVELOPER_TOKEN": "replay",
+    "GOOGLE_ADS_CLIENT_ID": "replay",
+    "GOOGLE_ADS_CLIENT_SECRET": "replay",
+    "GOOGLE_ADS_REFRESH_TOKEN": "replay",
+    "GOOGLE_ADS_LOGIN_CUSTOMER_ID": "1234567890",
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_seo_agent_mission(agent: Any, topic: str) -> Dict[str, Any]:
+    """
+    Runs one SEOAgent mission; a stage lasts from its status event to the next one.
+    """
+    started = time.perf_counter()
+    stages: Dict[str, float] = {}
+    stage, stage_started = None, started
+    errors = 0
+    first_event = None
+    async for event in agent.execute_mission(topic, stream_briefing=True):
+        now = time.perf_counter()
+        if first_event is None and event.get("type") not in ("status", "timing"):
+            first_event = now - started
+        if event.get("type") == "error":
+            errors += 1
+        if event.get("type") == "status":
+            if stage:
+                stages[stage] = stages.get(stage, 0.0) + now - stage_started
+            stage, stage_started = event.get("step"), now
+    finished = time.perf_counter()
+    if stage:
+        stages[stage] = stages.get(stage, 0.0) + finished - stage_started
+    return {"total": finished - started, "stages": stages, "errors": errors, "first_event": first_event}
+
+
+async def run_subagent_mission(agents: Dict[str, Any], topic: str, content_type: str = "Landingpage", target_group: str = "General Audience") -> Dict[str, Any]:
+    """
+    Runs the ADK subagents in pipeline order, timing each of them.
+    """
+    from config import settings
+    from seo_agent.models import ReportData
+
+    stages: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    async def timed(name, coro):
+        stage_started = time.perf_counter()
+        result = await coro
+        stages[name] = time.perf_counter() - stage_started
+        return result
+
+    research = await timed("research", agents["researcher"].research(topic, settings.DEFAULT_LOCATION))
+    parsed = await timed("parsing", agents["parser"].parse(research["competitors"]))
+    analysis = await timed("analysis", agents["analyzer"].analyze(
+        parsed["analyzed_content"], topic, content_type, target_group, research["related_searches"], settings.DEFAULT_LANGUAGE
+    ))
+    report = ReportData(
+        topic=topic,
+        keyword_data=research["keyword_data"],
+        competitors=parsed["competitors_with_content"],
+        related_searches=research["related_searches"],
+        semantic_analysis=analysis["semantic_analysis"]
+    )
+    briefing = await timed("briefing", agents["generator"].generate(report, settings.DEFAULT_LANGUAGE))
+    await timed("evaluation", agents["evaluator"].evaluate(briefing.briefing, report))
+
+    errors = sum(1 for log in research["logs"] + parsed["logs"] if log.get("type") == "error")
+    errors += 1 if "error" in analysis["semantic_analysis"] else 0
+    return {"total": time.perf_counter() - started, "stages": stages, "errors": errors, "first_event": None}
+
+
+def build_runner(path: str):
+    """
+    Returns an async function running one mission on `path` for a topic.
+    Agents are built once, after the replay is installed.
+    """
+    if path == "seo_agent":
+        from src.agent import SEOAgent
+        agent = SEOAgent()
+        return lambda topic: run_seo_agent_mission(agent, topic)
+
+    from seo_agent.subagents.researcher import Researcher
+    from seo_agent.subagents.content_parser import ContentParser
+    from seo_agent.subagents.semantic_analyzer import SemanticAnalyzer
+    from seo_agent.subagents.briefing_generator import BriefingGenerator
+    from seo_agent.subagents.briefing_evaluator import BriefingEvaluator
+    agents = {
+        "researcher": Researcher(),
+        "parser": ContentParser(),
+        "analyzer": SemanticAnalyzer(),
+        "generator": BriefingGenerator(),
+        "evaluator": BriefingEvaluator(),
+    }
+    return lambda topic: run_subagent_mission(agents, topic)
+
+
+async def run_level(run, topics: List[str], concurrency: int, trace_memory: bool) -> Dict[str, Any]:
+    """
+    Runs all `topics` as missions, at most `concurrency` at a time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(topic):
+        async with semaphore:
+            return await run(topic)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    missions = await asyncio.gather(*(one(topic) for topic in topics))
+    wall = time.perf_counter() - started
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies = [mission["total"] for mission in missions]
+    stage_names = list(dict.fromkeys(name for mission in missions for name in mission["stages"]))
+    first_events = [mission["first_event"] for mission in missions if mission["first_event"] is not None]
+    return {
+        "concurrency": concurrency,
+        "missions": len(missions),
+        "wall_seconds": round(wall, 3),
+        "latency_p50": round(_percentile(latencies, 0.5), 3),
+        "latency_p95": round(_percentile(latencies, 0.95), 3),
+        "latency_max": round(max(latencies), 3),
+        "first_event_p50": round(_percentile(first_events, 0.5), 3) if first_events else None,
+        "stages_mean": {
+            name: round(sum(m["stages"].get(name, 0.0) for m in missions) / len(missions), 3)
+            for name in stage_names
+        },
+        "throughput_per_hour": round(len(missions) / wall * 3600, 1),
+        # ru_maxrss is in KiB on Linux; it is the process peak so far, so it never decreases between levels
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_traced_mb": round(peak / 2 ** 20, 1) if trace_memory else None,
+        "errors": sum(mission["errors"] for mission in missions),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Lists regressions against a previous --output file: p50 latency above or
+    throughput below the baseline by more than `tolerance`.
+    """
+    previous = {(entry["path"], entry["concurrency"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        base = previous.get((entry["path"], entry["concurrency"]))
+        if not base:
+            continue
+        label = f"{entry['path']} @ {entry['concurrency']}"
+        if entry["latency_p50"] > base["latency_p50"] * (1 + tolerance):
+            regressions.append(f"{label}: p50 latency {base['latency_p50']}s -> {entry['latency_p50']}s")
+        if entry["throughput_per_hour"] < base["throughput_per_hour"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {base['throughput_per_hour']}/h -> {entry['throughput_per_hour']}/h")
+    return regressions
+
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"\n{'path':<10} {'N':>3} {'missions':>8} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'/hour':>8} {'RSS MB':>7} {'traced':>7} {'errors':>6}  stages (mean s)")
+    for entry in results:
+        stages = ", ".join(f"{name} {seconds}" for name, seconds in entry["stages_mean"].items())
+        traced = entry["peak_traced_mb"] if entry["peak_traced_mb"] is not None else "-"
+        print(
+            f"{entry['path']:<10} {entry['concurrency']:>3} {entry['missions']:>8} {entry['latency_p50']:>7} {entry['latency_p95']:>7} "
+            f"{entry['latency_max']:>7} {entry['throughput_per_hour']:>8} {entry['peak_rss_mb']:>7} {traced:>7} {entry['errors']:>6}  {stages}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    from benchmarks.replay import Replay, install
+
+    latencies = dict(item.split("=", 1) for item in args.latency)
+    replay = Replay(latencies, scale=args.latency_scale, seed=args.seed, gemini_chars_per_second=args.gemini_chars_per_second)
+    install(replay)
+
+    results = []
+    for path in args.paths:
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            run = build_runner(path)
+            for i in range(args.warmup):
+                await run(f"{replay.topic} warmup {i}")
+        for concurrency in args.concurrency:
+            # Distinct topics by default, so missions do not share (coalesce) provider calls
+            topics = [replay.topic if args.same_topic or i == 0 else f"{replay.topic} {concurrency}-{i}" for i in range(args.missions)]
+            print(f"Running {len(topics)} {path} missions at concurrency {concurrency}...", file=sys.stderr)
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                level = await run_level(run, topics, concurrency, args.trace_memory)
+            results.append({"path": path, **level})
+
+    print_results(results)
+    print(f"\nProvider calls: {replay.calls}")
+
+    if args.output:
+        settings = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+        Path(args.output).write_text(json.dumps({"settings": settings, "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline replay benchmark of the SEO mission pipeline.")
+    parser.add_argument("--paths", default="seo_agent,subagents", type=lambda value: value.split(","), help=f"Pipelines to run ({', '.join(PATHS)})")
+    parser.add_argument("--concurrency", default="1,4", type=lambda value: [int(n) for n in value.split(",")], help="Concurrent missions per level, e.g. 1,4,8")
+    parser.add_argument("--missions", type=int, default=4, help="Missions per concurrency level")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed missions per path before measuring")
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=SPEC",
+                        help="Latency of serpapi, custom_search, google_ads, jina, pages or gemini: fixed:S, uniform:LOW,HIGH, lognormal:MEDIAN,SIGMA or 0")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to all injected latencies")
+    parser.add_argument("--gemini-chars-per-second", type=float, default=400, help="Output speed of replayed Gemini responses")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latencies and replayed page content")
+    parser.add_argument("--same-topic", action="store_true", help="Run every mission on the recorded topic (measures coalescing)")
+    parser.add_argument("--cache", action="store_true", help="Keep the page and query caches enabled, in a temporary directory (default: disabled)")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Disable provider rate limiting")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also record peak Python allocations with tracemalloc; it roughly doubles mission time, so compare traced runs only with traced baselines")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (default 0.15)")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args(argv)
+    unknown = set(args.paths) - set(PATHS)
+    if unknown:
+        parser.error(f"Unknown paths: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    for key, value in DUMMY_CREDENTIALS.items():
+        os.environ.setdefault(key, value)
+    # Replayed responses must never land in the caches that real runs read
+    cache_dir = tempfile.mkdtemp(prefix="genseo-benchmark-")
+    os.environ["PAGE_CACHE_PATH"] = os.path.join(cache_dir, "pages.sqlite3")
+    os.environ["QUERY_CACHE_PATH"] = os.path.join(cache_dir, "queries.sqlite3")
+    if not args.cache:
+        # Every mission should pay for its provider calls, not read the previous mission's results
+        os.environ["PAGE_CACHE_ENABLED"] = "false"
+        os.environ["QUERY_CACHE_ENABLED"] = "false"
+    if args.no_rate_limit:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+    try:
+        return asyncio.run(main_async(args))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+SAMPLES_DIR = Path(__file__).resolve().parents[2] / "samples"
+
+# Median-ish latencies of the live providers (seconds); Gemini additionally streams its output
+DEFAULT_LATENCIES = {
+    "serpapi": "lognormal:1.2,0.3",
+    "custom_search": "lognormal:0.4,0.3",
+    "google_ads": "lognormal:1.5,0.3",
+    "jina": "lognormal:1.5,0.6",
+    "pages": "lognormal:0.4,0.5",
+    "gemini": "lognormal:1.0,0.3",
+}
+_WORD = re.compile(r"[^\W\d_]{3,}")
+
+
+class LatencyModel:
+    """
+    A latency distribution parsed from a spec string:
+    "fixed:S", "uniform:LOW,HIGH", "lognormal:MEDIAN,SIGMA", or "0" for none.
+    """
+    def __init__(self, spec: str, scale: float = 1.0, rng: Optional[random.Random] = None):
+        self.spec = spec
+        self.scale = scale
+        self.rng = rng or random.Random()
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(arg) for arg in args.split(",") if arg.strip()]
+        if self.kind not in ("0", "fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+
+    def sample(self) -> float:
+        if self.kind == "0":
+            return 0.0
+        if self.kind == "fixed":
+            value = self.args[0]
+        elif self.kind == "uniform":
+            value = self.rng.uniform(self.args[0], self.args[1])
+        else:
+            value = self.rng.lognormvariate(math.log(self.args[0]), self.args[1])
+        return max(0.0, value * self.scale)
+
+
+def load_samples(samples_dir: Path = SAMPLES_DIR) -> Dict[str, Any]:
+    """
+    Loads the recorded mission reports (final_report.json, final_report_adk.json)
+    that seed the replayed provider responses.
+    """
+    report = json.loads((samples_dir / "final_report.json").read_text(encoding="utf-8"))
+    adk_report = json.loads((samples_dir / "final_report_adk.json").read_text(encoding="utf-8"))
+
+    competitors = {}
+    for comp in adk_report.get("competitors", []) + report.get("competitors", []):
+        competitors.setdefault(comp["link"], comp)
+
+    return {
+        "topic": report["topic"],
+        "keyword_data": adk_report.get("keyword_data") or report["keyword_data"],
+        "serp_results": adk_report.get("competitors", []),
+        "custom_search_results": list(reversed(list(competitors.values()))),
+        "competitors": competitors,
+        "related_searches": adk_report.get("related_searches", []),
+        "semantic_analysis": report["semantic_analysis"],
+        "briefing": report["briefing"],
+        "evaluation": adk_report.get("evaluation", "")
+    }
+
+
+class Replay:
+    """
+    Serves recorded provider responses with injected latency.
+
+    Results for the recorded topic are replayed as recorded; other topics get the
+    same competitors under topic-specific URLs, so concurrent missions with
+    different topics do not share page fetches.
+
+    Args:
+        latencies: Latency specs per provider (serpapi, custom_search, google_ads, jina, pages, gemini).
+        scale: Factor applied to every sampled latency.
+        seed: Seed of the latency and content generators, for reproducible runs.
+        gemini_chars_per_second: Output speed of the replayed Gemini responses.
+        payload_scale: Factor applied to page word counts and to briefing / evaluation length.
+    """
+    def __init__(self, latencies: Optional[Dict[str, str]] = None, scale: float = 1.0, seed: int = 0, gemini_chars_per_second: float = 400, payload_scale: float = 1.0):
+        self.samples = load_samples()
+        self.topic = self.samples["topic"]
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.latencies = {
+            provider: LatencyModel(spec, scale, self._rng)
+            for provider, spec in {**DEFAULT_LATENCIES, **(latencies or {})}.items()
+        }
+        self.gemini_chars_per_second = gemini_chars_per_second
+        self.payload_scale = payload_scale
+        self.seed = seed
+        self.calls: Dict[str, int] = {provider: 0 for provider in self.latencies}
+        self._calls_lock = threading.Lock()
+
+        vocabulary = _WORD.findall(f"{self.samples['briefing']} {self.samples['evaluation']}")
+        entities = self.samples["semantic_analysis"].get("entities", {})
+        vocabulary += [name for names in entities.values() for name in names]
+        self.vocabulary = vocabulary
+
+    def wait(self, provider: str, extra: float = 0.0):
+        """
+        Sleeps for one sampled latency of `provider`, like a blocking network call.
+        """
+        with self._calls_lock:
+            self.calls[provider] = self.calls.get(provider, 0) + 1
+        with self._rng_lock:
+            delay = self.latencies[provider].sample()
+        time.sleep(delay + extra * self.latencies[provider].scale)
+
+    def _link(self, link: str, query: str) -> str:
+        if query.strip().lower() == self.topic.lower():
+            return link
+        return f"{link}{'&' if '?' in link else '?'}variant={zlib.crc32(query.lower().encode('utf-8'))}"
+
+    def _recorded(self, url: str) -> Dict[str, Any]:
+        link = re.sub(r"[?&]variant=\d+$", "", url)
+        return self.samples["competitors"].get(link, {"title": "Unknown page", "word_count": 600})
+
+    # --- REST providers -------------------------------------------------
+
+    def serp(self, params: Dict[str, str]) -> Dict[str, Any]:
+        query = params.get("q", self.topic)
+        return {
+            "search_parameters": params,
+            "organic_results": [
+                {"position": i, "title": comp["title"], "link": self._link(comp["link"], query)}
+                for i, comp in enumerate(self.samples["serp_results"], 1)
+            ],
+            "related_searches": [{"query": q} for q in self.samples["related_searches"]]
+        }
+
+    def custom_search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        query = params.get("q", self.topic)
+        start = int(params.get("start", 1)) - 1
+        num = int(params.get("num", 10))
+        items = self.samples["custom_search_results"][start:start + num]
+        return {"items": [{"title": comp["title"], "link": self._link(comp["link"], query)} for comp in items]}
+
+    @lru_cache(maxsize=2048)
+    def page(self, url: str) -> Dict[str, Any]:
+        """
+        A deterministic page with the recorded title and word count, written from the
+        vocabulary of the recorded briefing so term statistics have realistic input.
+        """
+        recorded = self._recorded(url)
+        rng = random.Random(zlib.crc32(f"{self.seed}:{url}".encode("utf-8")))
+        clusters = [cluster["topic"] for cluster in self.samples["semantic_analysis"].get("topic_clusters", [])]
+        blocks = [f"# {recorded['title']}"]
+        words = 0
+        target = int((recorded.get("word_count") or 0) * self.payload_scale)
+        while words < target:
+            if clusters and rng.random() < 0.15:
+                blocks.append(f"## {rng.choice(clusters)}")
+            sentences = []
+            for _ in range(rng.randint(3, 6)):
+                sentence = rng.choices(self.vocabulary, k=rng.randint(8, 20))
+                sentences.append(" ".join(sentence).capitalize() + ".")
+            paragraph = " ".join(sentences)
+            blocks.append(paragraph)
+            words += len(paragraph.split())
+        content = "\n\n".join(blocks)
+        return {"url": url, "title": recorded["title"], "content": content}
+
+    def jina(self, url: str) -> Dict[str, Any]:
+        page = self.page(url)
+        return {"code": 200, "status": 20000, "data": {"title": page["title"], "url": url, "content": page["content"]}}
+
+    def html(self, url: str) -> str:
+        page = self.page(url)
+        body = []
+        for block in page["content"].split("\n\n"):
+            if block.startswith("## "):
+                body.append(f"<h2>{escape(block[3:])}</h2>")
+            elif block.startswith("# "):
+                body.append(f"<h1>{escape(block[2:])}</h1>")
+            else:
+                body.append(f"<p>{escape(block)}</p>")
+        return (
+            f"<!doctype html><html><head><meta charset=\"utf-8\"><title>{escape(page['title'])}</title></head><body>"
+            "<header><nav><a href=\"/\">Home</a> <a href=\"/hotels\">Hotels</a></nav></header>"
+            f"<main><article>{''.join(body)}</article></main>"
+            "<footer>Impressum | Datenschutz</footer></body></html>"
+        )
+
+    # --- Google Ads -----------------------------------------------------
+
+    def keyword_ideas(self, seeds: List[str]) -> List[Any]:
+        keyword_data = self.samples["keyword_data"]
+        main = keyword_data.get("main_keyword") or {}
+        ideas = []
+        for seed in seeds:
+            ideas.append((seed, main.get("avg_searches", 1000), main.get("competition", "HIGH")))
+            for item in keyword_data.get("related_keywords", []):
+                ideas.append((item["keyword"], item.get("avg_searches", 0), item.get("competition", "UNKNOWN")))
+        return [
+            SimpleNamespace(text=text, keyword_idea_metrics=SimpleNamespace(avg_monthly_searches=searches, competition=SimpleNamespace(name=competition)))
+            for text, searches, competition in ideas
+        ]
+
+    # --- Gemini ---------------------------------------------------------
+
+    def gemini(self, prompt: str) -> str:
+        """
+        The recorded response matching a prompt of semantic_analysis, content_briefing or evaluation.
+        """
+        analysis = self.samples["semantic_analysis"]
+        if "Extract the entities and topics covered by this article" in prompt:
+            entities = analysis.get("entities", {})
+            return json.dumps({
+                **{entity_type: names[:5] for entity_type, names in entities.items()},
+                "topics": [cluster["topic"] for cluster in analysis.get("topic_clusters", [])][:6]
+            }, ensure_ascii=False)
+        if "These are the topics covered by" in prompt:
+            total = int(re.search(r"covered by (\d+)", prompt).group(1))
+            return json.dumps({
+                "topic_clusters": [{"topic": cluster["topic"], "articles": list(range(1, total + 1))} for cluster in analysis.get("topic_clusters", [])],
+                "content_gaps": analysis.get("content_gaps", [])
+            }, ensure_ascii=False)
+        if "Perform a semantic analysis" in prompt:
+            keyword = re.search(r'for the keyword "(.*?)" based on', prompt)
+            return json.dumps({**analysis, "keyword": keyword.group(1) if keyword else analysis.get("keyword")}, ensure_ascii=False)
+        if "Evaluate the following Content Briefing" in prompt:
+            return self._scaled(self.samples["evaluation"])
+        return self._scaled(self.samples["briefing"])
+
+    def _scaled(self, text: str) -> str:
+        if self.payload_scale == 1.0:
+            return text
+        length = max(1, int(len(text) * self.payload_scale))
+        return (text * math.ceil(length / len(text)))[:length]
+
+    def gemini_seconds(self, text: str) -> float:
+        return len(text) / self.gemini_chars_per_second if self.gemini_chars_per_second > 0 else 0.0
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A requests transport adapter answering SerpAPI, Custom Search, Jina Reader and
+    direct page fetches from a Replay, so the real REST clients (caches, rate
+    limiters, single-flight, retries, parsing) run unchanged.
+    """
+    def __init__(self, replay: Replay):
+        super().__init__()
+        self.replay = replay
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parts = urlsplit(request.url)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        host = (parts.hostname or "").lower()
+
+        if host == "serpapi.com":
+            self.replay.wait("serpapi")
+            return self._response(request, json.dumps(self.replay.serp(params)), "application/json")
+        if host == "www.googleapis.com" and parts.path.startswith("/customsearch"):
+            self.replay.wait("custom_search")
+            return self._response(request, json.dumps(self.replay.custom_search(params)), "application/json")
+        if host == "r.jina.ai":
+            self.replay.wait("jina")
+            target = unquote(request.url.split("r.jina.ai/", 1)[1])
+            return self._response(request, json.dumps(self.replay.jina(target), ensure_ascii=False), "application/json")
+        self.replay.wait("pages")
+        return self._response(request, self.replay.html(request.url), "text/html; charset=utf-8")
+
+    @staticmethod
+    def _response(request, body: str, content_type: str, status: int = 200) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class _ReplayModels:
+    def __init__(self, replay: Replay):
+        self.replay = replay
+
+    @staticmethod
+    def _usage(prompt: str, text: str) -> Any:
+        # Rough token counts (4 characters per token), like prompt_budget's estimate
+        return SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+
+    def generate_content(self, model: str, contents: str, config: Any = None) -> Any:
+        text = self.replay.gemini(contents)
+        self.replay.wait("gemini", extra=self.replay.gemini_seconds(text))
+        return SimpleNamespace(text=text, usage_metadata=self._usage(contents, text))
+
+    def generate_content_stream(self, model: str, contents: str, config: Any = None) -> Iterator[Any]:
+        text = self.replay.gemini(contents)
+        self.replay.wait("gemini")
+        # Output arrives in ~100 character chunks at the configured speed
+        for i in range(0, len(text), 100):
+            chunk = text[i:i + 100]
+            time.sleep(self.replay.gemini_seconds(chunk) * self.replay.latencies["gemini"].scale)
+            final = i + 100 >= len(text)
+            yield SimpleNamespace(text=chunk, usage_metadata=self._usage(contents, text) if final else None)
+
+
+class ReplayGenaiClient:
+    """
+    Stands in for genai.Client; installed with set_genai_client_factory.
+    """
+    def __init__(self, replay: Replay):
+        self.models = _ReplayModels(replay)
+
+
+class ReplayAdsLibrary:
+    """
+    Stands in for the Google Ads client library (LibGoogleAdsClient): builds
+    requests and serves keyword ideas from the recorded keyword data.
+    """
+    def __init__(self, replay: Replay):
+        self.replay = replay
+        self.enums = SimpleNamespace(
+            KeywordPlanNetworkEnum=SimpleNamespace(GOOGLE_SEARCH="GOOGLE_SEARCH"),
+            KeywordPlanKeywordAnnotationEnum=SimpleNamespace(KEYWORD_CONCEPT="KEYWORD_CONCEPT")
+        )
+
+    def load_from_dict(self, config: Dict[str, Any], version: Optional[str] = None) -> "ReplayAdsLibrary":
+        return self
+
+    def get_type(self, name: str) -> Any:
+        return SimpleNamespace(
+            customer_id="", language="", geo_target_constants=[], include_adult_keywords=False,
+            keyword_plan_network=None, keyword_seed=SimpleNamespace(keywords=[]), keyword_annotation=[]
+        )
+
+    def get_service(self, name: str) -> Any:
+        return SimpleNamespace(generate_keyword_ideas=self._generate_keyword_ideas)
+
+    def _generate_keyword_ideas(self, request: Any) -> List[Any]:
+        self.replay.wait("google_ads")
+        return self.replay.keyword_ideas(list(request.keyword_seed.keywords))
+
+
+def install(replay: Replay, packages=("src.tools", "tools")):
+    """
+    Routes every provider call of the given tool packages to `replay`.
+
+    The SEOAgent imports the tools as `src.tools`, the ADK subagents as `tools`;
+    each import path has its own shared session and Gemini client registry.
+    """
+    import importlib
+
+    for package in packages:
+        transport = importlib.import_module(f"{package}.transport")
+        session = transport.get_session()
+        adapter = ReplayAdapter(replay)
+        for prefix in list(session.adapters):
+            session.mount(prefix, adapter)
+
+        genai_clients = importlib.import_module(f"{package}.genai_clients")
+        genai_clients.set_genai_client_factory(lambda key: ReplayGenaiClient(replay))
+
+        google_ads = importlib.import_module(f"{package}.google_ads")
+        google_ads.LibGoogleAdsClient = ReplayAdsLibrary(replay)
@@ -0,0 +1,292 @@
+"""
+Local stand-in for SerpAPI, Google Custom Search, Jina Reader and the Gemini API,
+for load tests that must not spend real quota.
+
+Responses are built from the recorded samples (see replay.py), with tunable
+latency, error rates and payload sizes. Point the clients at it with the
+environment variables printed on startup. Google Ads is gRPC and is not emulated.
+
+Usage (from agent/):
+    uv run python -m benchmarks.standin_server --port 8090 --latency-scale 0.5 --error-rate jina=0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from benchmarks.replay import DEFAULT_LATENCIES, Replay
+
+ERROR_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+STREAM_CHUNK_CHARS = 100
+
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server answering the provider APIs from a Replay.
+
+    Args:
+        address: (host, port) to listen on; port 0 picks a free one.
+        replay: Source of the payloads and latencies.
+        error_rates: Probability per provider (serpapi, custom_search, jina, pages, gemini) of an injected 429/500/503.
+        serve_pages: Rewrite competitor links to pages served by this server, so direct (local) extraction can be load tested too.
+        verbose: Log every request.
+    """
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], replay: Replay, error_rates: Optional[Dict[str, float]] = None, serve_pages: bool = False, verbose: bool = False):
+        super().__init__(address, StandinHandler)
+        self.replay = replay
+        self.error_rates = error_rates or {}
+        self.serve_pages = serve_pages
+        self.verbose = verbose
+        self.started_at = time.time()
+        self._rng = random.Random(replay.seed + 1)
+        self._lock = threading.Lock()
+        self.errors: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def origin(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self) -> Dict[str, str]:
+        """
+        The environment variables that point the tool clients at this server.
+        """
+        return {
+            "SERPAPI_BASE_URL": f"{self.origin}/search",
+            "CUSTOM_SEARCH_BASE_URL": f"{self.origin}/customsearch/v1",
+            "JINA_READER_BASE_URL": f"{self.origin}/jina/",
+            "GEMINI_BASE_URL": self.origin,
+        }
+
+    def start(self) -> threading.Thread:
+        """
+        Serves in a background thread, e.g. inside a load test process.
+        """
+        thread = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        thread.start()
+        return thread
+
+    def inject_error(self, provider: str) -> Optional[int]:
+        with self._lock:
+            if self._rng.random() >= self.error_rates.get(provider, 0.0):
+                return None
+            self.errors[provider] = self.errors.get(provider, 0) + 1
+            return self._rng.choice(list(ERROR_STATUS))
+
+    def track(self, delta: int):
+        with self._lock:
+            self.in_flight += delta
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "calls": dict(self.replay.calls),
+                "errors": dict(self.errors),
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+
+    def page_link(self, link: str) -> str:
+        return f"{self.origin}/pages/{link}" if self.serve_pages else link
+
+    def page_target(self, url: str) -> str:
+        prefix = f"{self.origin}/pages/"
+        return url[len(prefix):] if url.startswith(prefix) else url
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients reuse pooled connections as they do against the real APIs
+    protocol_version = "HTTP/1.1"
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.server.track(1)
+        try:
+            self._route_get()
+        finally:
+            self.server.track(-1)
+
+    def do_POST(self):
+        self.server.track(1)
+        try:
+            self._route_post()
+        finally:
+            self.server.track(-1)
+
+    def _route_get(self):
+        parts = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        replay = self.server.replay
+
+        if parts.path in ("/health", "/stats"):
+            return self._send_json(200, self.server.stats())
+
+        if parts.path == "/search":
+            if self._maybe_fail("serpapi"):
+                return
+            replay.wait("serpapi")
+            result = replay.serp(params)
+            for item in result["organic_results"]:
+                item["link"] = self.server.page_link(item["link"])
+            return self._send_json(200, result)
+
+        if parts.path == "/customsearch/v1":
+            if int(params.get("num", 10)) > 10:
+                return self._send_error_json(400, "Invalid value for num: at most 10 results per request")
+            if self._maybe_fail("custom_search"):
+                return
+            replay.wait("custom_search")
+            result = replay.custom_search(params)
+            for item in result["items"]:
+                item["link"] = self.server.page_link(item["link"])
+            return self._send_json(200, result)
+
+        if parts.path.startswith("/jina/"):
+            if self._maybe_fail("jina"):
+                return
+            # The target URL keeps its own query string
+            url = unquote(self.path[len("/jina/"):])
+            replay.wait("jina")
+            result = replay.jina(self.server.page_target(url))
+            result["data"]["url"] = url
+            if "application/json" in self.headers.get("Accept", ""):
+                return self._send_json(200, result)
+            data = result["data"]
+            text = f"Title: {data['title']}\n\nURL Source: {url}\n\nMarkdown Content:\n{data['content']}"
+            return self._send(200, text.encode("utf-8"), "text/plain; charset=utf-8")
+
+        if parts.path.startswith("/pages/"):
+            if self._maybe_fail("pages"):
+                return
+            replay.wait("pages")
+            return self._send(200, replay.html(unquote(self.path[len("/pages/"):])).encode("utf-8"), "text/html; charset=utf-8")
+
+        self._send_error_json(404, f"No stand-in route for {parts.path}")
+
+    def _route_post(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        # /v1beta/models/<model>:generateContent and :streamGenerateContent
+        if not parts.path.startswith("/v1beta/models/") or ":" not in parts.path:
+            return self._send_error_json(404, f"No stand-in route for {parts.path}")
+        model, _, method = parts.path[len("/v1beta/models/"):].partition(":")
+        prompt = "\n".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        if self._maybe_fail("gemini"):
+            return
+
+        replay = self.server.replay
+        text = replay.gemini(prompt)
+        if method == "generateContent":
+            replay.wait("gemini", extra=replay.gemini_seconds(text))
+            return self._send_json(200, self._candidate(text, model, prompt, final=True))
+        if method == "streamGenerateContent":
+            return self._stream(text, model, prompt)
+        self._send_error_json(404, f"Unknown method {method}")
+
+    def _stream(self, text: str, model: str, prompt: str):
+        replay = self.server.replay
+        replay.wait("gemini")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+        for i, chunk in enumerate(chunks):
+            time.sleep(replay.gemini_seconds(chunk) * replay.latencies["gemini"].scale)
+            # Like Gemini, each chunk reports the usage of the response so far
+            produced = text[:(i + 1) * STREAM_CHUNK_CHARS]
+            event = f"data: {json.dumps(self._candidate(chunk, model, prompt, final=i == len(chunks) - 1, produced=produced), ensure_ascii=False)}\r\n\r\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _candidate(text: str, model: str, prompt: str, final: bool, produced: Optional[str] = None) -> Dict[str, Any]:
+        candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        if final:
+            candidate["finishReason"] = "STOP"
+        return {
+            "candidates": [candidate],
+            # Rough token counts (4 characters per token), like prompt_budget's estimate
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(produced if produced is not None else text) // 4},
+            "modelVersion": model
+        }
+
+    def _maybe_fail(self, provider: str) -> bool:
+        status = self.server.inject_error(provider)
+        if status is None:
+            return False
+        self._send_error_json(status, f"Injected {provider} error", {"Retry-After": "1"} if status == 429 else None)
+        return True
+
+    def _send_error_json(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self._send_json(status, {"error": {"code": status, "message": message, "status": ERROR_STATUS.get(status, "INVALID_ARGUMENT")}}, headers)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8", headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _pairs(items, cast=str) -> Dict[str, Any]:
+    return {key: cast(value) for key, value in (item.split("=", 1) for item in items)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for SerpAPI, Custom Search, Jina Reader and Gemini.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=SPEC",
+                        help=f"Latency of {', '.join(DEFAULT_LATENCIES)}: fixed:S, uniform:LOW,HIGH, lognormal:MEDIAN,SIGMA or 0")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to all latencies")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="PROVIDER=RATE", help="Share of requests answered with 429/500/503, e.g. jina=0.05")
+    parser.add_argument("--payload-scale", type=float, default=1.0, help="Factor applied to page sizes and briefing/evaluation length")
+    parser.add_argument("--gemini-chars-per-second", type=float, default=400, help="Output speed of Gemini responses")
+    parser.add_argument("--serve-pages", action="store_true", help="Serve competitor pages from this server as well")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    replay = Replay(_pairs(args.latency), scale=args.latency_scale, seed=args.seed,
+                    gemini_chars_per_second=args.gemini_chars_per_second, payload_scale=args.payload_scale)
+    server = StandinServer((args.host, args.port), replay, _pairs(args.error_rate, float), args.serve_pages, args.verbose)
+    print(f"Stand-in provider server on {server.origin} (stats: {server.origin}/stats). Point the clients at it with:")
+    for key, value in server.environment().items():
+        print(f"  export {key}={value}")
+    print("  export RATE_LIMIT_ENABLED=false  # optional: measure the pipeline, not the provider limits")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import asyncio
 import os
+import time
 import json
-from typing import Dict, Any
+import threading
+from typing import Any, Callable, ClassVar, Dict, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -14,6 +16,9 @@ from src.tools.jina_reader import JinaReaderClient
 from src.tools.semantic_analysis import SemanticAnalysisClient
 from src.tools.content_briefing import ContentBriefingClient
 from src.tools.evaluation import EvaluationClient
+from src.tools.dag import DagRun
+from src.tools.mission_steps import MissionTools, build_mission_dag, mission_values
+from src.tools.telemetry import SpanCollector, record_span
 from src.config import settings
 
 # Load .env
@@ -26,155 +31,120 @@ class SEOAgent(AdkAgent):
     """
     SEO Agent using Google ADK.
     """
-    _ads_client: GoogleAdsClient = PrivateAttr()
-    _serp_client: SerpApiClient = PrivateAttr()
-    _custom_search_client: CustomSearchClient = PrivateAttr()
-    _jina_client: JinaReaderClient = PrivateAttr()
-    _semantic_client: SemanticAnalysisClient = PrivateAttr()
-    _briefing_client: ContentBriefingClient = PrivateAttr()
-    _eval_client: EvaluationClient = PrivateAttr()
+    # The tool clients, built on first use (see _client)
+    CLIENTS: ClassVar[Dict[str, Callable[[], Any]]] = {
+        "ads": GoogleAdsClient,
+        "serp": SerpApiClient,
+        "custom_search": CustomSearchClient,
+        "jina": JinaReaderClient,
+        "semantic": SemanticAnalysisClient,
+        "briefing": ContentBriefingClient,
+        "evaluation": EvaluationClient,
+    }
+    _clients: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    _client_locks: Dict[str, threading.Lock] = PrivateAttr()
+    _tools: MissionTools = PrivateAttr()
 
     def __init__(self):
         super().__init__(name="SEO_Agent")
         print("Initializing ADK SEO Agent...")
-        self._ads_client = GoogleAdsClient()
-        self._serp_client = SerpApiClient()
-        self._custom_search_client = CustomSearchClient()
-        self._jina_client = JinaReaderClient()
-        self._semantic_client = SemanticAnalysisClient()
-        self._briefing_client = ContentBriefingClient()
-        self._eval_client = EvaluationClient()
-
-    async def execute_mission(self, topic: str, content_type: str = "Landingpage", target_group: str = "General Audience", location: str = settings.DEFAULT_LOCATION, language: str = settings.DEFAULT_LANGUAGE):
+        self._client_locks = {name: threading.Lock() for name in self.CLIENTS}
+        self._tools = MissionTools(
+            keyword_ideas=self._lazy("ads", "get_keyword_ideas"),
+            serp=self._lazy("serp", "search"),
+            custom_search=self._lazy("custom_search", "search"),
+            parse=self._lazy("jina", "parse"),
+            analyze=self._lazy("semantic", "analyze"),
+            generate_briefing=self._lazy("briefing", "generate_briefing"),
+            generate_briefing_stream=self._lazy("briefing", "generate_briefing_stream"),
+            evaluate=self._lazy("evaluation", "evaluate"),
+            page_cache_stats=self._lazy("jina", "cache_stats")
+        )
+
+    def _client(self, name: str) -> Any:
+        """
+        Returns a tool client, building it on first use. Tool calls run in worker
+        threads, so a slow constructor (the Google Ads client loads its protos and
+        refreshes its OAuth token) neither delays startup nor blocks the event loop,
+        and a misconfigured provider only fails its own calls.
+        """
+        client = self._clients.get(name)
+        if client is None:
+            with self._client_locks[name]:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = self.CLIENTS[name]()
+        return client
+
+    def _lazy(self, name: str, method: str) -> Callable[..., Any]:
+        return lambda *args, **kwargs: getattr(self._client(name), method)(*args, **kwargs)
+
+    async def execute_mission(self, topic: str, content_type: str = "Landingpage", target_group: str = "General Audience", location: str = settings.DEFAULT_LOCATION, language: str = settings.DEFAULT_LANGUAGE, stream_briefing: bool = True, stages: Optional[Dict[str, Any]] = None, preview: bool = False):
         """
         Executes the SEO mission and yields events for streaming.
+
+        The mission runs on the step DAG in tools/mission_steps.py: the keyword
+        call, the searches and the parsing of the first search results run
+        concurrently, and semantic analysis starts as soon as parsing settles.
+
+        With stream_briefing, the briefing is additionally emitted token by token as
+        {"type": "delta", "key": "briefing", "data": <chunk>} events before the final
+        {"type": "data", "key": "briefing"} event with the full text.
+
+        stages optionally maps "research", "parsing" and "llm" to async context managers
+        (e.g. asyncio.Semaphore) entered around every call of that stage. A scheduler
+        running many missions shares them to bound each stage across all missions.
+
+        With preview, no LLM is called: the semantic analysis section only holds the
+        locally computed term statistics and no briefing is generated.
+
+        Stage and provider call durations (with e.g. Gemini token usage) are emitted as
+        {"type": "timing", "name", "kind", "seconds", "outcome", "attributes"} events
+        and aggregated into the metrics registry (see tools/telemetry.py).
         """
+        spans = SpanCollector()
+        mission_started = time.perf_counter()
         yield {"type": "status", "step": "init", "message": f"Starting mission for '{topic}'..."}
-        
-        report = {
-            "topic": topic,
-            "content_type": content_type,
-            "target_group": target_group,
-            "location": location,
-            "language": language,
-            "keyword_data": {},
-            "competitors": [],
-            "related_searches": [],
-            "semantic_analysis": {},
-            "briefing": "",
-            "evaluation": ""
-        }
-
-        # Step 1: Parallel Execution
+
+        dag = build_mission_dag(self._tools, settings, stages=stages, spans=spans)
+        run = dag.run(mission_values(topic, content_type, target_group, location, language, stream_briefing=stream_briefing, preview=preview))
+
+        # Step 1 & 2: Research and Parsing, pipelined; Step 3: Semantic Analysis
         yield {"type": "status", "step": "research", "message": "Running Keywords, SerpAPI & Custom Search in Parallel..."}
-        
-        kw_task = asyncio.to_thread(self._ads_client.get_keyword_ideas, topic)
-        serp_task = asyncio.to_thread(self._serp_client.search, topic, location=location)
-        custom_search_task = asyncio.to_thread(self._custom_search_client.search, topic, num=settings.MAX_COMPETITORS)
-        
-        kw_data, serp_data, custom_data = await asyncio.gather(kw_task, serp_task, custom_search_task)
-        
-        # Process Keywords
-        if "error" in kw_data:
-            report["keyword_data"] = {"error": kw_data['error']}
-            yield {"type": "error", "source": "google_ads", "message": kw_data['error']}
-        else:
-            report["keyword_data"] = kw_data
-            keywords = kw_data.get('related_keywords', [])
-            kw_texts = [k if isinstance(k, str) else str(k) for k in keywords]
-            yield {"type": "data", "key": "keywords", "data": kw_texts[:10]}
-            yield {"type": "log", "message": f"Found {len(keywords)} keywords. Top 5: {', '.join(kw_texts[:5])}..."}
-
-        # Process Competitors
-        unique_links = set()
-        merged_competitors = []
-        related_searches = []
-
-        # SerpAPI
-        if "error" in serp_data:
-            yield {"type": "error", "source": "serp_api", "message": serp_data['error']}
-        else:
-            organic = serp_data.get("organic_results", [])
-            for item in organic:
-                link = item.get("link")
-                if link and link not in unique_links:
-                    unique_links.add(link)
-                    merged_competitors.append({"title": item.get("title"), "link": link, "source": "SerpAPI"})
-            
-            if "related_searches" in serp_data:
-                related_searches = [item.get("query") for item in serp_data["related_searches"] if item.get("query")]
-            elif "people_also_ask" in serp_data:
-                 related_searches.extend([item.get("question") for item in serp_data["people_also_ask"] if item.get("question")])
-
-        # Custom Search
-        if "error" in custom_data:
-            yield {"type": "error", "source": "custom_search", "message": custom_data['error']}
-        else:
-            items = custom_data.get("items", [])
-            for item in items:
-                link = item.get("link")
-                if link and link not in unique_links:
-                    unique_links.add(link)
-                    merged_competitors.append({"title": item.get("title"), "link": link, "source": "CustomSearch"})
-
-        top_competitors = merged_competitors[:settings.MAX_COMPETITORS]
-        report["related_searches"] = related_searches
-        
-        yield {"type": "data", "key": "competitors", "data": top_competitors}
-        yield {"type": "log", "message": f"Found {len(top_competitors)} competitors and {len(related_searches)} related searches."}
-
-        # Step 2: Parsing
-        yield {"type": "status", "step": "parsing", "message": f"Parsing {len(top_competitors)} URLs..."}
-        
-        parse_tasks = []
-        for comp in top_competitors:
-            parse_tasks.append(asyncio.to_thread(self._jina_client.parse, comp['link']))
-        
-        parsed_results = await asyncio.gather(*parse_tasks, return_exceptions=True)
-        
-        analyzed_content = []
-        for i, res in enumerate(parsed_results):
-            url = top_competitors[i]['link']
-            if isinstance(res, Exception):
-                yield {"type": "log", "message": f"[FAIL] {url}: {str(res)}"}
-            elif res.get("word_count", 0) > 50:
-                yield {"type": "log", "message": f"[OK] {url} ({res.get('word_count')} words)"}
-                analyzed_content.append(res)
-                report["competitors"].append({
-                    "title": top_competitors[i].get("title"),
-                    "link": url,
-                    "word_count": res.get("word_count"),
-                    "source": top_competitors[i].get("source")
-                })
-            else:
-                yield {"type": "log", "message": f"[SKIP] {url} (Low content)"}
-
-        # Step 3: Semantic Analysis
-        if analyzed_content:
-            yield {"type": "status", "step": "analysis", "message": "Running Semantic Analysis..."}
-            context_keyword = f"{topic} (Type: {content_type}, Target: {target_group}, Related: {', '.join(related_searches[:5])})"
-            
-            report["semantic_analysis"] = await asyncio.to_thread(
-                self._semantic_client.analyze, analyzed_content, context_keyword, language=language
-            )
-            yield {"type": "data", "key": "semantic_analysis", "data": report["semantic_analysis"]}
-            
-            # Step 4: Briefing
-            yield {"type": "status", "step": "briefing", "message": "Generating Content Briefing..."}
-            report["briefing"] = await asyncio.to_thread(
-                self._briefing_client.generate_briefing, report, language=language
-            )
-            yield {"type": "data", "key": "briefing", "data": report["briefing"]}
-            
-            # Step 5: Evaluation: Skip for now
-            # yield {"type": "status", "step": "evaluation", "message": "Evaluating Briefing..."}
-            # report["evaluation"] = await asyncio.to_thread(
-            #     self._eval_client.evaluate, report["briefing"], report
-            # )
-            # yield {"type": "data", "key": "evaluation", "data": report["evaluation"]}
+        try:
+            async for event in self._stream(run, ["research", "competitors", "report"], spans):
+                yield event
 
+            # Step 4: Briefing
+            if run.values["analyzed_content"] and not preview:
+                async for event in self._stream(run, ["briefing"], spans):
+                    yield event
+
+            # Step 5: Evaluation: Skip for now (the "evaluation" step of the DAG)
+        finally:
+            # Stop waiting on work that is no longer needed (e.g. the client disconnected)
+            run.cancel()
+
+        report = {**run.values["report"], "briefing": run.values.get("briefing", "")}
+        # Previews skip the LLM stages, so they get their own histogram series
+        record_span("mission_preview" if preview else "mission", time.perf_counter() - mission_started, kind="stage", collector=spans)
+        for event in self._timing_events(spans):
+            yield event
         yield {"type": "complete", "report": report}
 
+    async def _stream(self, run: DagRun, targets: List[str], spans: SpanCollector):
+        """
+        Streams the events of a DagRun, each preceded by the timing spans finished since the last one.
+        """
+        async for event in run.stream(targets):
+            for timing in self._timing_events(spans):
+                yield timing
+            yield event
+
+    @staticmethod
+    def _timing_events(spans: SpanCollector) -> List[Dict[str, Any]]:
+        return [{"type": "timing", **span} for span in spans.drain()]
+
 if __name__ == "__main__":
     agent = SEOAgent()
     # Run async main
@@ -8,6 +8,13 @@ load_dotenv(dotenv_path=env_path)
 
 class Config:
     MAX_COMPETITORS: int = int(os.getenv("MAX_COMPETITORS", "10"))
+    # Quorum parsing: continue once this many usable pages are parsed (0 = wait for every page)
+    PARSE_QUORUM: int = int(os.getenv("PARSE_QUORUM", "0"))
+    # Continue with the pages parsed so far after this many seconds (0 = no deadline)
+    PARSE_DEADLINE_SECONDS: float = float(os.getenv("PARSE_DEADLINE_SECONDS", "0"))
+    # Extra search results parsed as spares for pages that fail or are too short
+    PARSE_OVERFETCH: int = int(os.getenv("PARSE_OVERFETCH", "0"))
+    PARSE_CANDIDATES: int = MAX_COMPETITORS + PARSE_OVERFETCH
     DEFAULT_LOCATION: str = "Germany"
     DEFAULT_LANGUAGE: str = "German"
 
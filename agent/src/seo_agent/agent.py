@@ -3,7 +3,7 @@ import uuid
 from pathlib import Path
 
 from dotenv import load_dotenv
-from google.adk.agents import SequentialAgent
+from google.adk.agents import ParallelAgent, SequentialAgent
 from google.genai import types
 from config import settings
 from .subagents.briefing_evaluator import BriefingEvaluator
@@ -17,18 +17,32 @@ env_path = Path(__file__).resolve().parents[2] / '.env'
 load_dotenv(dotenv_path=env_path)
 
 # Instantiate subagents
-researcher_agent = Researcher()
+keyword_researcher_agent = Researcher(scope="keywords")
+competitor_researcher_agent = Researcher(scope="competitors")
 parser_agent = ContentParser()
 analyzer_agent = SemanticAnalyzer()
 briefing_generator_agent = BriefingGenerator()
 
+# Mirrors the mission DAG (tools/mission_steps.py): keyword research does not feed
+# competitor analysis, so the two branches run side by side before the briefing
+research_and_analysis_agent = ParallelAgent(
+    name="Research_And_Analysis",
+    description="Researches keywords while finding, parsing and analyzing competitors.",
+    sub_agents=[
+        keyword_researcher_agent,
+        SequentialAgent(
+            name="Competitor_Analysis",
+            description="Finds competitors, parses their pages and analyzes them semantically.",
+            sub_agents=[competitor_researcher_agent, parser_agent, analyzer_agent],
+        ),
+    ],
+)
+
 root_agent = SequentialAgent(
     name="SEO_Root_Agent",
     description="An autonomous agent that researches topics, analyzes competitors, and generates SEO content briefings.",
     sub_agents=[
-        researcher_agent,
-        parser_agent,
-        analyzer_agent,
+        research_and_analysis_agent,
         briefing_generator_agent,
     ],
-)
\ No newline at end of file
+)
@@ -0,0 +1,29 @@
+from typing import Optional
+from config import settings
+from tools.dag import Dag
+from tools.mission_steps import MissionTools, build_mission_dag
+from tools.telemetry import SpanCollector
+from .tools.analysis_tools import briefing_tool, evaluation_tool, semantic_tool, stream_briefing
+from .tools.content_tools import page_cache_stats, parsing_tool
+from .tools.research_tools import custom_search_tool, keyword_tool, serp_tool
+
+# The subagents run the same mission steps as SEOAgent, on the functions behind their ADK tools
+mission_tools = MissionTools(
+    keyword_ideas=keyword_tool.func,
+    serp=serp_tool.func,
+    custom_search=custom_search_tool.func,
+    parse=parsing_tool.func,
+    analyze=semantic_tool.func,
+    generate_briefing=briefing_tool.func,
+    generate_briefing_stream=stream_briefing,
+    evaluate=evaluation_tool.func,
+    page_cache_stats=page_cache_stats
+)
+
+
+def mission_dag(spans: Optional[SpanCollector] = None, quorum: Optional[int] = None, deadline: Optional[float] = None) -> Dag:
+    """
+    The mission DAG wired to the subagent tools. Each subagent asks a run of it
+    for the values it is responsible for.
+    """
+    return build_mission_dag(mission_tools, settings, spans=spans, quorum=quorum, deadline=deadline)
@@ -1,6 +1,5 @@
-import asyncio
-from typing import Dict, Any, List
 from google.adk import Agent
+from ..pipeline import mission_dag
 from ..tools.analysis_tools import evaluation_tool
 from ..models import ReportData, BriefingEvaluatorResult
 
@@ -21,13 +20,10 @@ class BriefingEvaluator(Agent):
         """
         Evaluates the content briefing.
         """
-        evaluation = await asyncio.to_thread(
-            evaluation_tool.func, briefing, report.model_dump()
-        )
-        
+        run = mission_dag().run({"briefing": briefing, "report": report.model_dump()})
+        evaluation = (await run.resolve(["evaluation"]))["evaluation"]
+
         return BriefingEvaluatorResult(
             evaluation=evaluation,
-            logs=[
-                {"type": "data", "key": "evaluation", "data": evaluation}
-            ]
+            logs=run.events
         )
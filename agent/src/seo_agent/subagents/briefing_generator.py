@@ -1,6 +1,5 @@
-import asyncio
-from typing import Dict, Any, List
 from google.adk import Agent
+from ..pipeline import mission_dag
 from ..tools.analysis_tools import briefing_tool
 from config import settings
 from ..models import ReportData, BriefingGeneratorResult
@@ -23,13 +22,10 @@ class BriefingGenerator(Agent):
         """
         Generates the content briefing.
         """
-        briefing = await asyncio.to_thread(
-            briefing_tool.func, report.model_dump(), language=language
-        )
-        
+        run = mission_dag().run({"report": report.model_dump(), "language": language, "stream_briefing": False})
+        briefing = (await run.resolve(["briefing"]))["briefing"]
+
         return BriefingGeneratorResult(
             briefing=briefing,
-            logs=[
-                {"type": "data", "key": "briefing", "data": briefing}
-            ]
+            logs=run.events
         )
@@ -1,6 +1,6 @@
-import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from google.adk import Agent
+from ..pipeline import mission_dag
 from ..tools.content_tools import parsing_tool
 
 class ContentParser(Agent):
@@ -17,36 +17,26 @@ class ContentParser(Agent):
             output_key="parsed_content"
         )
 
-    async def parse(self, urls: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def parse(self, urls: List[Dict[str, str]], quorum: Optional[int] = None, deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Parses content from a list of competitor URLs.
+
+        Args:
+            urls: Competitors in ranking order ({"link", "title", "source"}).
+            quorum: Stop once this many pages have usable content (default PARSE_QUORUM, 0 = wait for all).
+            deadline: Stop after this many seconds with what has been parsed (default PARSE_DEADLINE_SECONDS, 0 = none).
         """
-        result = {
-            "analyzed_content": [],
-            "competitors_with_content": [],
-            "logs": []
+        # The competitors are already known, so they stand in for the search results
+        run = mission_dag(quorum=quorum, deadline=deadline).run({
+            "serp_results": {"competitors": urls, "related_searches": []},
+            "custom_search_results": {"competitors": []}
+        })
+        values = await run.resolve(["analyzed_content", "analyzed_competitors", "duplicates", "dropped"])
+
+        return {
+            "analyzed_content": values["analyzed_content"],
+            "competitors_with_content": values["analyzed_competitors"],
+            "dropped": values["dropped"],
+            "duplicates": values["duplicates"],
+            "logs": run.events
         }
-        
-        parse_tasks = []
-        for comp in urls:
-            parse_tasks.append(asyncio.to_thread(parsing_tool.func, comp['link']))
-        
-        parsed_results = await asyncio.gather(*parse_tasks, return_exceptions=True)
-        
-        for i, res in enumerate(parsed_results):
-            url = urls[i]['link']
-            if isinstance(res, Exception):
-                result["logs"].append({"type": "log", "message": f"[FAIL] {url}: {str(res)}"})
-            elif res.get("word_count", 0) > 50:
-                result["logs"].append({"type": "log", "message": f"[OK] {url} ({res.get('word_count')} words)"})
-                result["analyzed_content"].append(res)
-                result["competitors_with_content"].append({
-                    "title": urls[i].get("title"),
-                    "link": url,
-                    "word_count": res.get("word_count"),
-                    "source": urls[i].get("source")
-                })
-            else:
-                result["logs"].append({"type": "log", "message": f"[SKIP] {url} (Low content)"})
-                
-        return result
@@ -1,6 +1,7 @@
-import asyncio
 from typing import Dict, Any, List
 from google.adk import Agent
+from tools.mission_steps import mission_values
+from ..pipeline import mission_dag
 from ..tools.analysis_tools import semantic_tool
 from config import settings
 
@@ -22,15 +23,12 @@ class SemanticAnalyzer(Agent):
         """
         Performs semantic analysis on the parsed content.
         """
-        context_keyword = f"{topic} (Type: {content_type}, Target: {target_group}, Related: {', '.join(related_searches[:5])})"
-        
-        analysis_result = await asyncio.to_thread(
-            semantic_tool.func, analyzed_content, context_keyword, language=language
-        )
-        
+        values = mission_values(topic, content_type=content_type, target_group=target_group, language=language)
+        values.update(analyzed_content=analyzed_content, related_searches=related_searches)
+        run = mission_dag().run(values)
+        analysis_result = (await run.resolve(["semantic_analysis"]))["semantic_analysis"]
+
         return {
             "semantic_analysis": analysis_result,
-            "logs": [
-                {"type": "data", "key": "semantic_analysis", "data": analysis_result}
-            ]
+            "logs": run.events
         }
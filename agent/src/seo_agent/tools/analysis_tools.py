@@ -1,4 +1,5 @@
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List
 from google.adk.tools import FunctionTool
 from tools.semantic_analysis import SemanticAnalysisClient
 from tools.content_briefing import ContentBriefingClient
@@ -6,6 +7,19 @@ from tools.evaluation import EvaluationClient
 from config import settings
 from seo_agent.models import ReportData
 
+# Clients are built once per process; they share the Gemini client registry
+@lru_cache(maxsize=None)
+def _semantic_client() -> SemanticAnalysisClient:
+    return SemanticAnalysisClient()
+
+@lru_cache(maxsize=None)
+def _briefing_client() -> ContentBriefingClient:
+    return ContentBriefingClient()
+
+@lru_cache(maxsize=None)
+def _evaluation_client() -> EvaluationClient:
+    return EvaluationClient()
+
 def analyze_semantics(analyzed_content: List[Dict[str, Any]], context: str, language: str = settings.DEFAULT_LANGUAGE) -> Dict[str, Any]:
     """
     Performs semantic analysis on parsed content to identify entities, gaps, and opportunities.
@@ -18,8 +32,7 @@ def analyze_semantics(analyzed_content: List[Dict[str, Any]], context: str, lang
     Returns:
         A dictionary containing semantic analysis results.
     """
-    client = SemanticAnalysisClient()
-    return client.analyze(analyzed_content, context, language=language)
+    return _semantic_client().analyze(analyzed_content, context, language=language)
 
 def generate_briefing(report: Dict[str, Any], language: str = settings.DEFAULT_LANGUAGE) -> str:
     """
@@ -32,8 +45,14 @@ def generate_briefing(report: Dict[str, Any], language: str = settings.DEFAULT_L
     Returns:
         The generated briefing in Markdown format.
     """
-    client = ContentBriefingClient()
-    return client.generate_briefing(report, language=language)
+    return _briefing_client().generate_briefing(report, language=language)
+
+def stream_briefing(report: Dict[str, Any], language: str = settings.DEFAULT_LANGUAGE) -> Iterator[str]:
+    """
+    Generates the briefing like generate_briefing, yielding Markdown chunks as they are produced.
+    Not an ADK tool; used when the mission steps stream the briefing.
+    """
+    return _briefing_client().generate_briefing_stream(report, language=language)
 
 def evaluate_briefing(briefing: str, report: Dict[str, Any]) -> str:
     """
@@ -46,8 +65,7 @@ def evaluate_briefing(briefing: str, report: Dict[str, Any]) -> str:
     Returns:
         The evaluation result in Markdown format.
     """
-    client = EvaluationClient()
-    return client.evaluate(briefing, report)
+    return _evaluation_client().evaluate(briefing, report)
 
 semantic_tool = FunctionTool(analyze_semantics)
 briefing_tool = FunctionTool(generate_briefing)
@@ -1,7 +1,13 @@
+from functools import lru_cache
 from typing import Dict, Any, List
 from google.adk.tools import FunctionTool
 from tools.jina_reader import JinaReaderClient
 
+# Built once per process so every tool call reuses the pooled HTTP transport
+@lru_cache(maxsize=None)
+def _jina_client() -> JinaReaderClient:
+    return JinaReaderClient()
+
 def parse_content(url: str) -> Dict[str, Any]:
     """
     Parses the content of a webpage using Jina Reader.
@@ -12,7 +18,12 @@ def parse_content(url: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing the parsed content, title, and word count.
     """
-    client = JinaReaderClient()
-    return client.parse(url)
+    return _jina_client().parse(url)
+
+def page_cache_stats() -> Dict[str, Any]:
+    """
+    Page cache counters of the parsing client. Not an ADK tool.
+    """
+    return _jina_client().cache_stats()
 
 parsing_tool = FunctionTool(parse_content)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Dict, Any
 from google.adk.tools import FunctionTool
 from tools.google_ads import GoogleAdsClient
@@ -5,18 +6,32 @@ from tools.serp_api import SerpApiClient
 from tools.custom_search import CustomSearchClient
 from config import settings
 
-def get_keyword_ideas(topic: str) -> Dict[str, Any]:
+# Clients are built once per process so every tool call reuses the pooled HTTP transport
+@lru_cache(maxsize=None)
+def _ads_client() -> GoogleAdsClient:
+    return GoogleAdsClient()
+
+@lru_cache(maxsize=None)
+def _serp_client() -> SerpApiClient:
+    return SerpApiClient()
+
+@lru_cache(maxsize=None)
+def _custom_search_client() -> CustomSearchClient:
+    return CustomSearchClient()
+
+def get_keyword_ideas(topic: str, location: str = settings.DEFAULT_LOCATION, language: str = settings.DEFAULT_LANGUAGE) -> Dict[str, Any]:
     """
     Retrieves keyword ideas and metrics for a given topic using Google Ads API.
     
     Args:
         topic: The seed keyword or topic to research.
+        location: The target region (e.g., "Germany").
+        language: The target language (e.g., "German").
         
     Returns:
         A dictionary containing main keyword data, related keywords, and proof keywords.
     """
-    client = GoogleAdsClient()
-    return client.get_keyword_ideas(topic)
+    return _ads_client().get_keyword_ideas(topic, location, language)
 
 def search_serp(query: str, location: str) -> Dict[str, Any]:
     """
@@ -29,8 +44,7 @@ def search_serp(query: str, location: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing organic results, related searches, and people also ask.
     """
-    client = SerpApiClient()
-    return client.search(query, location=location)
+    return _serp_client().search(query, location=location)
 
 def custom_search(query: str, num: int) -> Dict[str, Any]:
     """
@@ -43,8 +57,7 @@ def custom_search(query: str, num: int) -> Dict[str, Any]:
     Returns:
         A dictionary containing search items.
     """
-    client = CustomSearchClient()
-    return client.search(query, num=num)
+    return _custom_search_client().search(query, num=num)
 
 keyword_tool = FunctionTool(get_keyword_ideas)
 serp_tool = FunctionTool(search_serp)
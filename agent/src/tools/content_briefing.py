@@ -1,10 +1,14 @@
 import os
 import json
-from typing import Dict, Any
-from google import genai
+import time
+from typing import Dict, Any, Iterator
 from google.genai import types
 from dotenv import load_dotenv
 from pathlib import Path
+from .genai_clients import get_genai_client
+from .prompt_budget import compact_json, estimate_tokens, strip_indentation
+from .rate_limit import throttle_gemini
+from .telemetry import span, usage_attributes
 
 # Load .env
 env_path = Path(__file__).resolve().parents[3] / '.env'
@@ -19,9 +23,10 @@ class ContentBriefingClient:
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY environment variable not set")
         
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = get_genai_client(self.api_key)
         # User requested Gemini 3 Pro Preview
         self.model = "gemini-3-pro-preview" 
+        self.prompt_budget = int(os.getenv("BRIEFING_PROMPT_TOKEN_BUDGET", "6000"))
 
     def generate_briefing(self, report_data: Dict[str, Any], language: str = "German") -> str:
         """
@@ -34,9 +39,79 @@ class ContentBriefingClient:
         Returns:
             Markdown string of the briefing.
         """
-        
-        # Serialize report data for the prompt
-        report_json = json.dumps(report_data, indent=2, ensure_ascii=False)
+        prompt = self._build_prompt(report_data, language)
+
+        with span("gemini", model=self.model, step="briefing") as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(throttle_gemini(prompt), 3)
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="text/plain"
+                    )
+                )
+                attributes.update(usage_attributes(getattr(response, "usage_metadata", None)))
+
+                if not response.text:
+                    attributes["error"] = "empty response"
+                return response.text if response.text else "Error: Empty response from Gemini."
+
+            except Exception as e:
+                print(f"Error generating briefing: {e}")
+                attributes["error"] = str(e)
+                return f"Error generating briefing: {str(e)}"
+
+    def generate_briefing_stream(self, report_data: Dict[str, Any], language: str = "German") -> Iterator[str]:
+        """
+        Generates the briefing like generate_briefing, but yields Markdown chunks as
+        Gemini produces them. Joining all chunks gives the full briefing.
+
+        Args:
+            report_data: The full SEO report (keywords, competitors, semantics).
+            language: The language for the briefing.
+
+        Yields:
+            Markdown text chunks.
+
+        Raises:
+            Exception: If Gemini fails, possibly after some chunks; the error is
+                not appended to the text, so a truncated briefing can be told apart.
+        """
+        prompt = self._build_prompt(report_data, language)
+
+        produced = False
+        with span("gemini", model=self.model, step="briefing", stream=True) as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(throttle_gemini(prompt), 3)
+                started = time.perf_counter()
+                for chunk in self.client.models.generate_content_stream(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="text/plain"
+                    )
+                ):
+                    # The final chunk carries the usage of the whole response
+                    attributes.update(usage_attributes(getattr(chunk, "usage_metadata", None)))
+                    if chunk.text:
+                        if not produced:
+                            attributes["first_chunk_seconds"] = round(time.perf_counter() - started, 3)
+                        produced = True
+                        yield chunk.text
+
+                if not produced:
+                    attributes["error"] = "empty response"
+                    yield "Error: Empty response from Gemini."
+
+            except Exception as e:
+                print(f"Error generating briefing: {e}")
+                attributes["error"] = str(e)
+                raise
+
+    def _build_prompt(self, report_data: Dict[str, Any], language: str) -> str:
+        # Serialize report data for the prompt: compact, without parsed page text, within budget
+        report_json = compact_json(report_data, self.prompt_budget)
 
         prompt = f"""
         You are an SEO Content Strategist. Create a detailed **Content Briefing** based on the provided SEO Report.
@@ -78,21 +153,9 @@ class ContentBriefingClient:
         - Integrate "Entities" and "Proof Keywords" naturally into the outline notes.
         - Adopt a professional but inspiring tone.
         """
-
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="text/plain"
-                )
-            )
-            
-            return response.text if response.text else "Error: Empty response from Gemini."
-
-        except Exception as e:
-            print(f"Error generating briefing: {e}")
-            return f"Error generating briefing: {str(e)}"
+        prompt = strip_indentation(prompt)
+        print(f"Briefing prompt: ~{estimate_tokens(prompt)} tokens (report budget {self.prompt_budget})")
+        return prompt
 
 if __name__ == "__main__":
     # Test with final_report.json if it exists, else dummy
@@ -1,28 +1,44 @@
 import os
 import requests
 from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
+from .query_cache import QueryCache, default_cache
+from .transport import get_session
+from .single_flight import get_flight
+from .rate_limit import QuotaExceededError, get_rate_limiter
+from .telemetry import bind_context, span
 
 # Load .env from project root
 env_path = Path(__file__).resolve().parents[3] / '.env'
 load_dotenv(dotenv_path=env_path)
 
+MAX_RESULTS_PER_REQUEST = 10
+CUSTOM_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+
+
 class CustomSearchClient:
     """
     A light wrapper around the Google Custom Search JSON API.
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[QueryCache] = None, session: Optional[requests.Session] = None, base_url: Optional[str] = None):
         self.api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
         self.cx = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
-        self.base_url = "https://www.googleapis.com/customsearch/v1"
+        # Overridable to point at a stand-in server for load tests
+        self.base_url = base_url or os.getenv("CUSTOM_SEARCH_BASE_URL", CUSTOM_SEARCH_URL)
+        self.cache = cache if cache is not None else default_cache(self.base_url, CUSTOM_SEARCH_URL)
+        self.session = session or get_session()
+        # Every result page counts against the daily query quota
+        self.rate_limiter = get_rate_limiter("custom_search")
+        self.concurrent_pages = os.getenv("CUSTOM_SEARCH_CONCURRENT_PAGES", "true").lower() not in ("0", "false", "no")
 
         if not self.api_key:
             raise ValueError("GOOGLE_SEARCH_API_KEY environment variable not set")
         if not self.cx:
             raise ValueError("GOOGLE_SEARCH_ENGINE_ID environment variable not set")
 
-    def search(self, query: str, country: str = "de", language: str = "lang_de", num: int = 10) -> Dict[str, Any]:
+    def search(self, query: str, country: str = "de", language: str = "lang_de", num: int = 10, concurrent: Optional[bool] = None) -> Dict[str, Any]:
         """
         Perform a search using the Google Custom Search API.
 
@@ -32,58 +48,80 @@ class CustomSearchClient:
             language: The language to restrict results to (e.g., 'lang_de' for German).
             num: Number of results to return. Note: API returns max 10 per request.
                  If num > 10, multiple requests will be made (up to 100 results max usually).
+            concurrent: Fetch all result pages in parallel instead of one after another.
+                 Defaults to the CUSTOM_SEARCH_CONCURRENT_PAGES environment variable (on).
 
         Returns:
             A dictionary containing the combined results.
             'items' will contain the list of all found items.
             'searchInformation' will be from the last request (or aggregated).
         """
-        all_items = []
-        start_index = 1
-        max_results_per_request = 10
-        
+        if concurrent is None:
+            concurrent = self.concurrent_pages
+
+        params = {"q": query, "cx": self.cx, "gl": country, "lr": language, "num": num}
+
+        def run():
+            if not self.cache:
+                return self._search(query, country, language, num, concurrent)
+            return self.cache.get_or_fetch("custom_search", params, lambda: self._search(query, country, language, num, concurrent))
+
+        # Identical searches running at the same time (e.g. in parallel missions) share one request
+        return get_flight("custom_search").do(QueryCache.key("custom_search", params), run)
+
+    def _search(self, query: str, country: str, language: str, num: int, concurrent: bool) -> Dict[str, Any]:
         # Safety limit to prevent infinite loops or excessive quota usage
         max_allowed = 100 
         if num > max_allowed:
             num = max_allowed
 
+        if concurrent and num > MAX_RESULTS_PER_REQUEST:
+            return self._search_concurrent(query, country, language, num)
+        return self._search_sequential(query, country, language, num)
+
+    def _fetch_page(self, query: str, country: str, language: str, start_index: int, batch_num: int) -> Dict[str, Any]:
+        params = {
+            "key": self.api_key,
+            "cx": self.cx,
+            "q": query,
+            "gl": country,
+            "lr": language,
+            "num": batch_num,
+            "start": start_index
+        }
+        with span("custom_search", query=query, start=start_index) as attributes:
+            attributes["rate_limit_wait"] = round(self.rate_limiter.acquire(), 3)
+            response = self.session.get(self.base_url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+    def _search_sequential(self, query: str, country: str, language: str, num: int) -> Dict[str, Any]:
+        all_items = []
+        start_index = 1
         combined_response = {}
 
         while len(all_items) < num:
             # Calculate how many to fetch in this batch
             remaining = num - len(all_items)
-            batch_num = min(remaining, max_results_per_request)
-
-            params = {
-                "key": self.api_key,
-                "cx": self.cx,
-                "q": query,
-                "gl": country,
-                "lr": language,
-                "num": batch_num,
-                "start": start_index
-            }
+            batch_num = min(remaining, MAX_RESULTS_PER_REQUEST)
 
             try:
-                response = requests.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if "items" in data:
-                    all_items.extend(data["items"])
+                data = self._fetch_page(query, country, language, start_index, batch_num)
+                page_items = data.get("items", [])
+                all_items.extend(page_items)
                 
                 # Keep the last response metadata, but update items
                 combined_response = data
                 combined_response["items"] = all_items
 
                 # Check if we have reached the end of results
-                if "items" not in data or len(data["items"]) < batch_num:
+                if len(page_items) < batch_num:
                     break
                 
                 # Prepare for next page
-                start_index += len(data["items"])
+                start_index += len(page_items)
                 
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, QuotaExceededError) as e:
                 print(f"Error performing search at start_index {start_index}: {e}")
                 if not combined_response:
                     return {"error": str(e)}
@@ -91,6 +129,51 @@ class CustomSearchClient:
 
         return combined_response
 
+    def _search_concurrent(self, query: str, country: str, language: str, num: int) -> Dict[str, Any]:
+        """
+        Fetches every result page at once (the start offsets are known up front)
+        and merges them in page order. Pages after the first short or failed page
+        are cancelled if not yet started, and ignored otherwise.
+        """
+        pages = [
+            (start_index, min(MAX_RESULTS_PER_REQUEST, num - start_index + 1))
+            for start_index in range(1, num + 1, MAX_RESULTS_PER_REQUEST)
+        ]
+
+        all_items = []
+        combined_response = {}
+
+        executor = ThreadPoolExecutor(max_workers=len(pages), thread_name_prefix="custom-search-page")
+        try:
+            futures = [
+                executor.submit(bind_context(self._fetch_page, query, country, language, start_index, batch_num))
+                for start_index, batch_num in pages
+            ]
+
+            for (start_index, batch_num), future in zip(pages, futures):
+                try:
+                    data = future.result()
+                except (requests.exceptions.RequestException, QuotaExceededError) as e:
+                    print(f"Error performing search at start_index {start_index}: {e}")
+                    if not combined_response:
+                        return {"error": str(e)}
+                    break # Return what we have so far
+
+                page_items = data.get("items", [])
+                all_items.extend(page_items)
+
+                combined_response = data
+                combined_response["items"] = all_items
+
+                # Check if we have reached the end of results
+                if len(page_items) < batch_num:
+                    break
+        finally:
+            # Don't wait for trailing pages once the result set is complete
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return combined_response
+
 if __name__ == "__main__":
     # Example usage
     try:
@@ -0,0 +1,244 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_DONE = object()
+
+
+@dataclass
+class Step:
+    """
+    One node of a Dag.
+
+    Attributes:
+        name: Unique step name.
+        func: Coroutine function called as func(ctx, **inputs). Returns the value of
+            its single output, or a dict with one entry per output.
+        inputs: Values the step needs before it starts; passed as keyword arguments.
+        outputs: Values the step produces (default: a single value named like the step).
+        lazy: Values the step awaits itself while running (ctx.future / ctx.wait),
+            e.g. to start working on the first of several results.
+    """
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    lazy: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        self.inputs = tuple(self.inputs)
+        self.outputs = tuple(self.outputs) or (self.name,)
+        self.lazy = tuple(self.lazy)
+
+
+class Dag:
+    """
+    A set of steps wired by the values they consume and produce. Independent
+    steps run concurrently; see DagRun.
+    """
+    def __init__(self, steps: Iterable[Step]):
+        self.steps: Dict[str, Step] = {}
+        self.producers: Dict[str, Step] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step '{step.name}'")
+            self.steps[step.name] = step
+            for output in step.outputs:
+                if output in self.producers:
+                    raise ValueError(f"'{output}' is produced by both '{self.producers[output].name}' and '{step.name}'")
+                self.producers[output] = step
+        # Fails early on cycles
+        self.layers()
+
+    def dependencies(self, step: Step) -> Set[str]:
+        """
+        Names of the steps producing a step's inputs (eager and lazy).
+        """
+        return {self.producers[name].name for name in step.inputs + step.lazy if name in self.producers}
+
+    def layers(self) -> List[List[str]]:
+        """
+        Groups the steps so that each one only depends on steps of earlier
+        groups; the steps of one group can run at the same time.
+
+        Raises:
+            ValueError: If the steps form a cycle.
+        """
+        remaining = {name: self.dependencies(step) for name, step in self.steps.items()}
+        layers = []
+        while remaining:
+            layer = [name for name, deps in remaining.items() if not deps & remaining.keys()]
+            if not layer:
+                raise ValueError(f"Cycle between steps: {', '.join(sorted(remaining))}")
+            layers.append(layer)
+            for name in layer:
+                del remaining[name]
+        return layers
+
+    def plan(self, targets: Iterable[str], available: Iterable[str] = ()) -> List[Step]:
+        """
+        The steps needed to compute `targets` when the `available` values are already known.
+
+        Raises:
+            ValueError: If a needed value is neither available nor produced by a step.
+        """
+        available = set(available)
+        needed: Dict[str, Step] = {}
+
+        def visit(value: str):
+            if value in available:
+                return
+            step = self.producers.get(value)
+            if step is None:
+                raise ValueError(f"No step produces '{value}' and no value was given")
+            if step.name in needed:
+                return
+            needed[step.name] = step
+            for name in step.inputs + step.lazy:
+                visit(name)
+
+        for target in targets:
+            visit(target)
+        return list(needed.values())
+
+    def run(self, values: Optional[Dict[str, Any]] = None) -> "DagRun":
+        return DagRun(self, values)
+
+
+class StepContext:
+    """
+    Handed to every step: emits events and awaits lazy inputs.
+    """
+    def __init__(self, run: "DagRun", step: Step):
+        self.run = run
+        self.step = step
+
+    def emit(self, event: Dict[str, Any]):
+        """
+        Publishes an event (e.g. a status or log event). Call it on the event loop.
+        """
+        self.run._emit(event)
+
+    def future(self, name: str) -> asyncio.Future:
+        if name not in self.step.inputs + self.step.lazy:
+            raise ValueError(f"Step '{self.step.name}' does not declare '{name}' as an input")
+        return self.run._future(name)
+
+    async def wait(self, name: str) -> Any:
+        return await self.future(name)
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds since the run started.
+        """
+        return time.perf_counter() - self.run.started_at
+
+
+class DagRun:
+    """
+    One execution of a Dag, e.g. one mission. Given and computed values are
+    memoized: asking for further targets later only runs the steps still missing,
+    and a step runs at most once per run.
+
+    Every step of a plan starts as a task right away and waits for its inputs,
+    so steps whose inputs are ready run concurrently.
+    """
+    def __init__(self, dag: Dag, values: Optional[Dict[str, Any]] = None):
+        self.dag = dag
+        self.values: Dict[str, Any] = dict(values or {})
+        self.events: List[Dict[str, Any]] = []
+        self.timings: Dict[str, float] = {}
+        self.started_at = time.perf_counter()
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._queue: Optional[asyncio.Queue] = None
+
+    def _future(self, name: str) -> asyncio.Future:
+        future = self._futures.get(name)
+        if future is None:
+            future = self._futures[name] = asyncio.get_running_loop().create_future()
+            if name in self.values:
+                future.set_result(self.values[name])
+        return future
+
+    def _emit(self, event: Dict[str, Any]):
+        self.events.append(event)
+        if self._queue is not None:
+            self._queue.put_nowait(event)
+
+    def _start(self, targets: Iterable[str]):
+        for step in self.dag.plan(targets, self.values):
+            if step.name not in self._tasks:
+                self._tasks[step.name] = asyncio.create_task(self._execute(step), name=f"dag-step-{step.name}")
+
+    async def _execute(self, step: Step):
+        outputs = [self._future(name) for name in step.outputs]
+        try:
+            inputs = {name: await self._future(name) for name in step.inputs}
+            started = time.perf_counter()
+            result = await step.func(StepContext(self, step), **inputs)
+            self.timings[step.name] = time.perf_counter() - started
+            if len(step.outputs) == 1:
+                result = {step.outputs[0]: result}
+            missing = [name for name in step.outputs if name not in result]
+            if missing:
+                raise ValueError(f"Step '{step.name}' did not return {', '.join(missing)}")
+        except asyncio.CancelledError:
+            for future in outputs:
+                future.cancel()
+            raise
+        except Exception as e:
+            # Dependents fail with the same error; exception() marks it as retrieved
+            for future in outputs:
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+            return
+        for name, future in zip(step.outputs, outputs):
+            self.values[name] = result[name]
+            if not future.done():
+                future.set_result(result[name])
+
+    async def stream(self, targets: Iterable[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Runs the steps needed for `targets` and yields the events they emit as
+        they happen. Ends once every target is computed.
+
+        Raises:
+            Exception: The error of the first failed step the targets depend on.
+        """
+        targets = list(targets)
+        self._queue = queue = asyncio.Queue()
+        self._start(targets)
+        waiter = asyncio.ensure_future(asyncio.gather(*(self._future(name) for name in targets)))
+        waiter.add_done_callback(lambda _: queue.put_nowait(_DONE))
+        try:
+            while True:
+                event = await queue.get()
+                if event is _DONE:
+                    break
+                yield event
+            waiter.result()
+        finally:
+            self._queue = None
+            if not waiter.done():
+                waiter.cancel()
+
+    async def resolve(self, targets: Iterable[str]) -> Dict[str, Any]:
+        """
+        Computes `targets` (collecting the emitted events in `events`) and returns their values.
+        """
+        targets = list(targets)
+        async for _ in self.stream(targets):
+            pass
+        return {name: self.values[name] for name in targets}
+
+    def cancel(self):
+        """
+        Cancels the steps still running, e.g. when the consumer went away.
+        """
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
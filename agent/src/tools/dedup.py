@@ -0,0 +1,97 @@
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SHINGLE_WORDS = 4
+NUM_PERMUTATIONS = 128
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+")
+
+# Fixed seed: signatures must be comparable across calls and processes
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, (1 << 31) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 31) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature of the word 4-shingles of `text`.
+    The share of equal positions in two signatures estimates their Jaccard similarity.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    # (a * x + b) mod p for every permutation and shingle; a < 2^31 and x < 2^32 cannot overflow
+    permuted = (np.outer(hashes, _A) + _B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+def near_duplicate_groups(articles: List[Dict[str, Any]], threshold: Optional[float] = None) -> Tuple[List[int], List[Tuple[int, int, float]]]:
+    """
+    Finds near-duplicate pages (syndicated content, locale or subdomain variants).
+
+    Pages whose estimated Jaccard similarity reaches `threshold` form a group; the
+    richest variant (most words) represents it at the position of the group's best-ranked page.
+
+    Args:
+        articles: Parsed pages in ranking order ({"main_content", "word_count", ...}).
+        threshold: Similarity from which pages count as duplicates (default DEDUP_THRESHOLD, 0.8).
+
+    Returns:
+        The indices of the kept pages in ranking order, and (duplicate, kept, similarity) per collapsed page.
+    """
+    if threshold is None:
+        threshold = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+    if len(articles) < 2:
+        return list(range(len(articles))), []
+
+    signatures = np.vstack([minhash_signature(article.get("main_content", "")) for article in articles])
+    similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+
+    # Union-find over all pairs above the threshold
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(similarity >= threshold, k=1))):
+        parent[find(int(j))] = find(int(i))
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        groups.setdefault(find(i), []).append(i)
+
+    kept = []
+    duplicates = []
+    for members in sorted(groups.values(), key=min):
+        richest = max(members, key=lambda i: (articles[i].get("word_count", 0), -i))
+        kept.append(richest)
+        duplicates.extend((i, richest, round(float(similarity[i, richest]), 2)) for i in members if i != richest)
+    return kept, duplicates
+
+
+def collapse_near_duplicates(articles: List[Dict[str, Any]], threshold: Optional[float] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Drops near-duplicate pages, keeping the richest variant of each group.
+
+    Returns:
+        The kept pages in ranking order, and one {"url", "duplicate_of", "similarity"} entry per collapsed page.
+    """
+    kept, duplicates = near_duplicate_groups(articles, threshold)
+    return [articles[i] for i in kept], [
+        {"url": articles[i].get("url"), "duplicate_of": articles[k].get("url"), "similarity": similarity}
+        for i, k, similarity in duplicates
+    ]
+
+
+def dedup_enabled() -> bool:
+    return os.getenv("DEDUP_ENABLED", "true").lower() not in ("0", "false", "no")
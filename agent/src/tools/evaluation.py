@@ -1,9 +1,12 @@
 import os
 from typing import Dict, Any
-from google import genai
 from google.genai import types
 from dotenv import load_dotenv
 from pathlib import Path
+from .genai_clients import get_genai_client
+from .prompt_budget import compact_json, estimate_tokens, strip_indentation
+from .rate_limit import throttle_gemini
+from .telemetry import span, usage_attributes
 
 # Load .env
 env_path = Path(__file__).resolve().parents[3] / '.env'
@@ -18,8 +21,9 @@ class EvaluationClient:
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY environment variable not set")
         
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = get_genai_client(self.api_key)
         self.model = "gemini-3-pro-preview"
+        self.prompt_budget = int(os.getenv("EVALUATION_PROMPT_TOKEN_BUDGET", "6000"))
 
     def evaluate(self, briefing: str, report_data: Dict[str, Any]) -> str:
         """
@@ -37,7 +41,7 @@ class EvaluationClient:
         You are a Senior SEO Editor. Evaluate the following Content Briefing against the provided SEO Data.
         
         SEO DATA:
-        {report_data}
+        {compact_json(report_data, self.prompt_budget)}
         
         CONTENT BRIEFING:
         {briefing}
@@ -52,17 +56,25 @@ class EvaluationClient:
         OUTPUT:
         Provide a concise "Evaluation Report" with specific recommendations for improvement.
         """
+        prompt = strip_indentation(prompt)
+        print(f"Evaluation prompt: ~{estimate_tokens(prompt)} tokens (report budget {self.prompt_budget})")
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="text/plain"
+        with span("gemini", model=self.model, step="evaluation") as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(throttle_gemini(prompt), 3)
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="text/plain"
+                    )
                 )
-            )
-            
-            return response.text if response.text else "Error: Empty response from Gemini."
+                attributes.update(usage_attributes(getattr(response, "usage_metadata", None)))
 
-        except Exception as e:
-            return f"Error evaluating briefing: {str(e)}"
+                if not response.text:
+                    attributes["error"] = "empty response"
+                return response.text if response.text else "Error: Empty response from Gemini."
+
+            except Exception as e:
+                attributes["error"] = str(e)
+                return f"Error evaluating briefing: {str(e)}"
@@ -0,0 +1,64 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+from google import genai
+from google.genai import types
+
+_clients: Dict[str, Any] = {}
+_factory: Optional[Callable[[str], Any]] = None
+_lock = threading.Lock()
+
+
+def _build_client(api_key: str) -> genai.Client:
+    # GEMINI_BASE_URL points all Gemini calls at another endpoint, e.g. a stand-in server for load tests
+    base_url = os.getenv("GEMINI_BASE_URL")
+    if base_url:
+        return genai.Client(api_key=api_key, http_options=types.HttpOptions(base_url=base_url))
+    return genai.Client(api_key=api_key)
+
+
+def get_genai_client(api_key: Optional[str] = None) -> Any:
+    """
+    Returns the process-wide Gemini client for an API key.
+
+    A genai.Client is not bound to a model, so one client (and its HTTP
+    connection pool) per API key is shared by every model and every caller,
+    both in SEOAgent and in the ADK subagent tools. Tool classes that are
+    instantiated per call therefore still reuse its connections.
+
+    Args:
+        api_key: The Gemini API key. Defaults to GOOGLE_API_KEY.
+
+    Returns:
+        A genai.Client, or whatever the factory installed with set_genai_client_factory returns.
+    """
+    api_key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable not set")
+
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            factory = _factory or _build_client
+            client = factory(api_key)
+            _clients[api_key] = client
+        return client
+
+
+def set_genai_client_factory(factory: Optional[Callable[[str], Any]]):
+    """
+    Replaces how Gemini clients are built, e.g. to inject a fake client in tests.
+    Passing None restores the real genai.Client. Already registered clients are dropped.
+    """
+    global _factory
+    with _lock:
+        _factory = factory
+        _clients.clear()
+
+
+def reset_genai_clients():
+    """
+    Drops all registered clients; the next get_genai_client() call builds a new one.
+    """
+    with _lock:
+        _clients.clear()
@@ -1,19 +1,95 @@
 import os
 import json
-from typing import Dict, Any, List
+import time
+import heapq
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
-from google.ads.googleads.client import GoogleAdsClient as LibGoogleAdsClient
-from google.ads.googleads.errors import GoogleAdsException
+from .query_cache import QueryCache, get_query_cache
+from .single_flight import get_flight
+from .rate_limit import QuotaExceededError, get_rate_limiter
+from .telemetry import span
 
 # Load .env - adjusted to check current directory or parents
 load_dotenv()
 
+MAX_SEEDS_PER_REQUEST = 20  # KeywordSeed accepts at most 20 keywords
+
+# The client library (gRPC, protos) takes a while to import, so it is loaded on
+# first use; assigning a replacement before that (e.g. a replay) skips the import
+LibGoogleAdsClient = None
+
+
+def _library():
+    global LibGoogleAdsClient
+    if LibGoogleAdsClient is None:
+        from google.ads.googleads.client import GoogleAdsClient as LibGoogleAdsClient
+    return LibGoogleAdsClient
+
+# Geo target and language constants for the locations/languages missions use
+LOCATION_IDS = {
+    "germany": "2276",
+    "austria": "2040",
+    "switzerland": "2756",
+    "united states": "2840",
+    "united kingdom": "2826",
+    "france": "2250",
+    "spain": "2724",
+    "italy": "2380",
+    "netherlands": "2528",
+}
+LANGUAGE_IDS = {
+    "german": "1001",
+    "english": "1000",
+    "french": "1002",
+    "spanish": "1003",
+    "italian": "1004",
+    "dutch": "1010",
+}
+
+
+def resolve_location_id(location: str, default: str = "2276") -> str:
+    """
+    Maps a location name (e.g. 'Austria') or a geo target constant ID to the ID.
+    """
+    if location.isdigit():
+        return location
+    if location.lower() not in LOCATION_IDS:
+        print(f"Unknown Google Ads location '{location}', using {default}")
+    return LOCATION_IDS.get(location.lower(), default)
+
+
+def resolve_language_id(language: str, default: str = "1001") -> str:
+    """
+    Maps a language name (e.g. 'English') or a language constant ID to the ID.
+    """
+    if language.isdigit():
+        return language
+    if language.lower() not in LANGUAGE_IDS:
+        print(f"Unknown Google Ads language '{language}', using {default}")
+    return LANGUAGE_IDS.get(language.lower(), default)
+
+
+class _SeedBatch:
+    def __init__(self):
+        self.seeds: List[str] = []
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.done = threading.Event()
+
+
 class GoogleAdsClient:
     """
     A wrapper around the Google Ads Python Client Library (v22).
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[QueryCache] = None):
+        self.cache = cache if cache is not None else get_query_cache()
+        self.rate_limiter = get_rate_limiter("google_ads")
+        # Opt-in: concurrent single-seed lookups arriving within this window share one request
+        self.batch_window = float(os.getenv("ADS_SEED_BATCH_WINDOW_MS", "0")) / 1000
+        self._pending: Dict[Tuple[str, str], _SeedBatch] = {}
+        self._pending_lock = threading.Lock()
+
         # Configuration mapping
         self.config = {
             "developer_token": os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN"),
@@ -23,6 +99,9 @@ class GoogleAdsClient:
             "login_customer_id": os.getenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID"),
             "use_proto_plus": True
         }
+        # gRPC endpoint override (e.g. a proxy); the stand-in load-test server does not speak gRPC
+        if os.getenv("GOOGLE_ADS_ENDPOINT"):
+            self.config["endpoint"] = os.getenv("GOOGLE_ADS_ENDPOINT")
 
         # Target Account (Client Account ID)
         self.customer_id = os.getenv("GOOGLE_ADS_CUSTOMER_ID", self.config["login_customer_id"])
@@ -32,12 +111,129 @@ class GoogleAdsClient:
 
         try:
             # Force v22 to ensure 2026 compatibility
-            self.client = LibGoogleAdsClient.load_from_dict(self.config, version="v22")
+            self.client = _library().load_from_dict(self.config, version="v22")
         except Exception as e:
             print(f"Failed to initialize Google Ads Client: {e}")
             raise
 
     def get_keyword_ideas(self, keyword: str, location_id: str = "2276", language_id: str = "1001") -> Dict[str, Any]:
+        """
+        Retrieves keyword ideas and metrics for a seed keyword.
+
+        Args:
+            keyword: The seed keyword.
+            location_id: Geo target constant ID or location name (e.g. '2276' or 'Germany').
+            language_id: Language constant ID or language name (e.g. '1001' or 'German').
+
+        Returns:
+            main_keyword, the top 10 related_keywords by search volume and proof_keywords.
+        """
+        location_id, language_id = resolve_location_id(location_id), resolve_language_id(language_id)
+        params = {"keyword": keyword, "location_id": location_id, "language_id": language_id, "customer_id": self.customer_id}
+
+        def fetch():
+            return self._generate_for_seeds([keyword], location_id, language_id)[keyword]
+
+        def run():
+            if self.batch_window > 0:
+                return self._fetch_batched(keyword, location_id, language_id, params)
+            if not self.cache:
+                return fetch()
+            return self.cache.get_or_fetch("google_ads", params, fetch)
+
+        # Identical keyword lookups running at the same time share one request
+        return get_flight("google_ads").do(QueryCache.key("google_ads", params), run)
+
+    def get_keyword_ideas_batch(self, seeds: List[str], location_id: str = "2276", language_id: str = "1001", top_k: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves keyword ideas for many seeds (e.g. several topics, or a topic and its
+        related searches) with one request per 20 seeds. Ideas are attributed back to
+        the seeds they share the most words with. Cached single-seed results are
+        reused, but only results of single-seed requests are written to the cache.
+
+        Args:
+            seeds: The seed keywords.
+            location_id: Geo target constant ID or location name.
+            language_id: Language constant ID or language name.
+            top_k: Related keywords kept per seed.
+
+        Returns:
+            A result like get_keyword_ideas() per seed.
+        """
+        location_id, language_id = resolve_location_id(location_id), resolve_language_id(language_id)
+        seeds = list(dict.fromkeys(seed for seed in seeds if seed))
+        results = {}
+        missing = []
+        for seed in seeds:
+            # Only default-sized results are shared with get_keyword_ideas() through the cache
+            params = {"keyword": seed, "location_id": location_id, "language_id": language_id, "customer_id": self.customer_id}
+            cached = self.cache.lookup("google_ads", params) if self.cache and top_k == 10 else None
+            if cached is not None:
+                results[seed] = cached
+            else:
+                missing.append(seed)
+
+        for i in range(0, len(missing), MAX_SEEDS_PER_REQUEST):
+            chunk = missing[i:i + MAX_SEEDS_PER_REQUEST]
+            chunk_results = self._generate_for_seeds(chunk, location_id, language_id, top_k)
+            for seed, result in chunk_results.items():
+                results[seed] = result
+                # Ideas of a multi-seed request depend on the other seeds (attribution, ranking)
+                if self.cache and top_k == 10 and len(chunk) == 1 and "error" not in result:
+                    params = {"keyword": seed, "location_id": location_id, "language_id": language_id, "customer_id": self.customer_id}
+                    self.cache.put("google_ads", params, result)
+
+        return {seed: results[seed] for seed in seeds}
+
+    def _fetch_batched(self, keyword: str, location_id: str, language_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fetches one seed, joining other seeds requested within the batch window
+        into a single multi-seed request. Ideas of a multi-seed request depend on
+        the other seeds (attribution, ranking), so only single-seed results are cached.
+        """
+        cached = self.cache.lookup("google_ads", params) if self.cache else None
+        if cached is not None:
+            return cached
+        result, seeds = self._join_batch(keyword, location_id, language_id)
+        if self.cache and seeds == 1:
+            self.cache.put("google_ads", params, result)
+        return result
+
+    def _join_batch(self, keyword: str, location_id: str, language_id: str) -> Tuple[Dict[str, Any], int]:
+        """
+        Returns the seed's result and the number of seeds its request carried.
+        """
+        key = (location_id, language_id)
+        with self._pending_lock:
+            batch = self._pending.get(key)
+            leader = batch is None or len(batch.seeds) >= MAX_SEEDS_PER_REQUEST
+            if leader:
+                batch = _SeedBatch()
+                self._pending[key] = batch
+            if keyword not in batch.seeds:
+                batch.seeds.append(keyword)
+
+        if not leader:
+            batch.done.wait()
+            return batch.results[keyword], len(batch.seeds)
+
+        time.sleep(self.batch_window)
+        with self._pending_lock:
+            if self._pending.get(key) is batch:
+                del self._pending[key]
+        try:
+            if len(batch.seeds) > 1:
+                print(f"Batching {len(batch.seeds)} seeds into one keyword ideas request")
+            batch.results = self._generate_for_seeds(batch.seeds, location_id, language_id)
+        except Exception as e:
+            print(f"Keyword ideas request failed: {e}")
+            batch.results = {seed: {"error": str(e)} for seed in batch.seeds}
+        finally:
+            batch.done.set()
+        return batch.results[keyword], len(batch.seeds)
+
+    def _generate_for_seeds(self, seeds: List[str], location_id: str, language_id: str, top_k: int = 10) -> Dict[str, Dict[str, Any]]:
+        from google.ads.googleads.errors import GoogleAdsException
         keyword_plan_idea_service = self.client.get_service("KeywordPlanIdeaService")
         customer_id_clean = self.customer_id.replace("-", "")
         
@@ -50,28 +246,54 @@ class GoogleAdsClient:
         
         request.include_adult_keywords = False
         request.keyword_plan_network = self.client.enums.KeywordPlanNetworkEnum.GOOGLE_SEARCH
-        request.keyword_seed.keywords.append(keyword)
+        request.keyword_seed.keywords.extend(seeds)
         
         # Add Concept annotations for categorized results
         request.keyword_annotation.append(
             self.client.enums.KeywordPlanKeywordAnnotationEnum.KEYWORD_CONCEPT
         )
 
-        try:
-            response = keyword_plan_idea_service.generate_keyword_ideas(request=request)
-            return self._process_results(response, keyword)
-        except GoogleAdsException as ex:
-            print(f"Request {ex.request_id} failed. Status: {ex.error.code().name}")
-            for error in ex.failure.errors:
-                print(f"\tDetail: {error.message}")
-            return {"error": ex.failure.errors[0].message}
-
-    def _process_results(self, response, seed_keyword: str) -> Dict[str, Any]:
-        main_keyword_data = None
-        related_keywords = []
-        word_counts = {}
+        with span("google_ads", seeds=len(seeds)) as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(self.rate_limiter.acquire(), 3)
+                # The pager fetches further pages lazily while the results are consumed
+                response = keyword_plan_idea_service.generate_keyword_ideas(request=request)
+                return self._process_results(response, seeds, top_k)
+            except GoogleAdsException as ex:
+                print(f"Request {ex.request_id} failed. Status: {ex.error.code().name}")
+                for error in ex.failure.errors:
+                    print(f"\tDetail: {error.message}")
+                attributes["error"] = ex.error.code().name
+                return {seed: {"error": ex.failure.errors[0].message} for seed in seeds}
+            except QuotaExceededError as e:
+                print(f"Keyword ideas request skipped: {e}")
+                attributes["error"] = str(e)
+                return {seed: {"error": str(e)} for seed in seeds}
+
+    @staticmethod
+    def _owners(text: str, seed_words: Dict[str, set]) -> List[str]:
+        """
+        Seeds an idea is attributed to: those sharing the most words with it.
+        With a single seed, every idea belongs to it.
+        """
+        if len(seed_words) == 1:
+            return list(seed_words)
+        words = set(text.lower().split())
+        overlaps = {seed: len(words & seed_set) for seed, seed_set in seed_words.items()}
+        best = max(overlaps.values())
+        return [seed for seed, overlap in overlaps.items() if overlap == best] if best else []
+
+    def _process_results(self, response, seeds: List[str], top_k: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Streams the ideas once, keeping a bounded min-heap of the top_k ideas by
+        search volume per seed instead of collecting and sorting all of them.
+        """
+        seed_words = {seed: set(seed.lower().split()) for seed in seeds}
+        main_keywords: Dict[str, Dict[str, Any]] = {}
+        heaps: Dict[str, list] = {seed: [] for seed in seeds}
+        word_counts: Dict[str, Dict[str, int]] = {seed: {} for seed in seeds}
         
-        for result in response:
+        for position, result in enumerate(response):
             text = result.text
             metrics = result.keyword_idea_metrics
             
@@ -85,28 +307,37 @@ class GoogleAdsClient:
                 "avg_searches": avg_searches,
                 "competition": competition
             }
-            
-            if text.lower() == seed_keyword.lower():
-                main_keyword_data = item
-            else:
-                related_keywords.append(item)
-                
-            # Proof-keyword extraction logic
-            for word in text.split():
-                clean_word = word.lower().strip(".,!?")
-                if len(clean_word) > 3 and clean_word not in seed_keyword.lower():
-                    word_counts[clean_word] = word_counts.get(clean_word, 0) + 1
-
-        # Sorting
-        related_keywords.sort(key=lambda x: x["avg_searches"] or 0, reverse=True)
-        sorted_proof = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-        proof_keywords = [word for word, count in sorted_proof[:8]]
-
-        return {
-            "main_keyword": main_keyword_data,
-            "related_keywords": related_keywords[:10],
-            "proof_keywords": proof_keywords
-        }
+
+            exact = [seed for seed in seeds if text.lower() == seed.lower()]
+            for seed in exact:
+                main_keywords[seed] = item
+            if exact:
+                continue
+
+            for seed in self._owners(text, seed_words):
+                # Earlier ideas win ties, as with a stable sort
+                entry = (avg_searches or 0, -position, item)
+                if len(heaps[seed]) < top_k:
+                    heapq.heappush(heaps[seed], entry)
+                elif entry[:2] > heaps[seed][0][:2]:
+                    heapq.heapreplace(heaps[seed], entry)
+
+                # Proof-keyword extraction logic
+                for word in text.split():
+                    clean_word = word.lower().strip(".,!?")
+                    if len(clean_word) > 3 and clean_word not in seed.lower():
+                        word_counts[seed][clean_word] = word_counts[seed].get(clean_word, 0) + 1
+
+        results = {}
+        for seed in seeds:
+            related_keywords = [item for _, _, item in sorted(heaps[seed], key=lambda entry: entry[:2], reverse=True)]
+            top_words = heapq.nlargest(8, word_counts[seed].items(), key=lambda x: x[1])
+            results[seed] = {
+                "main_keyword": main_keywords.get(seed),
+                "related_keywords": related_keywords,
+                "proof_keywords": [word for word, count in top_words]
+            }
+        return results
 
 # --- TEST FUNCTION ---
 if __name__ == "__main__":
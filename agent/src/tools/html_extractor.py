@@ -0,0 +1,329 @@
+import os
+import re
+import requests
+from html import unescape
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Union
+from .transport import get_session
+
+# Elements that never hold main content
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "form", "button", "select",
+    "nav", "footer", "header", "aside", "head", "dialog", "picture", "video", "audio", "object"
+}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "ul", "ol", "li", "table", "tr", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "dl", "dt", "dd", "figure", "figcaption", "body"
+}
+# Opening one of these closes an open <p>, like browsers do; the search stops at these scopes
+CLOSES_P = BLOCK_TAGS - {"body"}
+SCOPE_TAGS = {"html", "table", "td", "th", "caption", "button", "object", "template"}
+# Opening an item closes the open sibling item of its list
+IMPLIED_END = {"li": ({"li"}, {"ul", "ol"}), "dt": ({"dt", "dd"}, {"dl"}), "dd": ({"dt", "dd"}, {"dl"})}
+# Deeper elements are flattened into their ancestor, which bounds the recursive rendering
+MAX_DEPTH = 200
+# class/id fragments of boilerplate containers (cookie banners, menus, share bars, ...)
+BOILERPLATE = re.compile(
+    r"cookie|consent|banner|navbar|nav-|menu|footer|sidebar|breadcrumb|share|social|newsletter|"
+    r"comment|popup|modal|advert|sponsor|related|subscribe|skip-link|offcanvas",
+    re.IGNORECASE
+)
+_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w-]+)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+Node = Dict[str, Any]
+
+
+class _TreeBuilder(HTMLParser):
+    """
+    Builds a minimal element tree, dropping skipped and boilerplate subtrees as it goes.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root: Node = {"tag": "document", "attrs": {}, "children": []}
+        self.stack: List[Node] = [self.root]
+        self.skip_depth = 0
+        self.title = ""
+        self.meta_title = ""
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "meta" and attrs.get("property") == "og:title":
+            self.meta_title = attrs.get("content", "")
+        if tag == "title":
+            self._in_title = True
+        if tag in VOID_TAGS:
+            if tag == "br" and not self.skip_depth:
+                self.stack[-1]["children"].append({"tag": "br", "attrs": {}, "children": []})
+            return
+
+        if self.skip_depth:
+            self.skip_depth += 1
+            return
+        if tag in IMPLIED_END:
+            self._close(*IMPLIED_END[tag])
+        if tag in CLOSES_P:
+            self._close({"p"}, SCOPE_TAGS)
+        marker = f"{attrs.get('class', '')} {attrs.get('id', '')} {attrs.get('role', '')}"
+        boilerplate = tag not in ("html", "body", "main", "article") and (
+            BOILERPLATE.search(marker) or attrs.get("role") in ("navigation", "banner", "contentinfo") or "hidden" in attrs
+        )
+        if tag in SKIPPED_TAGS or boilerplate:
+            self.skip_depth = 1
+            return
+        if len(self.stack) > MAX_DEPTH:
+            return
+        node = {"tag": tag, "attrs": attrs, "children": []}
+        self.stack[-1]["children"].append(node)
+        self.stack.append(node)
+
+    def _close(self, tags: set, scope: set):
+        """
+        Closes the innermost open element of `tags` unless a `scope` element is opened after it.
+        """
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i]["tag"] in tags:
+                del self.stack[i:]
+                return
+            if self.stack[i]["tag"] in scope:
+                return
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        if tag in VOID_TAGS:
+            return
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        # Close up to the matching element; tolerate unclosed children
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i]["tag"] == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self.skip_depth and len(self.stack) > 1:
+            self.stack[-1]["children"].append(data)
+
+
+def _text_length(node: Union[Node, str]) -> int:
+    total = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, str):
+            total += len(node.strip())
+        else:
+            pending.extend(node["children"])
+    return total
+
+
+def _link_text_length(node: Union[Node, str]) -> int:
+    total = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, str):
+            continue
+        if node["tag"] == "a":
+            total += _text_length(node)
+        else:
+            pending.extend(node["children"])
+    return total
+
+
+def _find_all(node: Node, tags: set) -> List[Node]:
+    found = []
+    # Document order: children are pushed in reverse
+    pending = [child for child in reversed(node["children"]) if isinstance(child, dict)]
+    while pending:
+        child = pending.pop()
+        if child["tag"] in tags or child["attrs"].get("role") == "main":
+            found.append(child)
+        pending.extend(grandchild for grandchild in reversed(child["children"]) if isinstance(grandchild, dict))
+    return found
+
+
+class _MarkdownRenderer:
+    def __init__(self):
+        self.blocks: List[str] = []
+        self.line: List[str] = []
+
+    def flush(self, prefix: str = ""):
+        text = _WHITESPACE.sub(" ", "".join(self.line)).strip()
+        if text:
+            self.blocks.append(prefix + text)
+        self.line = []
+
+    def render(self, node: Union[Node, str], list_prefix: str = "- "):
+        if isinstance(node, str):
+            self.line.append(node)
+            return
+        tag = node["tag"]
+        if tag == "br":
+            self.line.append(" ")
+            return
+        # Link lists inside content (tag clouds, in-page menus) are noise for analysis
+        if tag in ("ul", "ol", "div", "section", "p", "table") and _text_length(node):
+            if _link_text_length(node) / _text_length(node) > 0.6:
+                return
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self.flush()
+            for child in node["children"]:
+                self.render(child)
+            self.flush("#" * int(tag[1]) + " ")
+        elif tag == "li":
+            self.flush()
+            start = len(self.blocks)
+            for child in node["children"]:
+                self.render(child, list_prefix)
+            self.flush(list_prefix)
+            # Nested blocks (<li><p>...) flush without the bullet; put it on the item's first block
+            if len(self.blocks) > start and not self.blocks[start].startswith(list_prefix):
+                self.blocks[start] = list_prefix + self.blocks[start]
+        elif tag in ("ul", "ol"):
+            self.flush()
+            for i, child in enumerate(c for c in node["children"] if not isinstance(c, str) or c.strip()):
+                self.render(child, f"{i + 1}. " if tag == "ol" else "- ")
+            self.flush()
+        elif tag in ("strong", "b"):
+            self.line.append(" **")
+            for child in node["children"]:
+                self.render(child)
+            self.line.append("** ")
+        elif tag == "tr":
+            self.flush()
+            cells = []
+            for cell in node["children"]:
+                if isinstance(cell, dict):
+                    cell_renderer = _MarkdownRenderer()
+                    cell_renderer.render(cell)
+                    cell_renderer.flush()
+                    cells.append(" ".join(cell_renderer.blocks))
+            if any(cells):
+                self.blocks.append("| " + " | ".join(cells) + " |")
+        elif tag == "blockquote":
+            self.flush()
+            for child in node["children"]:
+                self.render(child)
+            self.flush("> ")
+        elif tag in BLOCK_TAGS:
+            self.flush()
+            for child in node["children"]:
+                self.render(child, list_prefix)
+            self.flush()
+        else:
+            for child in node["children"]:
+                self.render(child, list_prefix)
+
+
+def extract(html: str, url: str) -> Dict[str, Any]:
+    """
+    Extracts the main content of an HTML page as Markdown.
+
+    Boilerplate (navigation, headers/footers, cookie banners, link lists, scripts)
+    is dropped; the largest <article>/<main> element is used if the page has one.
+
+    Args:
+        html: The page source.
+        url: The page URL.
+
+    Returns:
+        The same shape as JinaReaderClient.parse: url, title, word_count, main_content.
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+
+    candidates = _find_all(builder.root, {"article", "main"})
+    root = max(candidates, key=_text_length) if candidates else builder.root
+    # A tiny <article> (e.g. a teaser) is worse than the whole page
+    if candidates and _text_length(root) < 0.25 * _text_length(builder.root):
+        root = builder.root
+
+    renderer = _MarkdownRenderer()
+    renderer.render(root)
+    renderer.flush()
+    content = "\n\n".join(renderer.blocks)
+
+    # og:title usually comes without the " | Site name" suffix of <title>
+    title = unescape(builder.meta_title).strip() or unescape(builder.title).strip()
+    if not title:
+        first_heading = next((block for block in renderer.blocks if block.startswith("# ")), "")
+        title = first_heading[2:] or "No Title Found"
+
+    return {
+        "url": url,
+        "title": _WHITESPACE.sub(" ", title),
+        "word_count": len(content.split()),
+        "main_content": content
+    }
+
+
+class HtmlExtractorClient:
+    """
+    Fetches pages directly through the pooled transport and extracts their main
+    content in-process, without a round trip through Jina Reader.
+    """
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or get_session()
+        self.timeout = (float(os.getenv("LOCAL_EXTRACT_CONNECT_TIMEOUT", "5")), float(os.getenv("LOCAL_EXTRACT_READ_TIMEOUT", "15")))
+        self.headers = {
+            "User-Agent": os.getenv("LOCAL_EXTRACT_USER_AGENT", "Mozilla/5.0 (compatible; GenSEO/1.0)"),
+            "Accept": "text/html,application/xhtml+xml"
+        }
+
+    def parse(self, url: str) -> Dict[str, Any]:
+        """
+        Parses a webpage locally.
+
+        Args:
+            url: The URL of the webpage to parse.
+
+        Returns:
+            url, title, word_count and main_content, or {"error": ...}.
+        """
+        try:
+            response = self.session.get(url, headers=self.headers, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {url} for local extraction: {e}")
+            return {"error": str(e)}
+
+        content_type = response.headers.get("Content-Type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            return {"error": f"Unsupported content type for local extraction: {content_type or 'unknown'}"}
+
+        try:
+            return extract(self._decode(response), response.url or url)
+        except Exception as e:
+            print(f"Error extracting {url} locally: {e}")
+            return {"error": f"Local extraction failed: {e}"}
+
+    @staticmethod
+    def _decode(response: requests.Response) -> str:
+        # Without a charset in the header requests assumes ISO-8859-1; prefer the page's own declaration
+        if "charset" in response.headers.get("Content-Type", "").lower():
+            return response.text
+        declared = _CHARSET.search(response.content[:4096])
+        encoding = declared.group(1).decode("ascii") if declared else "utf-8"
+        try:
+            return response.content.decode(encoding, errors="replace")
+        except LookupError:
+            return response.content.decode("utf-8", errors="replace")
+
+
+if __name__ == "__main__":
+    client = HtmlExtractorClient()
+    test_url = "https://www.tui.com/kinderhotels/mallorca"
+    print(f"Extracting {test_url}...")
+    result = client.parse(test_url)
+    print(f"Title: {result.get('title')}")
+    print(f"Word Count: {result.get('word_count')}")
+    print(result.get("main_content", result.get("error", ""))[:1000])
@@ -1,17 +1,137 @@
+import os
+import time
+import random
+import threading
 import requests
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
 from typing import Dict, Any, Optional
+from .page_cache import PageCache, default_page_cache, normalize_url
+from .transport import get_session
+from .single_flight import get_flight
+from .rate_limit import QuotaExceededError, get_rate_limiter
+from .html_extractor import HtmlExtractorClient
+from .telemetry import bind_context, span
+
+JINA_READER_URL = "https://r.jina.ai/"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# jina_first: Jina Reader, local extraction as fallback; local_first: the reverse; race: both, first usable wins
+PARSE_POLICIES = ("jina_first", "local_first", "race")
+MIN_USABLE_WORDS = 50
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful Jina response times, shared by all clients,
+    used to derive the hedging delay.
+    """
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def incr(self, counter: str):
+        """
+        Increments one of the counters (retries, hedges, hedge_wins).
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins
+        }
+
+
+_latency = LatencyTracker()
+# Separate pools: race tasks wait on hedged fetches, so sharing one pool could starve it
+_EXECUTORS = {"hedge": ("JINA_HEDGE_WORKERS", "jina-hedge"), "race": ("JINA_RACE_WORKERS", "jina-race")}
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(kind: str) -> ThreadPoolExecutor:
+    with _executors_lock:
+        if kind not in _executors:
+            env, prefix = _EXECUTORS[kind]
+            _executors[kind] = ThreadPoolExecutor(max_workers=int(os.getenv(env, "32")), thread_name_prefix=prefix)
+        return _executors[kind]
+
 
 class JinaReaderClient:
     """
     A client for Jina Reader API (https://jina.ai/reader) to parse webpages.
     """
-    def __init__(self):
-        self.base_url = "https://r.jina.ai/"
+    def __init__(self, cache: Optional[PageCache] = None, session: Optional[requests.Session] = None, base_url: Optional[str] = None):
+        # Overridable to point at a stand-in server for load tests; the page URL is appended
+        self.base_url = (base_url or os.getenv("JINA_READER_BASE_URL", JINA_READER_URL)).rstrip("/") + "/"
+        # Parsed pages are shared across missions through the on-disk page cache
+        self.cache = cache if cache is not None else default_page_cache(self.base_url, JINA_READER_URL)
+        self.session = session or get_session()
+        self.rate_limiter = get_rate_limiter("jina")
+
+        # (connect, read) timeouts, so one slow site cannot hold a worker thread indefinitely
+        self.timeout = (float(os.getenv("JINA_CONNECT_TIMEOUT", "5")), float(os.getenv("JINA_READ_TIMEOUT", "30")))
+        self.max_retries = int(os.getenv("JINA_MAX_RETRIES", "2"))
+        self.backoff = float(os.getenv("JINA_RETRY_BACKOFF_SECONDS", "0.5"))
+        self.max_backoff = float(os.getenv("JINA_RETRY_MAX_BACKOFF_SECONDS", "8"))
+        # Hedging: if the first attempt is slower than the observed p95, fire a second one
+        self.hedge = os.getenv("JINA_HEDGE", "false").lower() in ("1", "true", "yes")
+        self.hedge_min_samples = int(os.getenv("JINA_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_default_delay = float(os.getenv("JINA_HEDGE_DEFAULT_DELAY_SECONDS", "5"))
+        # Upper bound for waiting on hedged attempts: every try timing out, with maximal backoff in between
+        self.hedge_wait = sum(self.timeout) * (self.max_retries + 1) + self.max_backoff * self.max_retries
+
+        self.policy = os.getenv("PARSE_POLICY", "jina_first").lower()
+        if self.policy not in PARSE_POLICIES:
+            print(f"Unknown PARSE_POLICY '{self.policy}', using jina_first.")
+            self.policy = "jina_first"
+        self.local = HtmlExtractorClient(self.session)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Returns the page cache counters (hits, misses, stale, revalidated, evictions, entries, bytes).
+        """
+        return self.cache.stats() if self.cache else {}
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """
+        Returns the shared latency window (samples, p50, p95) and retry/hedge counters.
+        """
+        return _latency.stats()
 
     def parse(self, url: str) -> Dict[str, Any]:
         """
-        Parses a webpage using Jina Reader.
+        Parses a webpage using Jina Reader and/or the local HTML extractor.
+
+        PARSE_POLICY selects the engine: jina_first (default) falls back to local
+        extraction when Jina fails or returns too little content, local_first
+        does the reverse, and race runs both and keeps the first usable result.
+
+        Fresh cache entries are returned without a network round trip. Expired
+        entries are revalidated with If-None-Match / If-Modified-Since when the
+        upstream provided validators. Connection errors, timeouts, 429 and 5xx
+        responses are retried with jittered exponential backoff; with JINA_HEDGE
+        a second request is fired if the first is slower than the observed p95.
 
         Args:
             url: The URL of the webpage to parse.
@@ -23,6 +143,55 @@ class JinaReaderClient:
             - word_count: The word count of the main content
             - main_content: The extracted main content
         """
+        # Concurrent parses of the same page (e.g. in parallel missions) share one fetch
+        return get_flight("jina").do(normalize_url(url), lambda: self._parse(url))
+
+    def _parse(self, url: str) -> Dict[str, Any]:
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached["fresh"]:
+            return cached["page"]
+
+        if self.policy == "race":
+            return self._race(url, cached)
+        if self.policy == "local_first":
+            result = self._parse_local(url)
+            return result if self._is_usable(result) else self._parse_jina(url, cached)
+
+        result = self._parse_jina(url, cached)
+        if self._is_usable(result):
+            return result
+        local = self._parse_local(url)
+        return local if self._is_usable(local) else result
+
+    @staticmethod
+    def _is_usable(result: Dict[str, Any]) -> bool:
+        return "error" not in result and result.get("word_count", 0) > MIN_USABLE_WORDS
+
+    def _race(self, url: str, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        executor = _get_executor("race")
+        futures = [executor.submit(bind_context(self._parse_jina, url, cached)), executor.submit(bind_context(self._parse_local, url))]
+        results = []
+        # The slower engine keeps running to its timeout; its result still lands in the cache
+        for future in as_completed(futures):
+            result = future.result()
+            if self._is_usable(result):
+                return result
+            results.append(result)
+        return max(results, key=lambda result: ("error" not in result, result.get("word_count", 0)))
+
+    def _parse_local(self, url: str) -> Dict[str, Any]:
+        with span("local_extract", url=url) as attributes:
+            result = self.local.parse(url)
+            if "error" in result:
+                attributes["error"] = result["error"]
+            else:
+                attributes["word_count"] = result.get("word_count", 0)
+        # Validators of the origin site mean nothing to Jina, so local results are cached without them
+        if self.cache and self._is_usable(result):
+            self.cache.put(url, result)
+        return result
+
+    def _parse_jina(self, url: str, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         target_url = f"{self.base_url}{url}"
         
         # Jina Reader allows some configuration via headers
@@ -31,57 +200,155 @@ class JinaReaderClient:
             "Accept": "application/json" 
         }
 
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with span("jina", url=url) as attributes:
+            try:
+                response = self._fetch(target_url, headers)
+                attributes["status"] = response.status_code
+                if response.status_code == 304 and cached:
+                    self.cache.mark_revalidated(url)
+                    return cached["page"]
+                response.raise_for_status()
+
+                result = self._parse_response(response, url)
+                attributes["word_count"] = result.get("word_count", 0)
+                if self.cache:
+                    self.cache.put(
+                        url,
+                        result,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified")
+                    )
+                return result
+
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching Jina Reader results: {e}")
+                attributes["error"] = str(e)
+                return {"error": str(e)}
+            except QuotaExceededError as e:
+                print(f"Error fetching Jina Reader results: {e}")
+                attributes["error"] = str(e)
+                return {"error": str(e)}
+
+    def _fetch(self, target_url: str, headers: Dict[str, str]) -> requests.Response:
+        if not self.hedge:
+            return self._get_with_retries(target_url, headers)
+
+        samples = _latency.stats()["samples"]
+        delay = _latency.percentile(0.95) if samples >= self.hedge_min_samples else self.hedge_default_delay
+
+        executor = _get_executor("hedge")
+        primary = executor.submit(self._get_with_retries, target_url, headers)
         try:
-            response = requests.get(target_url, headers=headers)
-            response.raise_for_status()
-            
-            # Try to parse as JSON if Jina returns JSON
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        _latency.incr("hedges")
+        hedge = executor.submit(self._get_with_retries, target_url, headers)
+        error = None
+        # Keep whichever attempt answers first; the other one ends at its timeout
+        try:
+            for future in as_completed([primary, hedge], timeout=self.hedge_wait):
+                try:
+                    response = future.result()
+                except (requests.exceptions.RequestException, QuotaExceededError) as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    _latency.incr("hedge_wins")
+                return response
+        except FutureTimeout:
+            raise requests.exceptions.Timeout(f"No hedged attempt answered within {self.hedge_wait:.0f}s")
+        raise error
+
+    def _get_with_retries(self, target_url: str, headers: Dict[str, str]) -> requests.Response:
+        """
+        GETs a Jina URL with timeouts, retrying connection errors, timeouts, 429 and 5xx.
+
+        Returns:
+            The last response (which may still carry a retryable status once retries run out).
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed without a response.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
             try:
-                response_data = response.json()
-                
-                # Jina's JSON format puts content in a 'data' field
-                data = response_data.get("data", {})
-                
-                if not data:
-                    # Fallback if 'data' is missing but maybe root has it (unlikely based on debug)
-                    data = response_data
-                
-                title = data.get("title", "No Title Found")
-                content = data.get("content", "")
-                url_returned = data.get("url", url)
-                
-                # Calculate word count
-                word_count = len(content.split())
-                
-                return {
-                    "url": url_returned,
-                    "title": title,
-                    "word_count": word_count,
-                    "main_content": content
-                }
-            except ValueError:
-                print(f"DEBUG: Response was not JSON. First 100 chars: {response.text[:100]}")
-                # Fallback if response is plain text/markdown (older Jina behavior or if JSON fails)
-                content = response.text
-                
-                # Simple extraction attempt for title from markdown (e.g. # Title)
-                title = "No Title Found"
-                lines = content.split('\n')
-                if lines and lines[0].startswith('# '):
-                    title = lines[0][2:].strip()
-                
-                word_count = len(content.split())
-                
-                return {
-                    "url": url,
-                    "title": title,
-                    "word_count": word_count,
-                    "main_content": content
-                }
-
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching Jina Reader results: {e}")
-            return {"error": str(e)}
+                self.rate_limiter.acquire()
+                started = time.monotonic()
+                response = self.session.get(target_url, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRYABLE_STATUS:
+                    _latency.record(time.monotonic() - started)
+                    return response
+                if attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                print(f"Jina Reader returned {response.status_code}, retrying ({attempt + 1}/{self.max_retries})...")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"Jina Reader request failed ({e}), retrying ({attempt + 1}/{self.max_retries})...")
+
+            _latency.incr("retries")
+            # Full jitter keeps retries of parallel parses from arriving in lockstep
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.max_backoff))
+            time.sleep(delay)
+
+    def _parse_response(self, response: requests.Response, url: str) -> Dict[str, Any]:
+        """
+        Converts a Jina Reader response (JSON envelope or plain Markdown) into the parse result shape.
+        """
+        # Try to parse as JSON if Jina returns JSON
+        try:
+            response_data = response.json()
+            
+            # Jina's JSON format puts content in a 'data' field
+            data = response_data.get("data", {})
+            
+            if not data:
+                # Fallback if 'data' is missing but maybe root has it (unlikely based on debug)
+                data = response_data
+            
+            title = data.get("title", "No Title Found")
+            content = data.get("content", "")
+            url_returned = data.get("url", url)
+            
+            # Calculate word count
+            word_count = len(content.split())
+            
+            return {
+                "url": url_returned,
+                "title": title,
+                "word_count": word_count,
+                "main_content": content
+            }
+        except ValueError:
+            print(f"DEBUG: Response was not JSON. First 100 chars: {response.text[:100]}")
+            # Fallback if response is plain text/markdown (older Jina behavior or if JSON fails)
+            content = response.text
+            
+            # Simple extraction attempt for title from markdown (e.g. # Title)
+            title = "No Title Found"
+            lines = content.split('\n')
+            if lines and lines[0].startswith('# '):
+                title = lines[0][2:].strip()
+            
+            word_count = len(content.split())
+            
+            return {
+                "url": url,
+                "title": title,
+                "word_count": word_count,
+                "main_content": content
+            }
 
 if __name__ == "__main__":
     import json
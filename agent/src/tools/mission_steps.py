@@ -0,0 +1,403 @@
+"""
+The SEO mission as a DAG of steps, shared by SEOAgent and the ADK subagents.
+
+    keyword_data ─────────────────────────────────────────────┐
+    serp_results ──┬── competitors, related_searches ─────────┤
+    custom_search ─┴── parsing (starts on the first search) ──┴── semantic_analysis ── report ── briefing ── evaluation
+
+Each entry point supplies the tool callables (MissionTools) and asks a DagRun
+for the values it needs; independent steps run concurrently.
+"""
+import asyncio
+import contextlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .dag import Dag, Step, StepContext
+from .dedup import dedup_enabled, near_duplicate_groups
+from .query_cache import get_query_cache
+from .telemetry import SpanCollector, record_span
+from .text_stats import term_statistics, with_term_statistics
+
+MIN_USABLE_WORDS = 50
+
+
+@dataclass
+class MissionTools:
+    """
+    The blocking tool calls the mission steps run in worker threads.
+    """
+    keyword_ideas: Callable[..., Dict[str, Any]]  # (topic, location, language)
+    serp: Callable[..., Dict[str, Any]]  # (topic, location=...)
+    custom_search: Callable[..., Dict[str, Any]]  # (topic, num=...)
+    parse: Callable[[str], Dict[str, Any]]  # (url)
+    analyze: Callable[..., Dict[str, Any]]  # (content, context_keyword, language=...)
+    generate_briefing: Callable[..., str]  # (report, language=...)
+    generate_briefing_stream: Optional[Callable[..., Any]] = None  # (report, language=...) -> chunks
+    evaluate: Optional[Callable[..., str]] = None  # (briefing, report)
+    page_cache_stats: Optional[Callable[[], Dict[str, Any]]] = None
+
+
+def mission_values(topic: str, content_type: str = "Landingpage", target_group: str = "General Audience", location: str = "Germany", language: str = "German", stream_briefing: bool = False, preview: bool = False) -> Dict[str, Any]:
+    """
+    The initial values of a mission run.
+    """
+    return {
+        "topic": topic,
+        "content_type": content_type,
+        "target_group": target_group,
+        "location": location,
+        "language": language,
+        "stream_briefing": stream_briefing,
+        "preview": preview,
+    }
+
+
+def rank_competitors(serp: List[Dict[str, Any]], custom_search: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Merges the search results, SerpAPI first, without duplicate links.
+    """
+    unique_links = set()
+    merged = []
+    for comp in (serp or []) + (custom_search or []):
+        if comp["link"] not in unique_links:
+            unique_links.add(comp["link"])
+            merged.append(comp)
+    return merged[:limit]
+
+
+def is_usable(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("word_count", 0) > MIN_USABLE_WORDS
+
+
+def _parse_log_event(url: str, result: Any) -> Dict[str, Any]:
+    if isinstance(result, Exception):
+        return {"type": "log", "message": f"[FAIL] {url}: {str(result)}"}
+    if is_usable(result):
+        return {"type": "log", "message": f"[OK] {url} ({result.get('word_count')} words)"}
+    return {"type": "log", "message": f"[SKIP] {url} (Low content)"}
+
+
+def _competitors_from(items: List[Dict[str, Any]], source: str) -> List[Dict[str, Any]]:
+    return [{"title": item.get("title"), "link": item.get("link"), "source": source} for item in items if item.get("link")]
+
+
+def _related_searches_from(serp_data: Dict[str, Any]) -> List[str]:
+    if "related_searches" in serp_data:
+        return [item.get("query") for item in serp_data["related_searches"] if item.get("query")]
+    if "people_also_ask" in serp_data:
+        return [item.get("question") for item in serp_data["people_also_ask"] if item.get("question")]
+    return []
+
+
+async def iterate_in_thread(func, *args, **kwargs) -> AsyncIterator[Any]:
+    """
+    Runs a blocking generator in a worker thread and yields its items on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in func(*args, **kwargs):
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+        await producer
+    finally:
+        # The consumer went away early: let the worker thread stop at the next item
+        stop.set()
+
+
+def build_mission_dag(tools: MissionTools, settings: Any, stages: Optional[Dict[str, Any]] = None, spans: Optional[SpanCollector] = None, quorum: Optional[int] = None, deadline: Optional[float] = None) -> Dag:
+    """
+    Builds the mission steps around a set of tools.
+
+    Args:
+        tools: The tool calls to use.
+        settings: The agent settings (PARSE_CANDIDATES, MAX_COMPETITORS, PARSE_QUORUM, PARSE_DEADLINE_SECONDS).
+        stages: Optional async context managers for "research", "parsing" and "llm" entered
+            around every call of that stage (e.g. semaphores shared by a batch scheduler).
+        spans: Collects the timing spans of the mission's tool calls and stages.
+        quorum: Overrides PARSE_QUORUM.
+        deadline: Overrides PARSE_DEADLINE_SECONDS.
+
+    Returns:
+        The Dag; start a mission with dag.run(mission_values(...)).
+    """
+    quorum = settings.PARSE_QUORUM if quorum is None else quorum
+    deadline = settings.PARSE_DEADLINE_SECONDS if deadline is None else deadline
+    query_cache = get_query_cache()
+    query_cache_before = query_cache.stats() if query_cache else {}
+
+    def gate(name: str):
+        gate = (stages or {}).get(name)
+        return gate if gate is not None else contextlib.nullcontext()
+
+    async def call(stage: str, func, *args, **kwargs):
+        # Blocking tool calls run in worker threads once the stage gate admits them
+        async with gate(stage):
+            return await asyncio.to_thread(spans.wrap(func) if spans else func, *args, **kwargs)
+
+    def stage_span(name: str, seconds: float, **attributes):
+        if spans is not None:
+            record_span(name, seconds, kind="stage", collector=spans, **attributes)
+
+    async def keywords(ctx: StepContext, topic: str, location: str, language: str) -> Dict[str, Any]:
+        try:
+            data = await call("research", tools.keyword_ideas, topic, location, language)
+        except Exception as e:
+            data = {"error": str(e)}
+        if "error" in data:
+            ctx.emit({"type": "error", "source": "google_ads", "message": data["error"]})
+            return {"error": data["error"]}
+        keywords = data.get("related_keywords", [])
+        kw_texts = [k if isinstance(k, str) else str(k) for k in keywords]
+        ctx.emit({"type": "data", "key": "keywords", "data": kw_texts[:10]})
+        ctx.emit({"type": "log", "message": f"Found {len(keywords)} keywords. Top 5: {', '.join(kw_texts[:5])}..."})
+        return data
+
+    async def serp(ctx: StepContext, topic: str, location: str) -> Dict[str, Any]:
+        try:
+            data = await call("research", tools.serp, topic, location=location)
+        except Exception as e:
+            data = {"error": str(e)}
+        if "error" in data:
+            ctx.emit({"type": "error", "source": "serp_api", "message": data["error"]})
+            return {"error": data["error"], "competitors": [], "related_searches": []}
+        return {"competitors": _competitors_from(data.get("organic_results", []), "SerpAPI"), "related_searches": _related_searches_from(data)}
+
+    async def custom_search(ctx: StepContext, topic: str) -> Dict[str, Any]:
+        try:
+            data = await call("research", tools.custom_search, topic, num=settings.PARSE_CANDIDATES)
+        except Exception as e:
+            data = {"error": str(e)}
+        if "error" in data:
+            ctx.emit({"type": "error", "source": "custom_search", "message": data["error"]})
+            return {"error": data["error"], "competitors": []}
+        return {"competitors": _competitors_from(data.get("items", []), "CustomSearch")}
+
+    async def competitors(ctx: StepContext, serp_results: Dict[str, Any], custom_search_results: Dict[str, Any]) -> Dict[str, Any]:
+        top = rank_competitors(serp_results["competitors"], custom_search_results["competitors"], settings.PARSE_CANDIDATES)
+        related = serp_results.get("related_searches", [])
+        ctx.emit({"type": "data", "key": "competitors", "data": top})
+        ctx.emit({"type": "log", "message": f"Found {len(top)} competitors and {len(related)} related searches."})
+        return {"competitors": top, "related_searches": related}
+
+    async def research(ctx: StepContext, keyword_data: Dict[str, Any], serp_results: Dict[str, Any], custom_search_results: Dict[str, Any]) -> Dict[str, Any]:
+        stage_span("research", ctx.elapsed)
+        summary = {"seconds": round(ctx.elapsed, 3)}
+        if query_cache:
+            after = query_cache.stats()
+            hits = after["hits"] - query_cache_before["hits"]
+            stale = after["stale_served"] - query_cache_before["stale_served"]
+            summary.update(cache_hits=hits, stale_served=stale)
+            if hits or stale:
+                ctx.emit({"type": "log", "message": f"Research cache: {hits} fresh hits, {stale} stale results served (refreshing in background)."})
+        return summary
+
+    async def parsing(ctx: StepContext) -> Dict[str, Any]:
+        """
+        Parses competitor URLs as soon as a search provider returns them. SerpAPI
+        results keep precedence, so Custom Search links parsed speculatively may be
+        displaced (and cancelled) once SerpAPI answers. Settles when every page is
+        parsed, the quorum of usable pages is reached or the deadline passes.
+        """
+        cache_before = await asyncio.to_thread(tools.page_cache_stats) if tools.page_cache_stats else {}
+        searches = {ctx.future("serp_results"): "serp", ctx.future("custom_search_results"): "custom_search"}
+        results: Dict[str, Optional[List[Dict[str, Any]]]] = {"serp": None, "custom_search": None}
+        top: List[Dict[str, Any]] = []
+        parse_tasks: Dict[str, asyncio.Task] = {}
+        tasks: Dict[asyncio.Task, Dict[str, Any]] = {}
+        parsed: Dict[str, Any] = {}
+        started_at = None
+        parse_deadline = None
+        reason = None
+
+        try:
+            while searches or tasks:
+                timeout = None
+                if parse_deadline is not None:
+                    # Wake up at the deadline; once it has passed only the searches are awaited
+                    remaining = parse_deadline - time.monotonic()
+                    timeout = remaining if remaining > 0 else None
+                done, _ = await asyncio.wait(set(searches) | set(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for item in done:
+                    if item in searches:
+                        provider = searches.pop(item)
+                        results[provider] = item.result()["competitors"]
+                        top = rank_competitors(results["serp"], results["custom_search"], settings.PARSE_CANDIDATES)
+                        top_links = {comp["link"] for comp in top}
+                        for link in [link for link in parse_tasks if link not in top_links]:
+                            parse_task = parse_tasks.pop(link)
+                            parse_task.cancel()
+                            tasks.pop(parse_task, None)
+                            parsed.pop(link, None)
+                        for comp in top:
+                            if comp["link"] in parse_tasks:
+                                continue
+                            if started_at is None:
+                                started_at = time.perf_counter()
+                                if deadline > 0:
+                                    parse_deadline = time.monotonic() + deadline
+                                ctx.emit({"type": "status", "step": "parsing", "message": "Parsing competitor URLs as search results arrive..."})
+                            parse_task = asyncio.create_task(call("parsing", tools.parse, comp["link"]))
+                            parse_tasks[comp["link"]] = parse_task
+                            tasks[parse_task] = comp
+                        continue
+                    if item not in tasks:
+                        # A parse displaced by re-ranking while finishing in the same round
+                        continue
+                    comp = tasks.pop(item)
+                    try:
+                        parsed[comp["link"]] = item.result()
+                    except Exception as e:
+                        parsed[comp["link"]] = e
+                    ctx.emit(_parse_log_event(comp["link"], parsed[comp["link"]]))
+
+                if searches or not tasks:
+                    continue
+                usable = sum(1 for result in parsed.values() if is_usable(result))
+                if quorum > 0 and usable >= quorum:
+                    reason = "quorum reached"
+                elif parse_deadline is not None and time.monotonic() >= parse_deadline:
+                    reason = "deadline passed"
+                if reason:
+                    break
+        finally:
+            # Stop waiting on stragglers (or on everything, if the mission was cancelled)
+            for task in tasks:
+                task.cancel()
+
+        dropped = [comp["link"] for comp in tasks.values()]
+        for link in dropped:
+            ctx.emit({"type": "log", "message": f"[DROP] {link} ({reason})"})
+        usable = sum(1 for result in parsed.values() if is_usable(result))
+        if dropped:
+            ctx.emit({"type": "log", "message": f"Parsing settled with {usable} usable pages ({reason}); dropped {len(dropped)} pending URLs."})
+        if started_at is not None:
+            stage_span("parsing", time.perf_counter() - started_at, pages=len(parse_tasks), usable=usable, dropped=len(dropped))
+
+        candidates = [(comp, parsed[comp["link"]]) for comp in top if is_usable(parsed.get(comp["link"]))]
+        duplicates = []
+        # Collapse syndicated / near-identical pages before they take analysis slots
+        if dedup_enabled() and len(candidates) > 1:
+            kept, groups = await asyncio.to_thread(near_duplicate_groups, [result for _, result in candidates])
+            for i, k, similarity in groups:
+                duplicates.append({"url": candidates[i][0]["link"], "duplicate_of": candidates[k][0]["link"], "similarity": similarity})
+                ctx.emit({"type": "log", "message": f"[DUP] {candidates[i][0]['link']} (near-duplicate of {candidates[k][0]['link']}, {similarity:.0%} similar)"})
+            candidates = [candidates[i] for i in kept]
+
+        cache_after = await asyncio.to_thread(tools.page_cache_stats) if tools.page_cache_stats else {}
+        if cache_after and parse_tasks:
+            delta = {k: cache_after[k] - cache_before.get(k, 0) for k in ("hits", "misses", "stale", "revalidated")}
+            # Stale entries confirmed by a 304 count as hits, the rest had to be downloaded again
+            hits = delta["hits"] + delta["revalidated"]
+            misses = delta["misses"] + delta["stale"] - delta["revalidated"]
+            ctx.emit({"type": "log", "message": f"Page cache: {hits} hits, {misses} misses ({cache_after['entries']} pages cached)."})
+
+        selected = candidates[:settings.MAX_COMPETITORS]
+        return {
+            "analyzed_content": [result for _, result in selected],
+            "analyzed_competitors": [
+                {"title": comp.get("title"), "link": comp["link"], "word_count": result.get("word_count"), "source": comp.get("source")}
+                for comp, result in selected
+            ],
+            "duplicates": duplicates,
+            "dropped": dropped,
+        }
+
+    async def analysis(ctx: StepContext, analyzed_content: List[Dict[str, Any]], topic: str, content_type: str, target_group: str, related_searches: List[str], language: str, preview: bool) -> Dict[str, Any]:
+        if not analyzed_content:
+            return {}
+        started = time.perf_counter()
+        if preview:
+            ctx.emit({"type": "status", "step": "analysis", "message": "Running Semantic Analysis (local term statistics preview)..."})
+            result = {"keyword": topic, "preview": True, "term_statistics": await asyncio.to_thread(term_statistics, analyzed_content, topic)}
+            stage_span("analysis", time.perf_counter() - started, preview=True)
+        else:
+            ctx.emit({"type": "status", "step": "analysis", "message": "Running Semantic Analysis..."})
+            context_keyword = f"{topic} (Type: {content_type}, Target: {target_group}, Related: {', '.join(related_searches[:5])})"
+            try:
+                result = await call("llm", tools.analyze, analyzed_content, context_keyword, language=language)
+            except Exception as e:
+                result = {"error": str(e)}
+            if "error" not in result:
+                # Local, deterministic statistics alongside the LLM's view
+                result = await asyncio.to_thread(with_term_statistics, result, analyzed_content, topic)
+            stage_span("analysis", time.perf_counter() - started, outcome="error" if "error" in result else "ok")
+        ctx.emit({"type": "data", "key": "semantic_analysis", "data": result})
+        return result
+
+    async def report(ctx: StepContext, topic: str, content_type: str, target_group: str, location: str, language: str, keyword_data: Dict[str, Any], analyzed_competitors: List[Dict[str, Any]], related_searches: List[str], duplicates: List[Dict[str, Any]], semantic_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "topic": topic,
+            "content_type": content_type,
+            "target_group": target_group,
+            "location": location,
+            "language": language,
+            "keyword_data": keyword_data,
+            "competitors": analyzed_competitors,
+            "related_searches": related_searches,
+            "duplicates": duplicates,
+            "semantic_analysis": semantic_analysis,
+            "briefing": "",
+            "evaluation": ""
+        }
+
+    async def briefing(ctx: StepContext, report: Dict[str, Any], language: str, stream_briefing: bool) -> str:
+        ctx.emit({"type": "status", "step": "briefing", "message": "Generating Content Briefing..."})
+        started = time.perf_counter()
+        if stream_briefing and tools.generate_briefing_stream:
+            # Forward chunks as they arrive; the full text still follows as a data event
+            chunks = []
+            stream = spans.wrap(tools.generate_briefing_stream) if spans else tools.generate_briefing_stream
+            try:
+                async with gate("llm"):
+                    async for chunk in iterate_in_thread(stream, report, language=language):
+                        chunks.append(chunk)
+                        ctx.emit({"type": "delta", "key": "briefing", "data": chunk})
+                text = "".join(chunks)
+            except Exception as e:
+                # The streamed chunks stay partial; the briefing itself is marked as failed
+                ctx.emit({"type": "error", "source": "gemini", "message": f"Briefing generation failed after {len(chunks)} chunks: {e}"})
+                text = f"Error generating briefing: {e}"
+        else:
+            text = await call("llm", tools.generate_briefing, report, language=language)
+        stage_span("briefing", time.perf_counter() - started, outcome="error" if text.startswith("Error") else "ok")
+        ctx.emit({"type": "data", "key": "briefing", "data": text})
+        return text
+
+    async def evaluation(ctx: StepContext, briefing: str, report: Dict[str, Any]) -> str:
+        if tools.evaluate is None:
+            raise ValueError("No evaluation tool configured")
+        result = await call("llm", tools.evaluate, briefing, report)
+        ctx.emit({"type": "data", "key": "evaluation", "data": result})
+        return result
+
+    return Dag([
+        Step("keywords", keywords, inputs=("topic", "location", "language"), outputs=("keyword_data",)),
+        Step("serp", serp, inputs=("topic", "location"), outputs=("serp_results",)),
+        Step("custom_search", custom_search, inputs=("topic",), outputs=("custom_search_results",)),
+        Step("competitors", competitors, inputs=("serp_results", "custom_search_results"), outputs=("competitors", "related_searches")),
+        Step("research", research, inputs=("keyword_data", "serp_results", "custom_search_results")),
+        Step("parsing", parsing, lazy=("serp_results", "custom_search_results"), outputs=("analyzed_content", "analyzed_competitors", "duplicates", "dropped")),
+        Step("analysis", analysis, inputs=("analyzed_content", "topic", "content_type", "target_group", "related_searches", "language", "preview"), outputs=("semantic_analysis",)),
+        Step("report", report, inputs=("topic", "content_type", "target_group", "location", "language", "keyword_data", "analyzed_competitors", "related_searches", "duplicates", "semantic_analysis")),
+        Step("briefing", briefing, inputs=("report", "language", "stream_briefing")),
+        Step("evaluation", evaluation, inputs=("briefing", "report")),
+    ])
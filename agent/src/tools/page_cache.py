@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "dclid", "yclid", "_ga", "mc_cid", "mc_eid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that trivially different spellings share a cache entry.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string and strips a trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class PageCache:
+    """
+    A persistent, size-bounded LRU cache for parsed pages, backed by SQLite.
+
+    Entries are content-addressed by the SHA-256 of the normalized URL and
+    keep the validators (ETag / Last-Modified) of the upstream response so
+    expired entries can be revalidated instead of re-downloaded.
+    """
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[int] = None, max_bytes: Optional[int] = None):
+        default_path = Path(__file__).resolve().parents[2] / ".cache" / "pages.sqlite3"
+        self.path = Path(path or os.getenv("PAGE_CACHE_PATH", str(default_path)))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("PAGE_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("PAGE_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                page TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+        self._conn.commit()
+
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "evictions": 0}
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a page.
+
+        Returns:
+            None if the URL was never cached. Otherwise a dictionary with the
+            cached 'page', its 'etag' / 'last_modified' validators and 'fresh',
+            which is False when the entry is past its TTL and must be revalidated.
+        """
+        key = self.key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+            fresh = now - row[3] < self.ttl_seconds
+            if fresh:
+                self._stats["hits"] += 1
+            else:
+                self._stats["stale"] += 1
+
+        return {"page": json.loads(row[0]), "etag": row[1], "last_modified": row[2], "fresh": fresh}
+
+    def put(self, url: str, page: Dict[str, Any], etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Stores a parsed page and evicts least recently used entries if the cache grew past its size limit.
+        """
+        payload = json.dumps(page, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO pages (key, url, page, etag, last_modified, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (self.key(url), normalize_url(url), payload, etag, last_modified, len(payload.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def mark_revalidated(self, url: str):
+        """
+        Restarts the TTL of an entry after the upstream confirmed it is unchanged (HTTP 304).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, self.key(url))
+            )
+            self._conn.commit()
+            self._stats["revalidated"] += 1
+
+    def invalidate(self, url: Optional[str] = None):
+        """
+        Drops a single URL, or the whole cache if no URL is given.
+        """
+        with self._lock:
+            if url is None:
+                self._conn.execute("DELETE FROM pages")
+            else:
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (self.key(url),))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns hit/miss counters since process start plus the current cache size.
+        """
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            return {**self._stats, "entries": entries, "bytes": size}
+
+    def _evict(self):
+        # Caller holds the lock
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM pages ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            self._stats["evictions"] += 1
+
+
+_shared_cache: Optional[PageCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    Returns the process-wide page cache, or None if disabled via PAGE_CACHE_ENABLED=false.
+    """
+    global _shared_cache
+    if os.getenv("PAGE_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = PageCache()
+        return _shared_cache
+
+
+def default_page_cache(base_url: str, official_url: str) -> Optional[PageCache]:
+    """
+    Returns the page cache for a reader talking to `base_url`; None if it was
+    overridden, following the same rule as query_cache.default_cache.
+    """
+    return get_page_cache() if base_url == official_url else None
@@ -0,0 +1,150 @@
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+# Gemini tokenizes German/English prose at roughly four characters per token.
+# The estimate only has to be good enough to size prompts, not to bill them.
+CHARS_PER_TOKEN = 4
+
+# Report fields the briefing and evaluation prompts never need
+DROPPED_REPORT_FIELDS = {"parsed_content", "analyzed_content", "main_content", "briefing", "evaluation", "duplicates"}
+
+_MARKDOWN_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_BARE_URL = re.compile(r"https?://\S+")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens Gemini will count for `text`.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_text(text: str) -> str:
+    """
+    Removes what costs tokens without carrying meaning: images, link targets,
+    bare URLs, indentation and repeated blank lines.
+    """
+    text = _MARKDOWN_IMAGE.sub("", text)
+    text = _MARKDOWN_LINK.sub(r"\1", text)
+    text = _BARE_URL.sub("", text)
+    text = _SPACES.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n", text).strip()
+
+
+def strip_indentation(text: str, width: int = 8) -> str:
+    """
+    Removes the source-code indentation (up to `width` spaces) of every line of a
+    prompt template. Deeper, meaningful indentation such as outline nesting is kept.
+    """
+    lines = []
+    for line in text.strip("\n").split("\n"):
+        indent = len(line) - len(line.lstrip(" "))
+        lines.append(line[min(indent, width):].rstrip())
+    return "\n".join(lines).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts `text` to about `max_tokens` tokens, preferring a word boundary.
+    """
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = cut.rfind(" ")
+    return cut[:boundary] if boundary > max_chars * 0.8 else cut
+
+
+def relevance(text: str, keyword: str, rank: int) -> float:
+    """
+    Scores an article by keyword term density, damped by its search rank (0 = top result).
+    """
+    terms = {term for term in _WORD.findall(keyword.lower()) if len(term) > 2}
+    words = _WORD.findall(text.lower())
+    if not words:
+        return 0.0
+    hits = sum(1 for word in words if word in terms)
+    density = min(hits / len(words) * 100, 5.0)
+    return (1.0 + density) / (1.0 + 0.15 * rank)
+
+
+def allocate_tokens(texts: List[str], weights: List[float], budget: int) -> List[int]:
+    """
+    Splits `budget` across texts proportionally to their weights. Texts shorter
+    than their share keep their full length and pass the surplus on to the others.
+    """
+    lengths = [estimate_tokens(text) for text in texts]
+    allocation = [0] * len(texts)
+    active = [i for i, length in enumerate(lengths) if length > 0]
+    remaining = budget
+
+    while active and remaining > 0:
+        total_weight = sum(weights[i] for i in active) or float(len(active))
+        shares = {i: remaining * (weights[i] or 1.0) / total_weight for i in active}
+        satisfied = [i for i in active if lengths[i] <= shares[i]]
+        if not satisfied:
+            for i in active:
+                allocation[i] = int(shares[i])
+            break
+        for i in satisfied:
+            allocation[i] = lengths[i]
+            remaining -= lengths[i]
+        active = [i for i in active if i not in satisfied]
+
+    return allocation
+
+
+def budget_articles(articles: List[Dict[str, Any]], keyword: str, budget: int) -> List[str]:
+    """
+    Returns the compacted 'main_content' of each article, cut so that all of them
+    together fit `budget` tokens. More relevant articles get a larger share.
+    """
+    texts = [compact_text(article.get("main_content", "")) for article in articles]
+    weights = [relevance(text, keyword, rank) for rank, text in enumerate(texts)]
+    allocation = allocate_tokens(texts, weights, budget)
+    return [truncate_to_tokens(text, tokens) for text, tokens in zip(texts, allocation)]
+
+
+def _drop_fields(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _drop_fields(v) for k, v in value.items() if k not in DROPPED_REPORT_FIELDS}
+    if isinstance(value, list):
+        return [_drop_fields(item) for item in value]
+    return value
+
+
+def _longest_list(value: Any) -> Optional[list]:
+    longest = None
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            if len(item) > 1 and (longest is None or len(item) > len(longest)):
+                longest = item
+            stack.extend(item)
+    return longest
+
+
+def compact_json(data: Dict[str, Any], budget: Optional[int] = None) -> str:
+    """
+    Serializes report data for a prompt without indentation and without the
+    fields the model doesn't need. If a budget is given, the longest lists are
+    halved until the result fits.
+    """
+    data = _drop_fields(data)
+    serialized = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    while budget is not None and estimate_tokens(serialized) > budget:
+        longest = _longest_list(data)
+        if longest is None:
+            break
+        del longest[(len(longest) + 1) // 2:]
+        serialized = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return serialized
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+from pathlib import Path
+
+# Keyword volumes move slowly, SERPs change within hours.
+# Per-article semantic extractions are keyed by content hash and never go stale.
+DEFAULT_TTLS = {
+    "serpapi": 6 * 3600,
+    "custom_search": 6 * 3600,
+    "google_ads": 3 * 24 * 3600,
+    "semantic_map": 30 * 24 * 3600,
+}
+
+
+class QueryCache:
+    """
+    A persistent TTL cache for search, keyword research and other idempotent provider results, backed by SQLite.
+
+    Entries are keyed by (provider, normalized request parameters) and expire
+    after a per-provider TTL. With stale-while-revalidate enabled, an expired
+    entry that is younger than `max_stale_seconds` is returned immediately
+    while a background thread refreshes it.
+    """
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttls: Optional[Dict[str, int]] = None,
+        stale_while_revalidate: Optional[bool] = None,
+        max_stale_seconds: Optional[int] = None
+    ):
+        default_path = Path(__file__).resolve().parents[2] / ".cache" / "queries.sqlite3"
+        self.path = Path(path or os.getenv("QUERY_CACHE_PATH", str(default_path)))
+
+        self.ttls = dict(DEFAULT_TTLS)
+        for provider in DEFAULT_TTLS:
+            env_ttl = os.getenv(f"QUERY_CACHE_TTL_{provider.upper()}")
+            if env_ttl:
+                self.ttls[provider] = int(env_ttl)
+        self.ttls.update(ttls or {})
+
+        if stale_while_revalidate is None:
+            stale_while_revalidate = os.getenv("QUERY_CACHE_STALE_WHILE_REVALIDATE", "true").lower() not in ("0", "false", "no")
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale_seconds = max_stale_seconds if max_stale_seconds is not None else int(os.getenv("QUERY_CACHE_MAX_STALE_SECONDS", str(7 * 24 * 3600)))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS queries (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                params TEXT NOT NULL,
+                value TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="query-cache-refresh")
+        self._stats = {"hits": 0, "misses": 0, "stale_served": 0, "refreshes": 0}
+
+    @staticmethod
+    def key(provider: str, params: Dict[str, Any]) -> str:
+        normalized = {
+            k: " ".join(v.lower().split()) if isinstance(v, str) else v
+            for k, v in params.items()
+        }
+        raw = provider + json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_or_fetch(self, provider: str, params: Dict[str, Any], fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the cached result for a query, calling `fetch` on a miss.
+
+        Args:
+            provider: Provider name, selects the TTL (e.g. 'serpapi').
+            params: Request parameters that identify the query. Must not contain credentials.
+            fetch: Zero-argument callable performing the real request.
+
+        Returns:
+            The (possibly cached) result. Results containing an 'error' key are never cached.
+        """
+        key = self.key(provider, params)
+        now = time.time()
+        ttl = self.ttls.get(provider, 3600)
+
+        with self._lock:
+            row = self._conn.execute("SELECT value, fetched_at FROM queries WHERE key = ?", (key,)).fetchone()
+
+        if row is not None:
+            age = now - row[1]
+            if age < ttl:
+                with self._lock:
+                    self._stats["hits"] += 1
+                return json.loads(row[0])
+            if self.stale_while_revalidate and age < ttl + self.max_stale_seconds:
+                with self._lock:
+                    self._stats["stale_served"] += 1
+                self._schedule_refresh(key, provider, params, fetch)
+                return json.loads(row[0])
+
+        with self._lock:
+            self._stats["misses"] += 1
+        result = fetch()
+        self._store(key, provider, params, result)
+        return result
+
+    def lookup(self, provider: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached result for a query if it is still fresh, else None.
+        For callers that fetch several queries in one request and store them with put().
+        """
+        key = self.key(provider, params)
+        with self._lock:
+            row = self._conn.execute("SELECT value, fetched_at FROM queries WHERE key = ?", (key,)).fetchone()
+            if row is not None and time.time() - row[1] < self.ttls.get(provider, 3600):
+                self._stats["hits"] += 1
+                return json.loads(row[0])
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, provider: str, params: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Stores a result fetched outside get_or_fetch(). Error results are ignored.
+        """
+        self._store(self.key(provider, params), provider, params, result)
+
+    def invalidate(self, provider: Optional[str] = None):
+        """
+        Drops all entries of a provider, or the whole cache if no provider is given.
+        """
+        with self._lock:
+            if provider is None:
+                self._conn.execute("DELETE FROM queries")
+            else:
+                self._conn.execute("DELETE FROM queries WHERE provider = ?", (provider,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+            return {**self._stats, "entries": entries}
+
+    def _store(self, key: str, provider: str, params: Dict[str, Any], result: Dict[str, Any]):
+        if not isinstance(result, dict) or "error" in result:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (key, provider, params, value, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key, provider, json.dumps(params, sort_keys=True, ensure_ascii=False), json.dumps(result, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def _schedule_refresh(self, key: str, provider: str, params: Dict[str, Any], fetch: Callable[[], Dict[str, Any]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self._stats["refreshes"] += 1
+
+        def refresh():
+            try:
+                self._store(key, provider, params, fetch())
+            except Exception as e:
+                print(f"Background refresh for {provider} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+
+_shared_cache: Optional[QueryCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_query_cache() -> Optional[QueryCache]:
+    """
+    Returns the process-wide query cache, or None if disabled via QUERY_CACHE_ENABLED=false.
+    """
+    global _shared_cache
+    if os.getenv("QUERY_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = QueryCache()
+        return _shared_cache
+
+
+def default_cache(base_url: Optional[str], official_url: Optional[str] = None) -> Optional[QueryCache]:
+    """
+    Returns the cache a client should use when none is passed in.
+
+    The on-disk cache is shared with every real run, so results from a stand-in
+    server must never end up in it: a client whose base URL was overridden gets
+    no cache.
+
+    Args:
+        base_url: The URL the client talks to.
+        official_url: The provider's own URL. None for SDKs whose endpoint is the
+            default, where any base URL at all is an override.
+
+    Returns:
+        The process-wide query cache, or None for overridden URLs or if caching is disabled.
+    """
+    return get_query_cache() if base_url == official_url else None
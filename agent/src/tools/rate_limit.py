@@ -0,0 +1,172 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from .prompt_budget import estimate_tokens
+
+try:
+    from zoneinfo import ZoneInfo
+    # Google API daily quotas reset at midnight Pacific Time
+    QUOTA_TIMEZONE = ZoneInfo(os.getenv("RATE_LIMIT_QUOTA_TIMEZONE", "America/Los_Angeles"))
+except Exception:
+    QUOTA_TIMEZONE = timezone.utc
+
+# provider: (requests per second, burst, daily quota); 0 means unlimited
+DEFAULT_LIMITS: Dict[str, Tuple[float, int, int]] = {
+    "serpapi": (2.0, 5, 0),
+    "custom_search": (1.5, 10, 10000),
+    "google_ads": (1.0, 2, 0),
+    "jina": (3.0, 20, 0),
+    "gemini": (2.0, 10, 0),
+    # Gemini input tokens per second (a TPM limit / 60); calls acquire their prompt size
+    "gemini_tokens": (30000.0, 1000000, 0),
+}
+
+
+class QuotaExceededError(RuntimeError):
+    """
+    Raised when a call would exceed a provider's daily quota.
+    """
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket with an optional daily quota.
+
+    Callers that exceed the rate are queued: acquire() reserves tokens and sleeps
+    until they are available, so requests are spaced out instead of failing with
+    a 429. Only an exhausted daily quota raises.
+    """
+    def __init__(self, provider: str, rps: float, burst: int, daily_quota: int = 0):
+        self.provider = provider
+        self.rps = rps
+        self.burst = max(burst, 1)
+        self.daily_quota = daily_quota
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._day = self._today()
+        self.used_today = 0
+        self.waiting = 0
+        self.waited_seconds = 0.0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rps)
+        self._updated = now
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+
+    def acquire(self, cost: float = 1) -> float:
+        """
+        Blocks until `cost` tokens are available.
+
+        Args:
+            cost: Tokens to take (1 per request, or e.g. the prompt size for token limits).
+
+        Returns:
+            The seconds spent waiting.
+
+        Raises:
+            QuotaExceededError: If the daily quota is used up.
+        """
+        with self._lock:
+            self._refill()
+            if self.daily_quota and self.used_today + cost > self.daily_quota:
+                raise QuotaExceededError(f"Daily quota of {self.daily_quota} for {self.provider} exhausted")
+            self.used_today += cost
+            if self.rps <= 0:
+                return 0.0
+
+            # Reserve the tokens now; a negative balance is the queue in front of us
+            self._tokens -= cost
+            wait = -self._tokens / self.rps if self._tokens < 0 else 0.0
+            if wait > 0:
+                self.waiting += 1
+                self.waited_seconds += wait
+
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    def utilization(self) -> Dict[str, Any]:
+        """
+        Current load of the provider.
+
+        Returns:
+            rate: Share of the burst capacity in use (above 1 when callers are queued).
+            backlog_seconds: How long a new call would wait.
+            waiting: Callers currently queued.
+            quota_used / quota_remaining / quota_fraction: Daily quota usage (remaining is None if unlimited).
+        """
+        with self._lock:
+            self._refill()
+            tokens = self._tokens
+            backlog = -tokens / self.rps if self.rps > 0 and tokens < 0 else 0.0
+            return {
+                "rate": round(1 - tokens / self.burst, 3) if self.rps > 0 else 0.0,
+                "backlog_seconds": round(backlog, 2),
+                "waiting": self.waiting,
+                "waited_seconds": round(self.waited_seconds, 2),
+                "quota_used": self.used_today,
+                "quota_remaining": self.daily_quota - self.used_today if self.daily_quota else None,
+                "quota_fraction": round(self.used_today / self.daily_quota, 3) if self.daily_quota else 0.0
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Returns the process-wide rate limiter of a provider, shared by all client instances.
+
+    Limits come from RATE_LIMIT_<PROVIDER>_RPS, RATE_LIMIT_<PROVIDER>_BURST and
+    RATE_LIMIT_<PROVIDER>_DAILY_QUOTA (0 = unlimited). With RATE_LIMIT_ENABLED=false
+    the limiter only counts calls.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rps, burst, quota = DEFAULT_LIMITS.get(provider, (0.0, 1, 0))
+            prefix = f"RATE_LIMIT_{provider.upper()}"
+            rps = float(os.getenv(f"{prefix}_RPS", str(rps)))
+            burst = int(os.getenv(f"{prefix}_BURST", str(burst)))
+            quota = int(os.getenv(f"{prefix}_DAILY_QUOTA", str(quota)))
+            if os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("0", "false", "no"):
+                rps, quota = 0.0, 0
+            limiter = RateLimiter(provider, rps, burst, quota)
+            _limiters[provider] = limiter
+        return limiter
+
+
+def throttle_gemini(prompt: str) -> float:
+    """
+    Waits for a Gemini request slot and for the prompt's share of the token-per-minute limit.
+
+    Returns:
+        The seconds spent waiting.
+    """
+    waited = get_rate_limiter("gemini").acquire()
+    tokens = get_rate_limiter("gemini_tokens")
+    return waited + tokens.acquire(min(estimate_tokens(prompt), tokens.burst))
+
+
+def rate_limit_utilization(providers: Optional[list] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Utilization of the given providers (default: all known ones).
+    """
+    return {provider: get_rate_limiter(provider).utilization() for provider in (providers or DEFAULT_LIMITS)}
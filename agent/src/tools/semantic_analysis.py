@@ -1,28 +1,50 @@
 import os
 import json
-from typing import List, Dict, Any
-from google import genai
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from google.genai import types
 from dotenv import load_dotenv
 from pathlib import Path
+from .genai_clients import get_genai_client
+from .prompt_budget import budget_articles, compact_text, estimate_tokens, strip_indentation, truncate_to_tokens
+from .query_cache import QueryCache, default_cache
+from .rate_limit import throttle_gemini
+from .telemetry import bind_context, span, usage_attributes
 
 # Load .env
 env_path = Path(__file__).resolve().parents[3] / '.env'
 load_dotenv(dotenv_path=env_path)
 
+ENTITY_TYPES = ("places", "hotels", "concepts")
+MAX_ENTITIES_PER_TYPE = 15
+
 class SemanticAnalysisClient:
     """
     A client for performing semantic analysis on competitor content using Gemini.
+
+    Two modes are available:
+    - "single": all articles go into one large prompt (default).
+    - "map_reduce": entities and topics are extracted per article in parallel with a
+      cheaper model (cached by content hash), then merged by a small reduce call.
+      Coverage counts ("X/Y articles") are computed locally.
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[QueryCache] = None):
         self.api_key = os.getenv("GOOGLE_API_KEY")
         if not self.api_key:
             raise ValueError("GOOGLE_API_KEY environment variable not set")
         
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = get_genai_client(self.api_key)
         self.model = "gemini-3-pro-preview"
+        self.map_model = os.getenv("SEMANTIC_MAP_MODEL", "gemini-3-flash-preview")
+        self.mode = os.getenv("SEMANTIC_ANALYSIS_MODE", "single")
+        self.map_concurrency = int(os.getenv("SEMANTIC_MAP_CONCURRENCY", "8"))
+        self.cache = cache if cache is not None else default_cache(os.getenv("GEMINI_BASE_URL"))
+        # Token budgets for competitor text in the single prompt and per map-step article
+        self.prompt_budget = int(os.getenv("SEMANTIC_PROMPT_TOKEN_BUDGET", "12000"))
+        self.map_article_budget = int(os.getenv("SEMANTIC_MAP_ARTICLE_TOKEN_BUDGET", "1500"))
 
-    def analyze(self, competitor_contents: List[Dict[str, Any]], keyword: str, language: str = "German") -> Dict[str, Any]:
+    def analyze(self, competitor_contents: List[Dict[str, Any]], keyword: str, language: str = "German", mode: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyzes competitor content to extract entities, topics, and content gaps.
 
@@ -30,16 +52,19 @@ class SemanticAnalysisClient:
             competitor_contents: List of dictionaries with 'title' and 'main_content'.
             keyword: The target keyword.
             language: The language for the output analysis (default: "German").
+            mode: "single" or "map_reduce". Defaults to SEMANTIC_ANALYSIS_MODE.
 
         Returns:
             Structured dictionary with analysis results.
         """
+        if (mode or self.mode) == "map_reduce":
+            return self._analyze_map_reduce(competitor_contents, keyword, language)
         
-        # Prepare context from competitor articles
+        # Prepare context from competitor articles, sharing the token budget by relevance
         articles_text = ""
-        for i, article in enumerate(competitor_contents, 1):
+        contents = budget_articles(competitor_contents, keyword, self.prompt_budget)
+        for i, (article, content) in enumerate(zip(competitor_contents, contents), 1):
             title = article.get("title", "Unknown Title")
-            content = article.get("main_content", "")[:5000] # Truncate to avoid huge context if needed, though Gemini 2.0 has large context
             articles_text += f"\n--- ARTICLE {i}: {title} ---\n{content}\n"
 
         prompt = f"""
@@ -75,24 +100,195 @@ class SemanticAnalysisClient:
         
         Return ONLY valid JSON.
         """
+        prompt = strip_indentation(prompt)
+        print(f"Semantic analysis prompt: ~{estimate_tokens(prompt)} tokens (article budget {self.prompt_budget})")
+
+        with span("gemini", model=self.model, step="analysis") as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(throttle_gemini(prompt), 3)
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json"
+                    )
+                )
+                attributes.update(usage_attributes(getattr(response, "usage_metadata", None)))
+
+                if response.text:
+                    return json.loads(response.text)
+                else:
+                    attributes["error"] = "empty response"
+                    return {"error": "Empty response from Gemini"}
+
+            except Exception as e:
+                print(f"Error during semantic analysis: {e}")
+                attributes["error"] = str(e)
+                return {"error": str(e)}
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json"
+    def _generate_json(self, model: str, prompt: str, step: str) -> Dict[str, Any]:
+        with span("gemini", model=model, step=step) as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(throttle_gemini(prompt), 3)
+                response = self.client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json"
+                    )
                 )
-            )
-            
-            if response.text:
-                return json.loads(response.text)
-            else:
+                attributes.update(usage_attributes(getattr(response, "usage_metadata", None)))
+                if response.text:
+                    return json.loads(response.text)
+                attributes["error"] = "empty response"
                 return {"error": "Empty response from Gemini"}
+            except Exception as e:
+                attributes["error"] = str(e)
+                return {"error": str(e)}
+
+    def _extract_article(self, article: Dict[str, Any], language: str) -> Dict[str, Any]:
+        """
+        Map step: extracts entities and covered topics from a single article.
+        """
+        title = article.get("title", "Unknown Title")
+        content = truncate_to_tokens(compact_text(article.get("main_content", "")), self.map_article_budget)
+
+        prompt = f"""
+        You are an SEO Expert. Extract the entities and topics covered by this article.
+
+        ARTICLE: {title}
+        {content}
+
+        IMPORTANT: Generate the output in {language}. Use short topic labels (2-4 words).
+
+        OUTPUT FORMAT (JSON):
+        {{
+            "places": ["Place 1"],
+            "hotels": ["Hotel 1"],
+            "concepts": ["Concept 1"],
+            "topics": ["Topic 1", "Topic 2"]
+        }}
+
+        Return ONLY valid JSON.
+        """
+        prompt = strip_indentation(prompt)
+
+        def fetch():
+            return self._generate_json(self.map_model, prompt, step="map")
+
+        if not self.cache:
+            return fetch()
+        content_hash = hashlib.sha256(f"{title}\n{content}".encode("utf-8")).hexdigest()
+        params = {"content_sha256": content_hash, "model": self.map_model, "language": language}
+        return self.cache.get_or_fetch("semantic_map", params, fetch)
+
+    def _analyze_map_reduce(self, competitor_contents: List[Dict[str, Any]], keyword: str, language: str) -> Dict[str, Any]:
+        if not competitor_contents:
+            return {"error": "No competitor content to analyze"}
+
+        workers = max(1, min(self.map_concurrency, len(competitor_contents)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="semantic-map") as executor:
+            futures = [executor.submit(bind_context(self._extract_article, article, language)) for article in competitor_contents]
+            extractions = [future.result() for future in futures]
+
+        usable = [extraction for extraction in extractions if isinstance(extraction, dict) and "error" not in extraction]
+        if not usable:
+            errors = [extraction.get("error") for extraction in extractions if isinstance(extraction, dict)]
+            print(f"Error during semantic analysis: all per-article extractions failed ({errors[:1]})")
+            return {"error": errors[0] if errors else "Per-article extraction failed"}
+
+        topic_clusters, content_gaps = self._reduce_topics(usable, keyword, language)
+        return {
+            "keyword": keyword,
+            "entities": self._merge_entities(usable),
+            "topic_clusters": topic_clusters,
+            "content_gaps": content_gaps
+        }
+
+    @staticmethod
+    def _merge_entities(extractions: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Merges per-article entities, ranked by the number of articles mentioning them.
+        """
+        merged = {}
+        for entity_type in ENTITY_TYPES:
+            counts = {}
+            display = {}
+            for extraction in extractions:
+                seen = set()
+                for name in extraction.get(entity_type) or []:
+                    if not isinstance(name, str) or not name.strip():
+                        continue
+                    key = name.strip().casefold()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    display.setdefault(key, name.strip())
+                    counts[key] = counts.get(key, 0) + 1
+            # dicts keep insertion order, so ties stay in order of first mention
+            ranked = sorted(counts, key=lambda key: counts[key], reverse=True)
+            merged[entity_type] = [display[key] for key in ranked[:MAX_ENTITIES_PER_TYPE]]
+        return merged
+
+    def _reduce_topics(self, extractions: List[Dict[str, Any]], keyword: str, language: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Reduce step: clusters the per-article topic labels and derives content gaps.
+        The LLM only groups labels; how many articles cover a cluster is counted here.
+        """
+        total = len(extractions)
+        topics_text = "\n".join(
+            f"ARTICLE {i}: {'; '.join(t for t in extraction.get('topics') or [] if isinstance(t, str))}"
+            for i, extraction in enumerate(extractions, 1)
+        )
+
+        prompt = f"""
+        You are an SEO Expert. These are the topics covered by {total} competitor articles for the keyword "{keyword}".
+
+        {topics_text}
+
+        TASK:
+        1. Group equivalent topics into topic clusters and list which articles cover each cluster.
+        2. Name content gaps: relevant aspects of the keyword that are missing or under-represented.
+
+        IMPORTANT: Generate the output in {language}.
+
+        OUTPUT FORMAT (JSON):
+        {{
+            "topic_clusters": [{{"topic": "Topic Name", "articles": [1, 3]}}],
+            "content_gaps": ["Gap 1", "Gap 2"]
+        }}
+
+        Return ONLY valid JSON.
+        """
+        prompt = strip_indentation(prompt)
+
+        reduced = self._generate_json(self.model, prompt, step="reduce")
+        if "error" in reduced:
+            print(f"Error during semantic reduce step, falling back to exact topic matching: {reduced['error']}")
+            groups = {}
+            for i, extraction in enumerate(extractions, 1):
+                for topic in extraction.get("topics") or []:
+                    if isinstance(topic, str) and topic.strip():
+                        groups.setdefault(topic.strip().casefold(), {"topic": topic.strip(), "articles": []})["articles"].append(i)
+            raw_clusters, content_gaps = list(groups.values()), []
+        else:
+            raw_clusters = reduced.get("topic_clusters") or []
+            content_gaps = [gap for gap in reduced.get("content_gaps") or [] if isinstance(gap, str)]
+
+        counted = []
+        for cluster in raw_clusters:
+            articles = {a for a in cluster.get("articles") or [] if isinstance(a, int) and 1 <= a <= total}
+            if cluster.get("topic") and articles:
+                counted.append((len(articles), cluster["topic"]))
 
-        except Exception as e:
-            print(f"Error during semantic analysis: {e}")
-            return {"error": str(e)}
+        # Stable sort keeps the reduce step's order among equally covered topics
+        counted.sort(key=lambda item: item[0], reverse=True)
+        clusters = []
+        for count, topic in counted:
+            ratio = count / total
+            status = "High" if ratio >= 0.6 else "Medium" if ratio >= 0.3 else "Low"
+            clusters.append({"topic": topic, "coverage": f"{count}/{total} articles", "status": status})
+        return clusters, content_gaps
 
 if __name__ == "__main__":
     # Test with dummy data
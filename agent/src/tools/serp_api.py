@@ -3,18 +3,30 @@ import requests
 from typing import Dict, Any, Optional
 from pathlib import Path
 from dotenv import load_dotenv
+from .query_cache import QueryCache, default_cache
+from .transport import get_session
+from .single_flight import get_flight
+from .rate_limit import QuotaExceededError, get_rate_limiter
+from .telemetry import span
 
 # Load .env from project root
 env_path = Path(__file__).resolve().parents[3] / '.env'
 load_dotenv(dotenv_path=env_path)
 
+SERPAPI_URL = "https://serpapi.com/search"
+
+
 class SerpApiClient:
     """
     A light wrapper around the SerpAPI Google Search Engine.
     """
-    def __init__(self):
+    def __init__(self, cache: Optional[QueryCache] = None, session: Optional[requests.Session] = None, base_url: Optional[str] = None):
         self.api_key = os.getenv("SERPAPI_API_KEY")
-        self.base_url = "https://serpapi.com/search"
+        # Overridable to point at a stand-in server for load tests
+        self.base_url = base_url or os.getenv("SERPAPI_BASE_URL", SERPAPI_URL)
+        self.cache = cache if cache is not None else default_cache(self.base_url, SERPAPI_URL)
+        self.session = session or get_session()
+        self.rate_limiter = get_rate_limiter("serpapi")
 
         if not self.api_key:
             raise ValueError("SERPAPI_API_KEY environment variable not set")
@@ -37,19 +49,35 @@ class SerpApiClient:
             "q": query,
             "location": location,
             "hl": hl,
-            "gl": gl,
-            "api_key": self.api_key
+            "gl": gl
         }
 
-        try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching SerpAPI results: {e}")
-            if response is not None:
-                print(f"Response: {response.text}")
-            return {"error": str(e)}
+        def run():
+            if not self.cache:
+                return self._search(params)
+            return self.cache.get_or_fetch("serpapi", params, lambda: self._search(params))
+
+        # Identical searches running at the same time (e.g. in parallel missions) share one request
+        return get_flight("serpapi").do(QueryCache.key("serpapi", params), run)
+
+    def _search(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = None
+        with span("serpapi", query=params["q"]) as attributes:
+            try:
+                attributes["rate_limit_wait"] = round(self.rate_limiter.acquire(), 3)
+                response = self.session.get(self.base_url, params={**params, "api_key": self.api_key})
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching SerpAPI results: {e}")
+                if response is not None:
+                    print(f"Response: {response.text}")
+                attributes["error"] = str(e)
+                return {"error": str(e)}
+            except QuotaExceededError as e:
+                print(f"Error fetching SerpAPI results: {e}")
+                attributes["error"] = str(e)
+                return {"error": str(e)}
 
 if __name__ == "__main__":
     import json
@@ -0,0 +1,75 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is running,
+    other threads asking for the same key wait for it and share its result
+    instead of issuing a duplicate request.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs `fn` unless a call for `key` is already in flight, in which case
+        it waits for that call. Followers get a deep copy of the leader's result
+        (or its exception), so callers can never mutate each other's data.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.followers += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.followers > 0
+            if shared and call.error is None:
+                # Followers copy from a private copy, taken before the leader's caller can mutate the result
+                call.result = copy.deepcopy(result)
+            call.done.set()
+        return result
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(provider: str) -> SingleFlight:
+    """
+    Returns the process-wide SingleFlight group of a provider (e.g. 'jina', 'serpapi').
+    """
+    with _flights_lock:
+        if provider not in _flights:
+            _flights[provider] = SingleFlight()
+        return _flights[provider]
+
@@ -0,0 +1,249 @@
+import bisect
+import contextvars
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the duration histograms: fast cache-like calls up to slow LLM calls
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+METRICS = {
+    "genseo_stage_seconds": ("histogram", "Duration of mission stages (research, parsing, analysis, briefing, mission)."),
+    "genseo_provider_call_seconds": ("histogram", "Duration of provider calls, including rate limiter waits."),
+    "genseo_rate_limit_wait_seconds_total": ("counter", "Seconds provider calls spent waiting for their rate limiter."),
+    "genseo_llm_tokens_total": ("counter", "Gemini tokens by model and type (prompt, output)."),
+}
+
+_current: contextvars.ContextVar[Optional["SpanCollector"]] = contextvars.ContextVar("span_collector", default=None)
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Metrics:
+    """
+    A minimal in-process metrics registry (histograms, counters, gauges) that
+    renders the Prometheus text exposition format.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._definitions: Dict[str, Tuple[str, str]] = dict(METRICS)
+        self._values: Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str):
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            key = tuple(sorted(labels.items()))
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            key = tuple(sorted(labels.items()))
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, description: str = "", **labels: str):
+        with self._lock:
+            self._definitions.setdefault(name, ("gauge", description))
+            self._values.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> str:
+        """
+        Returns all metrics in the Prometheus text format (version 0.0.4).
+        """
+        lines = []
+        with self._lock:
+            for name, series in self._values.items():
+                kind, description = self._definitions.get(name, ("untyped", ""))
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in series.items():
+                    if kind != "histogram":
+                        lines.append(f"{name}{_labels(key)} {_number(value)}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), value.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _number(bound)
+                        lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {_number(value.sum)}")
+                    lines.append(f"{name}_count{_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process-wide metrics registry that all spans are aggregated into.
+    """
+    return _metrics
+
+
+class SpanCollector:
+    """
+    Collects the spans finished while it is active, e.g. all provider calls of
+    one mission. Calls run through run() or wrap() activate it in their (worker)
+    thread; drain() hands out the spans finished since the last drain.
+    """
+    def __init__(self):
+        self._spans: List[Dict[str, Any]] = []
+        self._drained = 0
+        self._lock = threading.Lock()
+
+    def add(self, span: Dict[str, Any]):
+        with self._lock:
+            self._spans.append(span)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = self._spans[self._drained:]
+            self._drained = len(self._spans)
+            return spans
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        token = _current.set(self)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Returns func bound to this collector. If func returns a generator, the
+        collector is active while each item is produced.
+        """
+        def call(*args, **kwargs):
+            result = self.run(func, *args, **kwargs)
+            return self._iterate(result) if inspect.isgenerator(result) else result
+
+        return call
+
+    def _iterate(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        while True:
+            try:
+                item = self.run(next, iterator)
+            except StopIteration:
+                return
+            yield item
+
+
+def record_span(name: str, seconds: float, kind: str = "provider", outcome: str = "ok", collector: Optional[SpanCollector] = None, **attributes: Any) -> Dict[str, Any]:
+    """
+    Records a finished span: aggregated into the metrics registry and added to
+    the given (or currently active) collector.
+
+    Args:
+        name: Stage (research, parsing, ...) or provider (serpapi, custom_search, google_ads, jina, local_extract, gemini).
+        seconds: Duration.
+        kind: "stage" or "provider".
+        outcome: "ok", "error" or "cancelled".
+        collector: Defaults to the collector active in this context, if any.
+        **attributes: Extra details, e.g. url, model, prompt_tokens, output_tokens, rate_limit_wait.
+
+    Returns:
+        The span as a dict (name, kind, seconds, outcome, attributes).
+    """
+    record = {"name": name, "kind": kind, "seconds": round(seconds, 4), "outcome": outcome, "attributes": attributes}
+    if kind == "stage":
+        _metrics.observe("genseo_stage_seconds", seconds, stage=name)
+    else:
+        _metrics.observe("genseo_provider_call_seconds", seconds, provider=name, outcome=outcome)
+    if attributes.get("rate_limit_wait"):
+        _metrics.inc("genseo_rate_limit_wait_seconds_total", attributes["rate_limit_wait"], provider=name)
+    model = attributes.get("model")
+    if model:
+        for token_type in ("prompt", "output"):
+            tokens = attributes.get(f"{token_type}_tokens")
+            if tokens:
+                _metrics.inc("genseo_llm_tokens_total", tokens, model=model, type=token_type)
+
+    collector = collector or _current.get()
+    if collector is not None:
+        collector.add(record)
+    return record
+
+
+@contextmanager
+def span(name: str, kind: str = "provider", **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Times the enclosed block as a span. The yielded dict takes further
+    attributes; an "error" attribute or an exception marks the span as failed.
+
+    Example:
+        with span("serpapi", query=query) as attributes:
+            attributes["rate_limit_wait"] = limiter.acquire()
+            ...
+    """
+    # Bound when the span starts, so it is still found if the block ends in another context
+    collector = _current.get()
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield attributes
+    except GeneratorExit:
+        # A streaming call whose consumer stopped early
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        if attributes.get("error"):
+            outcome = "error"
+        record_span(name, time.perf_counter() - started, kind=kind, outcome=outcome, collector=collector, **attributes)
+
+
+def usage_attributes(usage: Any) -> Dict[str, int]:
+    """
+    Token counts from a Gemini response's usage_metadata (missing counts are left out).
+    """
+    counts = {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "output_tokens": getattr(usage, "candidates_token_count", None),
+    }
+    return {key: value for key, value in counts.items() if value}
+
+
+def bind_context(func: Callable, *args, **kwargs) -> Callable[[], Any]:
+    """
+    Binds a call to a copy of the current context, so spans recorded by it in an
+    executor thread still reach the active collector.
+    """
+    context = contextvars.copy_context()
+    return lambda: context.run(func, *args, **kwargs)
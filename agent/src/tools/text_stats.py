@@ -0,0 +1,146 @@
+import re
+import math
+import time
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .prompt_budget import compact_text
+
+_TOKEN = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+STOPWORDS = frozenset("""
+aber alle allem allen aller alles als also am an ander andere anderem anderen anderer anderes auch auf aus bei bin bis bist da
+damit dann das dass dein deine dem den der des dessen dich die dies diese diesem diesen dieser dieses dir doch dort du durch ein
+eine einem einen einer eines einige er es etwas euch euer eure für gegen gibt hab habe haben hat hatte hier hin hinter ich ihm
+ihn ihnen ihr ihre ihrem ihren ihrer im in indem ins ist ja jede jedem jeden jeder jedes jetzt kann kein keine können könnt man
+manche mehr mein meine mit muss nach nicht nichts noch nun nur ob oder ohne sehr sein seine sich sie sind so solche soll sollte
+sondern sowie über um und uns unser unsere unter viel vom von vor wann war waren warum was weg weil weiter welche welchem welchen
+welcher welches wenn wer werde werden wie wieder will wir wird wo wurde wurden zu zum zur zwar zwischen
+about above after again all also and any are because been before being between both but can could did does doing down during each
+few for from further had has have having her here hers him his how into its itself just more most not now off once only other
+our out over own same she should some such than that the their theirs them then there these they this those through too under
+until very was were what when where which while who whom why will with would you your yours
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens of a parsed page, without link targets, numbers and stopwords.
+    """
+    return [
+        token for token in _TOKEN.findall(compact_text(text).lower())
+        if len(token) > 2 and token not in STOPWORDS
+    ]
+
+
+def _ngrams(tokens: Sequence[str], max_n: int) -> List[str]:
+    grams = list(tokens)
+    for n in range(2, max_n + 1):
+        grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+def _coverage(df: int, total: int) -> str:
+    return f"{df}/{total}"
+
+
+def term_statistics(articles: List[Dict[str, Any]], keyword: str, top_n: int = 20, max_ngram: int = 3) -> Dict[str, Any]:
+    """
+    Deterministic term statistics over the parsed competitor pages, computed locally.
+
+    Builds a document-term count matrix over words and n-grams, then derives
+    document frequency (in how many articles a term appears) and TF-IDF.
+
+    Args:
+        articles: Parsed pages ({"main_content", "url", ...}).
+        keyword: The mission topic; its own words are not reported as proof keywords.
+        top_n: Entries per list.
+        max_ngram: Longest phrase length.
+
+    Returns:
+        A dictionary containing:
+        - articles: Number of analyzed articles
+        - proof_keywords: Words most competitors use, with "covered in X/Y articles" counts
+        - phrases: Recurring multi-word phrases with coverage
+        - distinctive_terms: Terms that stand out in single articles (highest TF-IDF)
+        - elapsed_ms: Computation time
+    """
+    started = time.perf_counter()
+    docs = [_ngrams(tokenize(article.get("main_content", "")), max_ngram) for article in articles]
+    total = len(docs)
+    if not total or not any(docs):
+        return {"articles": total, "proof_keywords": [], "phrases": [], "distinctive_terms": [], "elapsed_ms": 0.0}
+
+    vocabulary: Dict[str, int] = {}
+    indices = [np.fromiter((vocabulary.setdefault(term, len(vocabulary)) for term in doc), dtype=np.int64, count=len(doc)) for doc in docs]
+    terms = np.array(list(vocabulary), dtype=object)
+    counts = np.vstack([np.bincount(doc, minlength=len(vocabulary)) for doc in indices]).astype(np.float64)
+
+    df = (counts > 0).sum(axis=0)
+    mentions = counts.sum(axis=0)
+    lengths = np.maximum(counts.sum(axis=1, keepdims=True), 1.0)
+    idf = np.log((1 + total) / (1 + df)) + 1
+    tfidf = (counts / lengths) * idf
+
+    keyword_words = set(tokenize(keyword))
+    is_phrase = np.array([" " in term for term in terms])
+    # Phrases have to recur to be meaningful; terms made only of the keyword's words say nothing new
+    relevant = np.array([not set(term.split()) <= keyword_words for term in terms]) & ((mentions > 1) | ~is_phrase)
+
+    # Common ground: rank by coverage first, then by how often competitors mention the term
+    min_df = 1 if total == 1 else max(2, math.ceil(0.3 * total))
+    common = relevant & (df >= min_df)
+    order = np.lexsort((-mentions, -df))
+
+    def ranked(mask: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {"term": terms[i], "articles": int(df[i]), "coverage": _coverage(int(df[i]), total), "mentions": int(mentions[i])}
+            for i in order if mask[i]
+        ][:top_n]
+
+    # Distinctive: terms only some articles use heavily; candidates for differentiating sections
+    best_doc = tfidf.argmax(axis=0)
+    best_score = tfidf.max(axis=0)
+    distinctive = relevant & (df <= max(1, total // 2)) & (mentions > 1)
+    distinctive_order = [i for i in np.argsort(-best_score) if distinctive[i]][:top_n]
+
+    return {
+        "articles": total,
+        "proof_keywords": ranked(common & ~is_phrase),
+        "phrases": ranked(common & is_phrase),
+        "distinctive_terms": [
+            {"term": terms[i], "url": articles[best_doc[i]].get("url"), "articles": int(df[i]), "score": round(float(best_score[i]), 4)}
+            for i in distinctive_order
+        ],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+
+def coverage_counts(terms: List[str], articles: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Counts in how many articles each term or phrase appears (e.g. LLM-extracted entities).
+
+    Returns:
+        {term: "X/Y"} with Y the number of articles.
+    """
+    docs = [f" {' '.join(_TOKEN.findall(compact_text(article.get('main_content', '')).lower()))} " for article in articles]
+    result = {}
+    for term in terms:
+        phrase = " ".join(_TOKEN.findall(str(term).lower()))
+        if phrase:
+            result[term] = _coverage(sum(1 for doc in docs if f" {phrase} " in doc), len(docs))
+    return result
+
+
+def with_term_statistics(analysis: Dict[str, Any], articles: List[Dict[str, Any]], keyword: str) -> Dict[str, Any]:
+    """
+    Adds the local `term_statistics` section to a semantic analysis result, including
+    how many articles mention each entity the LLM extracted.
+    """
+    stats = term_statistics(articles, keyword)
+    entities = analysis.get("entities") if isinstance(analysis.get("entities"), dict) else {}
+    names = [name for values in entities.values() if isinstance(values, list) for name in values if isinstance(name, str)]
+    if names:
+        stats["entity_coverage"] = coverage_counts(names, articles)
+    return {**analysis, "term_statistics": stats}
@@ -0,0 +1,74 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Upstreams whose connection pools get a dedicated size by default.
+# Jina Reader is hit once per competitor URL, so it needs the widest pool.
+DEFAULT_HOST_POOL_SIZES = {
+    "r.jina.ai": 32,
+}
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _parse_host_pool_sizes(raw: str) -> Dict[str, int]:
+    """
+    Parses "host=size,host=size" (e.g. HTTP_POOL_SIZES="r.jina.ai=64,serpapi.com=8").
+    """
+    sizes = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        host, size = item.split("=", 1)
+        sizes[host.strip().lower()] = int(size)
+    return sizes
+
+
+def _build_session() -> requests.Session:
+    pool_connections = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))
+    pool_maxsize = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+
+    session = requests.Session()
+    # Connections are kept alive and reused across requests and threads;
+    # retries are handled by the callers, never silently by urllib3.
+    default_adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    host_sizes = dict(DEFAULT_HOST_POOL_SIZES)
+    host_sizes.update(_parse_host_pool_sizes(os.getenv("HTTP_POOL_SIZES", "")))
+    for host, size in host_sizes.items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=0)
+        session.mount(f"https://{host}/", adapter)
+        session.mount(f"http://{host}/", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide pooled HTTP session shared by all REST tool clients.
+
+    Pool sizes are read once from HTTP_POOL_CONNECTIONS (number of host pools),
+    HTTP_POOL_MAXSIZE (connections per host) and HTTP_POOL_SIZES (per-host overrides).
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def close_session():
+    """
+    Closes all pooled connections. The next get_session() call builds a new session.
+    """
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
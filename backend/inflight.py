@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+
+class InFlightMission:
+    """
+    A running mission whose events are buffered so that any number of
+    subscribers can follow it, each from the very first event.
+    """
+    def __init__(self, source: AsyncIterator[Dict[str, Any]]):
+        self.events: List[Dict[str, Any]] = []
+        self.done = False
+        self.subscribers = 0
+        self._changed = asyncio.Condition()
+        self.task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[Dict[str, Any]]):
+        try:
+            async for event in source:
+                async with self._changed:
+                    self.events.append(event)
+                    self._changed.notify_all()
+        except Exception as e:
+            print(f"Mission failed: {e}")
+            async with self._changed:
+                self.events.append({"type": "error", "source": "mission", "message": str(e)})
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields every event of the mission, replaying those emitted before the
+        subscriber joined, until the mission finishes.
+        """
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: position < len(self.events) or self.done)
+                    pending = self.events[position:]
+                    finished = self.done
+                for event in pending:
+                    yield event
+                position += len(pending)
+                if finished and position >= len(self.events):
+                    return
+        finally:
+            self.subscribers -= 1
+
+
+class InFlightMissions:
+    """
+    Single-flight registry: concurrent requests for the same mission key attach
+    to one running mission instead of starting their own. The mission keeps
+    running when subscribers disconnect, so its result still reaches the cache.
+    """
+    def __init__(self):
+        self._missions: Dict[str, InFlightMission] = {}
+
+    def join(self, key: str, start: Callable[[], AsyncIterator[Dict[str, Any]]]) -> Tuple[InFlightMission, bool]:
+        """
+        Returns the in-flight mission for `key`, starting it with `start()` if none is running.
+
+        Returns:
+            The mission and whether this call started it.
+        """
+        mission = self._missions.get(key)
+        if mission is not None and not mission.done:
+            return mission, False
+
+        mission = InFlightMission(start())
+        self._missions[key] = mission
+        mission.task.add_done_callback(lambda _: self._forget(key, mission))
+        return mission, True
+
+    def _forget(self, key: str, mission: InFlightMission):
+        if self._missions.get(key) is mission:
+            del self._missions[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "missions": len(self._missions),
+            "subscribers": sum(mission.subscribers for mission in self._missions.values())
+        }
@@ -0,0 +1,294 @@
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from src.tools.rate_limit import rate_limit_utilization
+
+STAGES = ("research", "parsing", "llm")
+
+Runner = Callable[[Dict[str, Any], Dict[str, asyncio.Semaphore]], AsyncIterator[Dict[str, Any]]]
+
+
+@dataclass
+class BatchMission:
+    index: int
+    params: Dict[str, Any]
+    status: str = "queued"  # queued, running, done, failed, cancelled
+    step: str = ""
+    error: Optional[str] = None
+    report: Optional[Dict[str, Any]] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "topic": self.params.get("topic"),
+            "status": self.status,
+            "step": self.step,
+            "error": self.error,
+            "duration": round(self.duration, 2) if self.duration is not None else None
+        }
+
+
+@dataclass
+class BatchJob:
+    id: str
+    missions: List[BatchMission]
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updates: List[Dict[str, Any]] = field(default_factory=list)
+    tasks: List[asyncio.Task] = field(default_factory=list)
+    watcher: Optional[asyncio.Task] = None
+
+    def __post_init__(self):
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in ("queued", "running", "done", "failed", "cancelled")}
+        for mission in self.missions:
+            counts[mission.status] += 1
+        return counts
+
+    def throughput(self) -> float:
+        """
+        Completed missions per hour since the first mission of the job started.
+        """
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        completed = sum(1 for mission in self.missions if mission.status == "done")
+        return completed * 3600 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": "done" if self.done else ("running" if self.started_at else "queued"),
+            "total": len(self.missions),
+            "counts": self.counts(),
+            "missions_per_hour": round(self.throughput(), 1),
+            "elapsed": round((self.finished_at or time.time()) - self.started_at, 2) if self.started_at else 0.0,
+            "missions": [mission.summary() for mission in self.missions]
+        }
+
+    async def publish(self, update: Dict[str, Any]):
+        async with self._changed:
+            self.updates.append(update)
+            self._changed.notify_all()
+
+    async def finish(self):
+        async with self._changed:
+            self.finished_at = time.time()
+            self.updates.append({"type": "complete", "job": self.summary()})
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields all progress updates of the job, from the first one, until the job finishes.
+        """
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.updates) or self.done)
+                pending = self.updates[position:]
+                finished = self.done
+            for update in pending:
+                yield update
+            position += len(pending)
+            if finished and position >= len(self.updates):
+                return
+
+
+class JobScheduler:
+    """
+    Runs batches of missions with bounded concurrency.
+
+    At most `max_missions` missions run at once. Within them, each stage (research,
+    parsing, llm) has its own limit shared by all missions, so one mission can be
+    parsing while another waits on Gemini instead of all of them moving in lockstep.
+    New missions are held back while a provider's rate limiter is backlogged.
+    """
+    def __init__(
+        self,
+        max_missions: Optional[int] = None,
+        stage_limits: Optional[Dict[str, int]] = None,
+        max_jobs: Optional[int] = None,
+        max_backlog_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            max_missions: Missions running at the same time (env BATCH_MAX_CONCURRENT_MISSIONS).
+            stage_limits: Concurrent calls per stage (env BATCH_<STAGE>_CONCURRENCY).
+            max_jobs: Jobs kept for polling; the oldest finished jobs are dropped first.
+            max_backlog_seconds: Provider queue length above which new missions wait (env BATCH_MAX_PROVIDER_BACKLOG_SECONDS).
+        """
+        defaults = {"research": 12, "parsing": 32, "llm": 4}
+        stage_limits = stage_limits or {}
+        self.max_missions = max_missions or int(os.getenv("BATCH_MAX_CONCURRENT_MISSIONS", "8"))
+        self.stage_limits = {
+            stage: stage_limits.get(stage) or int(os.getenv(f"BATCH_{stage.upper()}_CONCURRENCY", str(defaults[stage])))
+            for stage in STAGES
+        }
+        self.max_jobs = max_jobs or int(os.getenv("BATCH_MAX_JOBS", "50"))
+        self.max_backlog_seconds = max_backlog_seconds if max_backlog_seconds is not None else float(os.getenv("BATCH_MAX_PROVIDER_BACKLOG_SECONDS", "20"))
+
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._missions: Optional[asyncio.Semaphore] = None
+        self._stages: Dict[str, asyncio.Semaphore] = {}
+        self.completed = 0
+        self.busy_since: Optional[float] = None
+        self.busy_seconds = 0.0
+        self._active = 0
+
+    def _gates(self):
+        # Created lazily so they bind to the running event loop
+        if self._missions is None:
+            self._missions = asyncio.Semaphore(self.max_missions)
+            self._stages = {stage: asyncio.Semaphore(limit) for stage, limit in self.stage_limits.items()}
+        return self._missions, self._stages
+
+    def submit(self, missions: List[Dict[str, Any]], run: Runner) -> BatchJob:
+        """
+        Queues a batch of missions.
+
+        Args:
+            missions: Mission parameters (topic, content_type, target_group, location, language).
+            run: Starts a mission for the given parameters and stage gates and returns its event stream.
+
+        Returns:
+            The created job.
+        """
+        job = BatchJob(
+            id=uuid.uuid4().hex[:12],
+            missions=[BatchMission(index=i, params=params) for i, params in enumerate(missions)]
+        )
+        self._jobs[job.id] = job
+        self._evict()
+
+        job.tasks = [asyncio.create_task(self._run_mission(job, mission, run)) for mission in job.missions]
+        job.watcher = asyncio.create_task(self._finish(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        for task in job.tasks:
+            task.cancel()
+        return True
+
+    def _evict(self):
+        while len(self._jobs) > self.max_jobs:
+            finished = [job_id for job_id, job in self._jobs.items() if job.done]
+            if not finished:
+                break
+            del self._jobs[finished[0]]
+
+    async def _finish(self, job: BatchJob):
+        await asyncio.gather(*job.tasks, return_exceptions=True)
+        await job.finish()
+
+    async def _run_mission(self, job: BatchJob, mission: BatchMission, run: Runner):
+        missions_gate, stages = self._gates()
+        try:
+            async with missions_gate:
+                await self._wait_for_capacity(job, mission)
+                mission.status = "running"
+                mission.started_at = time.time()
+                if job.started_at is None:
+                    job.started_at = mission.started_at
+                self._mark_busy(+1)
+                try:
+                    await job.publish({"type": "mission", **mission.summary()})
+                    async for event in run(mission.params, stages):
+                        await self._track(job, mission, event)
+                finally:
+                    self._mark_busy(-1)
+        except asyncio.CancelledError:
+            mission.status = "cancelled"
+        except Exception as e:
+            print(f"Batch mission '{mission.params.get('topic')}' failed: {e}")
+            mission.status = "failed"
+            mission.error = str(e)
+
+        if mission.status == "running":
+            mission.status = "failed"
+            mission.error = mission.error or "Mission ended without a result."
+        mission.finished_at = time.time()
+        if mission.status == "done":
+            self.completed += 1
+        await job.publish({"type": "mission", **mission.summary()})
+
+    async def _wait_for_capacity(self, job: BatchJob, mission: BatchMission):
+        """
+        Defers the start of a mission while any provider would make it queue longer than
+        max_backlog_seconds. Exhausted daily quotas don't block: the affected provider
+        returns an error and the mission continues with the remaining sources.
+        """
+        while True:
+            backlog = max(usage["backlog_seconds"] for usage in rate_limit_utilization().values())
+            if backlog <= self.max_backlog_seconds:
+                return
+            if mission.step != "deferred":
+                mission.step = "deferred"
+                await job.publish({"type": "mission", **mission.summary()})
+            await asyncio.sleep(min(backlog - self.max_backlog_seconds, 5.0))
+
+    async def _track(self, job: BatchJob, mission: BatchMission, event: Dict[str, Any]):
+        if event.get("type") == "status":
+            mission.step = event.get("step", "")
+            await job.publish({"type": "mission", **mission.summary()})
+        elif event.get("type") == "complete":
+            mission.report = event.get("report", {})
+            briefing = mission.report.get("briefing", "")
+            if briefing and not briefing.startswith("Error"):
+                mission.status = "done"
+            else:
+                mission.status = "failed"
+                mission.error = briefing or "No briefing generated."
+
+    def _mark_busy(self, delta: int):
+        now = time.time()
+        if self._active == 0 and delta > 0:
+            self.busy_since = now
+        self._active += delta
+        if self._active == 0 and self.busy_since is not None:
+            self.busy_seconds += now - self.busy_since
+            self.busy_since = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Scheduler-wide counters. Throughput is completed missions per hour of time
+        during which at least one batch mission was running.
+        """
+        busy = self.busy_seconds + (time.time() - self.busy_since if self.busy_since else 0.0)
+        running = sum(job.counts()["running"] for job in self._jobs.values())
+        queued = sum(job.counts()["queued"] for job in self._jobs.values())
+        return {
+            "jobs": len(self._jobs),
+            "running": running,
+            "queued": queued,
+            "completed": self.completed,
+            "busy_seconds": round(busy, 2),
+            "missions_per_hour": round(self.completed * 3600 / busy, 1) if busy > 0 else 0.0,
+            "limits": {"missions": self.max_missions, **self.stage_limits},
+            "providers": rate_limit_utilization()
+        }
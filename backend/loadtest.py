@@ -0,0 +1,344 @@
+"""
+Load test for the /api/mission/stream SSE endpoint.
+
+Starts the stand-in provider server (agent/benchmarks/standin_server.py) and one
+uvicorn process running this backend against it (Google Ads, which is gRPC, is
+replayed in-process), then ramps the number of concurrent SSE clients. Each client
+runs missions back to back for --duration seconds per level. Reported per level:
+time to first event, per-stage event latency, end-to-end p50/p95/p99, event
+inter-arrival gaps, dropped connections, and the server's event loop lag, thread
+pool queue and thread count polled from /api/runtime.
+
+Usage (from backend/):
+    uv run python loadtest.py --levels 1,10,25,50 --duration 60 --latency-scale 0.5
+    uv run python loadtest.py --url http://127.0.0.1:8000 --levels 5   # an already running server
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent
+AGENT_DIR = BACKEND_DIR.parent / "agent"
+DEFAULT_TOPICS = [
+    "Familienhotel Mallorca",
+    "Wellnesshotel Tirol",
+    "Vegane Lederschuhe",
+    "E-Bike Test 2026",
+    "Ferienwohnung Ostsee",
+    "Kaffeevollautomat kaufen",
+]
+STAGES = ("init", "research", "parsing", "analysis", "briefing")
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+class TopicMix:
+    """
+    Picks mission topics. A `duplicate_share` of missions reuses a base topic
+    verbatim (exercising in-flight joining and the mission cache); all others get
+    a unique variant so they run for real.
+    """
+    def __init__(self, topics: List[str], duplicate_share: float = 0.0, seed: int = 0):
+        self.topics = topics
+        self.duplicate_share = duplicate_share
+        self.rng = random.Random(seed)
+        self.counter = 0
+
+    def next(self) -> str:
+        self.counter += 1
+        topic = self.rng.choice(self.topics)
+        if self.rng.random() < self.duplicate_share:
+            return topic
+        return f"{topic} {self.counter}"
+
+
+async def run_mission(client: httpx.AsyncClient, base_url: str, topic: str, use_cache: bool) -> Dict[str, Any]:
+    """
+    Opens one SSE stream and records when its events arrive, relative to the request.
+    """
+    started = time.perf_counter()
+    record = {"topic": topic, "first_event": None, "stages": {}, "gaps": [], "total": None, "events": 0, "dropped": None}
+    last = None
+    try:
+        params = {"topic": topic, "cache": str(use_cache).lower()}
+        async with client.stream("GET", f"{base_url}/api/mission/stream", params=params) as response:
+            if response.status_code != 200:
+                record["dropped"] = f"HTTP {response.status_code}"
+                return record
+            async for line in response.aiter_lines():
+                # Skip keep-alive comments and blank separators
+                if not line.startswith("data:"):
+                    continue
+                now = time.perf_counter() - started
+                event = json.loads(line[5:].strip())
+                record["events"] += 1
+                if record["first_event"] is None:
+                    record["first_event"] = now
+                if last is not None:
+                    record["gaps"].append(now - last)
+                last = now
+                if event.get("type") == "status":
+                    record["stages"].setdefault(event.get("step"), now)
+                elif event.get("type") == "complete":
+                    record["total"] = now
+        if record["total"] is None:
+            record["dropped"] = "closed before complete"
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        record["dropped"] = type(e).__name__
+    return record
+
+
+async def poll_runtime(client: httpx.AsyncClient, base_url: str, samples: List[Dict[str, Any]], stop: asyncio.Event, interval: float = 1.0):
+    while not stop.is_set():
+        try:
+            response = await client.get(f"{base_url}/api/runtime", timeout=5)
+            if response.status_code == 200:
+                samples.append(response.json())
+        except httpx.HTTPError:
+            # A server too busy to answer within 5s shows up as missing samples and high loop lag
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, topics: TopicMix, use_cache: bool, read_timeout: float) -> Dict[str, Any]:
+    """
+    Runs `concurrency` clients that start missions back to back until `duration` has passed.
+    """
+    limits = httpx.Limits(max_connections=concurrency + 5, max_keepalive_connections=concurrency + 5)
+    timeout = httpx.Timeout(10.0, read=read_timeout)
+    records: List[Dict[str, Any]] = []
+    runtime_samples: List[Dict[str, Any]] = []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client, httpx.AsyncClient() as monitor_client:
+        monitor = asyncio.create_task(poll_runtime(monitor_client, base_url, runtime_samples, stop))
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def user(i: int):
+            # Spread the first requests over a second instead of sending them all at once
+            await asyncio.sleep(i / concurrency)
+            while time.perf_counter() < deadline:
+                records.append(await run_mission(client, base_url, topics.next(), use_cache))
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        wall = time.perf_counter() - started
+        stop.set()
+        await monitor
+
+    completed = [record for record in records if record["dropped"] is None]
+    gaps = [gap for record in completed for gap in record["gaps"]]
+    lags = [sample["event_loop"]["last_ms"] for sample in runtime_samples]
+    return {
+        "concurrency": concurrency,
+        "missions": len(records),
+        "completed": len(completed),
+        "dropped": len(records) - len(completed),
+        "drop_reasons": dict(Counter(record["dropped"] for record in records if record["dropped"])),
+        "missions_per_minute": round(len(completed) / wall * 60, 1),
+        "first_event_p50": _percentile([r["first_event"] for r in records if r["first_event"] is not None], 0.5),
+        "first_event_p95": _percentile([r["first_event"] for r in records if r["first_event"] is not None], 0.95),
+        "end_to_end_p50": _percentile([r["total"] for r in completed], 0.5),
+        "end_to_end_p95": _percentile([r["total"] for r in completed], 0.95),
+        "end_to_end_p99": _percentile([r["total"] for r in completed], 0.99),
+        "stage_p50": {stage: _percentile([r["stages"][stage] for r in completed if stage in r["stages"]], 0.5) for stage in STAGES},
+        "gap_p95": _percentile(gaps, 0.95),
+        "gap_max": round(max(gaps), 3) if gaps else None,
+        "server": {
+            "runtime_samples": len(runtime_samples),
+            "loop_lag_p95_ms": _percentile(lags, 0.95),
+            "loop_lag_max_ms": max(lags) if lags else None,
+            "executor_queued_max": max((s["default_executor"]["queued"] for s in runtime_samples), default=None),
+            "executor_workers_max": max((s["default_executor"]["workers"] for s in runtime_samples), default=None),
+            "threads_max": max((s["threads"] for s in runtime_samples), default=None),
+            "streams_max": max((s["streams"]["active"] for s in runtime_samples), default=None),
+        },
+    }
+
+
+def print_level(level: Dict[str, Any]):
+    server = level["server"]
+    stages = ", ".join(f"{stage} {seconds}" for stage, seconds in level["stage_p50"].items() if seconds is not None)
+    print(
+        f"N={level['concurrency']:<4} missions {level['completed']}/{level['missions']} ({level['missions_per_minute']}/min), dropped {level['dropped']} {level['drop_reasons'] or ''}\n"
+        f"       first event p50/p95 {level['first_event_p50']}/{level['first_event_p95']}s, "
+        f"end-to-end p50/p95/p99 {level['end_to_end_p50']}/{level['end_to_end_p95']}/{level['end_to_end_p99']}s, "
+        f"event gap p95/max {level['gap_p95']}/{level['gap_max']}s\n"
+        f"       stage reached (p50 s): {stages}\n"
+        f"       server: loop lag p95/max {server['loop_lag_p95_ms']}/{server['loop_lag_max_ms']} ms, "
+        f"thread pool queue max {server['executor_queued_max']} (workers {server['executor_workers_max']}), "
+        f"threads max {server['threads_max']}, streams max {server['streams_max']}"
+    )
+
+
+def _wait_until_up(url: str, timeout: float = 120, interval: float = 0.5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(interval)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_standin(args: argparse.Namespace) -> subprocess.Popen:
+    """
+    Starts the stand-in provider server as a subprocess (without waiting for it).
+    """
+    standin_cmd = [sys.executable, "-m", "benchmarks.standin_server", "--port", str(args.standin_port), "--latency-scale", str(args.latency_scale)]
+    for error_rate in args.error_rate:
+        standin_cmd += ["--error-rate", error_rate]
+    return subprocess.Popen(standin_cmd, cwd=AGENT_DIR, stdout=subprocess.DEVNULL)
+
+
+def start_backend(args: argparse.Namespace, extra_env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """
+    Starts the backend, pointed at the stand-in server, as a subprocess (without waiting for it).
+    """
+    sys.path.append(str(AGENT_DIR))
+    from benchmarks.mission_benchmark import DUMMY_CREDENTIALS
+
+    standin_url = f"http://127.0.0.1:{args.standin_port}"
+    env = {**DUMMY_CREDENTIALS, **os.environ}
+    env.update({
+        "SERPAPI_BASE_URL": f"{standin_url}/search",
+        "CUSTOM_SEARCH_BASE_URL": f"{standin_url}/customsearch/v1",
+        "JINA_READER_BASE_URL": f"{standin_url}/jina/",
+        "GEMINI_BASE_URL": standin_url,
+        # One host serves every provider, so it gets a pool sized for the load
+        "HTTP_POOL_SIZES": f"127.0.0.1:{args.standin_port}={max(64, 16 * max(args.levels))}",
+        "PAGE_CACHE_ENABLED": "false",
+        "QUERY_CACHE_ENABLED": "false",
+    })
+    if not args.cache:
+        env["MISSION_CACHE_ENABLED"] = "false"
+    if not args.rate_limit:
+        env["RATE_LIMIT_ENABLED"] = "false"
+    env.update(extra_env or {})
+
+    return subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "--serve-backend", "--port", str(args.port), "--latency-scale", str(args.latency_scale)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+
+
+def start_stubbed_stack(args: argparse.Namespace) -> List[subprocess.Popen]:
+    """
+    Starts the stand-in provider server and the backend (pointed at it) as subprocesses.
+    """
+    processes = [start_standin(args), start_backend(args)]
+    _wait_until_up(f"http://127.0.0.1:{args.standin_port}/health")
+    _wait_until_up(f"http://127.0.0.1:{args.port}/health")
+    _wait_for_agent(f"http://127.0.0.1:{args.port}")
+    return processes
+
+
+def _wait_for_agent(base_url: str, timeout: float = 120):
+    """
+    Waits until the backend finished loading the agent in the background, so the
+    first level does not measure the cold start (see startup_benchmark.py).
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if httpx.get(f"{base_url}/api/runtime", timeout=5).json().get("agent") != "loading":
+            return
+        time.sleep(0.2)
+
+
+def serve_backend(port: int, latency_scale: float):
+    """
+    Runs the backend with Google Ads replayed in-process; every other provider
+    is reached over HTTP through the configured base URLs.
+    """
+    import uvicorn
+    # Appended like main.py does, so agent/main.py does not shadow this directory's main.py
+    sys.path.append(str(AGENT_DIR))
+    from benchmarks.replay import Replay, ReplayAdsLibrary
+    import src.tools.google_ads as google_ads
+
+    google_ads.LibGoogleAdsClient = ReplayAdsLibrary(Replay(scale=latency_scale))
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def main_async(args: argparse.Namespace, base_url: str) -> int:
+    topics = [line.strip() for line in Path(args.topics_file).read_text(encoding="utf-8").splitlines() if line.strip()] if args.topics_file else DEFAULT_TOPICS
+    mix = TopicMix(topics, args.duplicate_share, args.seed)
+    levels = []
+    for concurrency in args.levels:
+        print(f"Ramping to {concurrency} concurrent streams for {args.duration:.0f}s...", file=sys.stderr)
+        level = await run_level(base_url, concurrency, args.duration, mix, args.cache, args.read_timeout)
+        print_level(level)
+        levels.append(level)
+        saturated = level["dropped"] > 0 or (args.max_first_event_p95 and (level["first_event_p95"] or 0) > args.max_first_event_p95)
+        if saturated:
+            print(f"Saturated at {concurrency} concurrent streams; stopping the ramp.")
+            break
+
+    sustained = [level["concurrency"] for level in levels if level["dropped"] == 0 and not (args.max_first_event_p95 and (level["first_event_p95"] or 0) > args.max_first_event_p95)]
+    print(f"\nHighest level without drops{' or slow first events' if args.max_first_event_p95 else ''}: {max(sustained) if sustained else 'none'}")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": vars(args), "levels": levels}, indent=2))
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SSE load test of /api/mission/stream against stubbed providers.")
+    parser.add_argument("--levels", default="1,5,10,25", type=lambda value: [int(n) for n in value.split(",")], help="Concurrent streams per ramp step")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per level; running missions are finished afterwards")
+    parser.add_argument("--url", help="Test an already running backend instead of starting the stubbed stack")
+    parser.add_argument("--port", type=int, default=8101, help="Port of the spawned backend")
+    parser.add_argument("--standin-port", type=int, default=8190, help="Port of the spawned stand-in provider server")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to the stand-in provider latencies")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="PROVIDER=RATE", help="Injected provider error rate, e.g. jina=0.05")
+    parser.add_argument("--topics-file", help="Topics, one per line (default: a built-in mix)")
+    parser.add_argument("--duplicate-share", type=float, default=0.0, help="Share of missions reusing a topic verbatim (joins identical running missions)")
+    parser.add_argument("--cache", action="store_true", help="Allow mission cache replays (default: every mission runs)")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep provider rate limiting enabled in the spawned backend")
+    parser.add_argument("--read-timeout", type=float, default=300, help="Seconds without any stream data before a connection counts as dropped")
+    parser.add_argument("--max-first-event-p95", type=float, help="Stop ramping once the p95 time to first event exceeds this many seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--serve-backend", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.serve_backend:
+        serve_backend(args.port, args.latency_scale)
+        return 0
+
+    processes = [] if args.url else start_stubbed_stack(args)
+    try:
+        return asyncio.run(main_async(args, args.url or f"http://127.0.0.1:{args.port}"))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 import asyncio
 import json
-from fastapi import FastAPI, Query
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sse_starlette.sse import EventSourceResponse
 from pydantic import BaseModel
+from typing import List, Optional
 
 # Import Agent (adjust path if needed, or better, install agent as a package)
 # For now, we'll append the agent directory to sys.path
@@ -21,11 +25,30 @@ from pathlib import Path
 # Let's add 'agent' to sys.path.
 agent_path = Path(__file__).resolve().parents[1] / 'agent'
 sys.path.append(str(agent_path))
+# Backend helper modules live next to this file (needed when started as backend.main)
+sys.path.append(str(Path(__file__).resolve().parent))
 
-from src.agent import SEOAgent
+from inflight import InFlightMissions
+from jobs import JobScheduler
+from mission_cache import MissionCache
+from runtime import RuntimeMonitor
 from src.config import settings
+from src.tools.telemetry import get_metrics
+from src.tools.transport import close_session
 
-app = FastAPI(title="GenSEO Agent API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    runtime.start()
+    if os.getenv("AGENT_PRELOAD", "true").lower() not in ("0", "false", "no"):
+        # Warm up in the background: the server accepts requests right away and
+        # the first mission waits for the same load
+        get_agent().add_done_callback(_report_preload)
+    yield
+    await runtime.stop()
+    # Release the pooled keep-alive connections shared by all tool clients
+    close_session()
+
+app = FastAPI(title="GenSEO Agent API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -36,7 +59,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-agent = SEOAgent()
+_agent: Optional[asyncio.Future] = None
+mission_cache = MissionCache()
+in_flight = InFlightMissions()
+scheduler = JobScheduler()
+runtime = RuntimeMonitor()
 
 class MissionRequest(BaseModel):
     topic: str
@@ -45,30 +72,249 @@ class MissionRequest(BaseModel):
     location: str = "Germany"
     language: str = "German"
 
+class BatchRequest(BaseModel):
+    missions: List[MissionRequest]
+    use_cache: bool = True
+
+def _load_agent():
+    # Deferred: the agent pulls in the ADK and the Gemini SDK, which dominate the import time
+    from src.agent import SEOAgent
+    return SEOAgent()
+
+def get_agent() -> asyncio.Future:
+    """
+    Returns a future of the process-wide SEOAgent, loading it in a worker thread
+    on first use so that neither startup nor the event loop waits for the import.
+    """
+    global _agent
+    if _agent is None or (_agent.done() and (_agent.cancelled() or _agent.exception() is not None)):
+        _agent = asyncio.ensure_future(asyncio.to_thread(_load_agent))
+    return _agent
+
+def agent_state() -> str:
+    """
+    "unloaded", "loading", "ready" or "failed".
+    """
+    if _agent is None:
+        return "unloaded"
+    if not _agent.done():
+        return "loading"
+    return "failed" if _agent.cancelled() or _agent.exception() is not None else "ready"
+
+def _report_preload(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Agent preload failed (retrying on the first mission): {future.exception()}")
+
+async def execute_mission(**params):
+    # Shielded: a client disconnecting during the load must not cancel it for everyone else
+    agent = await asyncio.shield(get_agent())
+    async for event in agent.execute_mission(**params):
+        yield event
+
+def run_mission(request: MissionRequest, stream_briefing: bool = True, stages: Optional[dict] = None):
+    """
+    Runs a mission and records its event stream in the mission cache.
+    """
+    key = mission_cache.key(request.model_dump())
+    return mission_cache.record(key, execute_mission(**request.model_dump(), stream_briefing=stream_briefing, stages=stages))
+
+async def run_batch_mission(params: dict, stages: dict, use_cache: bool = True):
+    """
+    Runs one mission of a batch under the scheduler's stage gates, or replays it from the mission cache.
+    """
+    request = MissionRequest(**params)
+    cached = mission_cache.get(mission_cache.key(params)) if use_cache and mission_cache.enabled else None
+    if cached:
+        for event in cached.events:
+            yield event
+        return
+    async for event in run_mission(request, stream_briefing=False, stages=stages):
+        yield event
+
+def join_mission(request: MissionRequest):
+    """
+    Attaches to the running mission with identical parameters, or starts one.
+    The shared run always streams the briefing; subscribers that did not ask
+    for it drop the 'delta' events.
+
+    Returns:
+        The in-flight mission and whether this call started it.
+    """
+    key = mission_cache.key(request.model_dump())
+    return in_flight.join(key, lambda: run_mission(request, stream_briefing=True))
+
 @app.get("/api/mission/stream")
 async def stream_mission(
     topic: str = Query(..., description="Main Keyword/Topic"),
     content_type: str = Query("Landingpage", description="Type of content"),
     target_group: str = Query("General Audience", description="Target Audience"),
     location: str = Query("Germany", description="Target Region"),
-    language: str = Query("German", description="Language")
+    language: str = Query("German", description="Language"),
+    stream_briefing: bool = Query(True, description="Stream the briefing as incremental 'delta' events"),
+    use_cache: bool = Query(True, alias="cache", description="Replay a cached result of an identical mission if available"),
+    preview: bool = Query(False, description="Fast preview without LLM calls: local term statistics, no briefing")
 ):
     """
     Streams the SEO mission execution events.
     """
+    request = MissionRequest(
+        topic=topic,
+        content_type=content_type,
+        target_group=target_group,
+        location=location,
+        language=language
+    )
+    key = mission_cache.key(request.model_dump())
+    cached = mission_cache.get(key) if use_cache and not preview and mission_cache.enabled else None
+
     async def event_generator():
-        async for event in agent.execute_mission(
-            topic=topic,
-            content_type=content_type,
-            target_group=target_group,
-            location=location,
-            language=language
-        ):
+        runtime.stream_opened()
+        try:
+            async for event in mission_events():
+                yield event
+        finally:
+            runtime.stream_closed()
+
+    async def mission_events():
+        if preview:
+            # Previews are cheap and never cached; they don't join full missions either
+            async for event in execute_mission(**request.model_dump(), preview=True):
+                yield {"data": json.dumps(event)}
+            return
+
+        if cached:
+            yield {"data": json.dumps({"type": "log", "message": f"Replaying cached mission from {int(cached.age // 60)} minutes ago."})}
+            for event in cached.events:
+                yield {"data": json.dumps(event)}
+            if mission_cache.needs_refresh(cached):
+                mission_cache.refresh(key, lambda: join_mission(request)[0].subscribe())
+            return
+
+        mission, started = join_mission(request)
+        if not started:
+            yield {"data": json.dumps({"type": "log", "message": "Joined an identical mission already in progress."})}
+        async for event in mission.subscribe():
+            if event.get("type") == "delta" and not stream_briefing:
+                continue
             # SSE format: data: <json>\n\n
             yield {"data": json.dumps(event)}
 
     return EventSourceResponse(event_generator())
 
+@app.delete("/api/mission/cache")
+def invalidate_mission_cache(
+    topic: Optional[str] = Query(None, description="Drop only this mission; omit to clear the whole cache"),
+    content_type: str = Query("Landingpage"),
+    target_group: str = Query("General Audience"),
+    location: str = Query("Germany"),
+    language: str = Query("German")
+):
+    """
+    Invalidates cached mission results.
+    """
+    if topic is None:
+        return {"invalidated": mission_cache.invalidate()}
+    request = MissionRequest(
+        topic=topic,
+        content_type=content_type,
+        target_group=target_group,
+        location=location,
+        language=language
+    )
+    return {"invalidated": mission_cache.invalidate(mission_cache.key(request.model_dump()))}
+
+@app.post("/api/batch")
+async def submit_batch(batch: BatchRequest):
+    """
+    Queues a batch of missions. Poll /api/batch/{job_id} or stream /api/batch/{job_id}/stream for progress.
+    """
+    if not batch.missions:
+        raise HTTPException(status_code=400, detail="No missions given")
+    job = scheduler.submit(
+        [mission.model_dump() for mission in batch.missions],
+        lambda params, stages: run_batch_mission(params, stages, use_cache=batch.use_cache)
+    )
+    return {"job_id": job.id, "total": len(job.missions)}
+
+@app.get("/api/batch")
+def batch_stats():
+    """
+    Scheduler counters, including throughput in missions per hour.
+    """
+    return scheduler.stats()
+
+@app.get("/api/batch/{job_id}")
+def batch_status(job_id: str):
+    return get_job(job_id).summary()
+
+@app.get("/api/batch/{job_id}/stream")
+async def stream_batch(job_id: str):
+    """
+    Streams the progress of a batch job: a 'mission' event per status change, then 'complete'.
+    """
+    job = get_job(job_id)
+
+    async def event_generator():
+        async for update in job.subscribe():
+            yield {"data": json.dumps(update)}
+
+    return EventSourceResponse(event_generator())
+
+@app.get("/api/batch/{job_id}/results")
+def batch_results(job_id: str):
+    """
+    Returns the reports of all finished missions of a batch job.
+    """
+    job = get_job(job_id)
+    return {
+        "job_id": job.id,
+        "status": job.summary()["status"],
+        "results": [
+            {**mission.summary(), "report": mission.report}
+            for mission in job.missions if mission.report is not None
+        ]
+    }
+
+@app.delete("/api/batch/{job_id}")
+def cancel_batch(job_id: str):
+    """
+    Cancels the queued and running missions of a batch job.
+    """
+    if not scheduler.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"cancelled": job_id}
+
+def get_job(job_id: str):
+    job = scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/runtime")
+def runtime_stats():
+    """
+    Server saturation: event loop lag, default thread pool usage, open streams and running missions.
+    """
+    return {**runtime.stats(), "missions": in_flight.stats(), "agent": agent_state()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus metrics: stage and provider call duration histograms, Gemini token
+    counters, and gauges for event loop lag, thread pool queue and running missions.
+    """
+    registry = get_metrics()
+    lag = runtime.lag()
+    executor = runtime.executor()
+    missions = in_flight.stats()
+    registry.set_gauge("genseo_event_loop_lag_seconds", lag["last_ms"] / 1000, "How late the event loop's periodic wake-up fired (last sample).")
+    registry.set_gauge("genseo_event_loop_lag_p95_seconds", lag["p95_ms"] / 1000, "95th percentile event loop lag over the recent samples.")
+    registry.set_gauge("genseo_executor_queued_calls", executor["queued"], "Blocking calls waiting for a free worker of the default thread pool.")
+    registry.set_gauge("genseo_executor_workers", executor["workers"], "Threads of the default thread pool.")
+    registry.set_gauge("genseo_active_streams", runtime.active_streams, "Open mission SSE streams.")
+    registry.set_gauge("genseo_missions_in_flight", missions["missions"], "Missions currently running for streaming clients.")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
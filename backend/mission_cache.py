@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+@dataclass
+class CachedMission:
+    events: List[Dict[str, Any]]
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class MissionCache:
+    """
+    In-memory LRU cache of recorded mission event streams, keyed by the normalized
+    request parameters. A cached stream can be replayed instantly; entries older
+    than `refresh_after_seconds` are re-run in the background after being served.
+    """
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        refresh_after_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("MISSION_CACHE_TTL_SECONDS", str(24 * 3600)))
+        self.refresh_after_seconds = refresh_after_seconds if refresh_after_seconds is not None else int(os.getenv("MISSION_CACHE_REFRESH_AFTER_SECONDS", "3600"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("MISSION_CACHE_MAX_ENTRIES", "100"))
+        self.enabled = os.getenv("MISSION_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+        self._entries: "OrderedDict[str, CachedMission]" = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        normalized = {
+            k: " ".join(v.lower().split()) if isinstance(v, str) else v
+            for k, v in params.items()
+        }
+        return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+    def get(self, key: str) -> Optional[CachedMission]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.age > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, events: List[Dict[str, Any]]) -> bool:
+        """
+        Stores a recorded event stream if the mission completed with a briefing.
+
+        Returns:
+            True if the stream was cached; always False while the cache is disabled.
+        """
+        if not self.enabled:
+            return False
+        if not events or events[-1].get("type") != "complete":
+            return False
+        briefing = events[-1].get("report", {}).get("briefing", "")
+        if not briefing or briefing.startswith("Error"):
+            return False
+
+        self._entries[key] = CachedMission(events=events)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Drops one entry, or all entries if no key is given.
+
+        Returns:
+            The number of dropped entries.
+        """
+        if key is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+        return 1 if self._entries.pop(key, None) is not None else 0
+
+    def needs_refresh(self, entry: CachedMission) -> bool:
+        return entry.age > self.refresh_after_seconds
+
+    def refresh(self, key: str, run: Callable[[], AsyncIterator[Dict[str, Any]]]):
+        """
+        Re-runs a mission in the background. `run` records its events (e.g. via
+        record()), so the fresh stream replaces the entry once it completes.
+        """
+        if key in self._refreshing:
+            return
+
+        async def consume():
+            try:
+                async for _ in run():
+                    pass
+            except Exception as e:
+                print(f"Background mission refresh failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(consume())
+
+    async def record(self, key: str, events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Passes a live mission stream through and caches it once it completes.
+        Incremental 'delta' events are not recorded; the final data events carry the full results.
+        Neither are 'timing' events, which describe only the original run.
+        """
+        recorded = []
+        async for event in events:
+            if self.enabled and event.get("type") not in ("delta", "timing"):
+                recorded.append(event)
+            yield event
+        self.put(key, recorded)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "refreshing": len(self._refreshing)}
@@ -0,0 +1,95 @@
+import os
+import time
+import asyncio
+import resource
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class RuntimeMonitor:
+    """
+    Tracks how saturated the server process is: event loop lag (how late a
+    periodic wake-up fires), the default thread pool that runs the blocking
+    tool calls, thread count and open SSE streams.
+    """
+    def __init__(self, interval: Optional[float] = None, window: int = 240):
+        self.interval = interval if interval is not None else float(os.getenv("RUNTIME_LAG_INTERVAL_SECONDS", "0.25"))
+        self._lags = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.max_lag = 0.0
+        self.active_streams = 0
+        self.max_streams = 0
+        self.total_streams = 0
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stream_opened(self):
+        self.active_streams += 1
+        self.total_streams += 1
+        self.max_streams = max(self.max_streams, self.active_streams)
+
+    def stream_closed(self):
+        self.active_streams -= 1
+
+    def lag(self) -> Dict[str, float]:
+        lags = sorted(self._lags)
+        if not lags:
+            return {"last_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "last_ms": round(self._lags[-1] * 1000, 1),
+            "p95_ms": round(lags[min(len(lags) - 1, int(0.95 * len(lags)))] * 1000, 1),
+            "max_ms": round(self.max_lag * 1000, 1)
+        }
+
+    def executor(self) -> Dict[str, Any]:
+        """
+        The default executor behind asyncio.to_thread. Its attributes are private,
+        so every value is read defensively.
+        """
+        executor = getattr(self._loop, "_default_executor", None) if self._loop else None
+        if executor is None:
+            return {"max_workers": None, "workers": 0, "idle": 0, "queued": 0}
+        workers = len(getattr(executor, "_threads", ()))
+        idle_semaphore = getattr(executor, "_idle_semaphore", None)
+        work_queue = getattr(executor, "_work_queue", None)
+        return {
+            "max_workers": getattr(executor, "_max_workers", None),
+            "workers": workers,
+            "idle": getattr(idle_semaphore, "_value", 0),
+            # Calls waiting for a free worker: the clearest sign that blocking calls are the bottleneck
+            "queued": work_queue.qsize() if work_queue is not None else 0
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "event_loop": self.lag(),
+            "default_executor": self.executor(),
+            "threads": threading.active_count(),
+            "streams": {"active": self.active_streams, "max": self.max_streams, "total": self.total_streams},
+            "process": {
+                "cpu_seconds": round(time.process_time(), 2),
+                # ru_maxrss is in KiB on Linux
+                "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+            }
+        }
@@ -0,0 +1,163 @@
+"""
+Cold start benchmark of the backend.
+
+Measures, each in fresh processes:
+  - import: `import main` (the module uvicorn loads), and which heavy SDKs it pulled in
+  - ready: spawning the backend until /health answers
+  - first request: the first mission on a just started backend (time to first event
+    and to 'complete'), which pays for loading the agent and building its clients,
+    next to a second mission on the same, now warm process
+
+Providers are the stand-in server and the Google Ads replay used by loadtest.py.
+Thresholds turn it into a regression check: the exit code is 1 if a median exceeds one.
+
+Usage (from backend/):
+    uv run python startup_benchmark.py --runs 5
+    uv run python startup_benchmark.py --max-import-seconds 1.0 --max-first-request-seconds 6 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from loadtest import AGENT_DIR, BACKEND_DIR, _wait_until_up, run_mission, start_backend, start_standin
+
+# Loaded lazily by the agent; none of them should be imported by `import main`
+HEAVY_MODULES = ("google.adk", "google.genai", "google.ads.googleads", "numpy")
+
+IMPORT_SNIPPET = f"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.append({str(AGENT_DIR)!r})
+import main
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "heavy_modules": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import() -> Dict[str, Any]:
+    """
+    Imports the backend in a fresh interpreter.
+    """
+    sys.path.append(str(AGENT_DIR))
+    from benchmarks.mission_benchmark import DUMMY_CREDENTIALS
+
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env={**DUMMY_CREDENTIALS, **os.environ},
+        capture_output=True, text=True
+    )
+    process_seconds = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing the backend failed:\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {"seconds": result["seconds"], "process_seconds": process_seconds, "heavy_modules": result["heavy_modules"]}
+
+
+async def first_requests(base_url: str, topic: str) -> Dict[str, Any]:
+    async with httpx.AsyncClient(timeout=httpx.Timeout(10, read=300)) as client:
+        first = await run_mission(client, base_url, f"{topic} cold", use_cache=False)
+        second = await run_mission(client, base_url, f"{topic} warm", use_cache=False)
+    for record in (first, second):
+        if record["dropped"]:
+            raise RuntimeError(f"Mission '{record['topic']}' failed: {record['dropped']}")
+    return {
+        "first_event": first["first_event"], "first_total": first["total"],
+        "warm_first_event": second["first_event"], "warm_total": second["total"],
+    }
+
+
+def measure_server(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Starts the backend and sends it its first two missions.
+    """
+    started = time.perf_counter()
+    backend = start_backend(args, {"AGENT_PRELOAD": str(args.preload).lower()})
+    try:
+        _wait_until_up(f"http://127.0.0.1:{args.port}/health", interval=0.02)
+        ready = time.perf_counter() - started
+        return {"ready": ready, **asyncio.run(first_requests(f"http://127.0.0.1:{args.port}", args.topic))}
+    finally:
+        backend.terminate()
+        backend.wait(timeout=10)
+
+
+def _median(runs: List[Dict[str, Any]], key: str) -> Optional[float]:
+    values = [run[key] for run in runs if run.get(key) is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold start benchmark: backend import time, time to ready and first-request latency.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per measurement")
+    parser.add_argument("--port", type=int, default=8102, help="Port of the spawned backend")
+    parser.add_argument("--standin-port", type=int, default=8191, help="Port of the spawned stand-in provider server")
+    parser.add_argument("--latency-scale", type=float, default=0.1, help="Factor applied to the stand-in provider latencies")
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="Load the agent on the first mission instead of in the background at startup")
+    parser.add_argument("--topic", default="Familienhotel Mallorca")
+    parser.add_argument("--max-import-seconds", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--max-ready-seconds", type=float, help="Fail if the median time until /health answers exceeds this")
+    parser.add_argument("--max-first-request-seconds", type=float, help="Fail if the median duration of the first mission exceeds this")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args(argv)
+    # Settings start_backend/start_standin share with loadtest.py
+    args.levels, args.error_rate, args.cache, args.rate_limit = [1], [], False, False
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    print(f"Importing the backend in {args.runs} fresh processes...", file=sys.stderr)
+    imports = [measure_import() for _ in range(args.runs)]
+
+    print(f"Starting the backend {args.runs} times (preload {'on' if args.preload else 'off'})...", file=sys.stderr)
+    standin = start_standin(args)
+    try:
+        _wait_until_up(f"http://127.0.0.1:{args.standin_port}/health")
+        servers = [measure_server(args) for _ in range(args.runs)]
+    finally:
+        standin.terminate()
+        standin.wait(timeout=10)
+
+    summary = {
+        "import": _median(imports, "seconds"),
+        "import_process": _median(imports, "process_seconds"),
+        "ready": _median(servers, "ready"),
+        "first_event": _median(servers, "first_event"),
+        "first_request": _median(servers, "first_total"),
+        "warm_first_event": _median(servers, "warm_first_event"),
+        "warm_request": _median(servers, "warm_total"),
+    }
+    heavy = sorted({name for run in imports for name in run["heavy_modules"]})
+
+    print(f"\nMedians over {args.runs} runs (seconds):")
+    print(f"  import main        {summary['import']}  (whole interpreter: {summary['import_process']})")
+    print(f"  ready (/health)    {summary['ready']}")
+    print(f"  first mission      first event {summary['first_event']}, complete {summary['first_request']}")
+    print(f"  warm mission       first event {summary['warm_first_event']}, complete {summary['warm_request']}")
+    print(f"  heavy SDKs loaded by `import main`: {', '.join(heavy) or 'none'}")
+
+    failures = []
+    for key, limit in (("import", args.max_import_seconds), ("ready", args.max_ready_seconds), ("first_request", args.max_first_request_seconds)):
+        if limit is not None and summary[key] is not None and summary[key] > limit:
+            failures.append(f"{key} {summary[key]}s > {limit}s")
+    if failures:
+        print(f"\nRegression: {'; '.join(failures)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"settings": vars(args), "summary": summary, "heavy_modules": heavy, "imports": imports, "servers": servers}, indent=2))
+        print(f"Results written to {args.output}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -80,6 +80,11 @@ export default function Home() {
           setLogs(prev => [...prev, { type: 'status', content, timestamp }]);
         } else if (data.type === 'log') {
           setLogs(prev => [...prev, { type: 'log', content, timestamp }]);
+        } else if (data.type === 'delta') {
+          // Briefing chunks while it is generated; the final 'data' event replaces them
+          if (data.key === 'briefing') {
+              setBriefing(prev => prev + data.data);
+          }
         } else if (data.type === 'data') {
           if (data.key === 'briefing') {
               setBriefing(content);